@@ -1,3 +1,4 @@
+import io
 import sys
 from pathlib import Path
 
@@ -12,114 +13,193 @@ import pandas as pd
 import numpy as np
 
 # our package-style imports (from src/)
-from detectors import analyze_text, detectors_health
-from utils import scoring, rewrite
+from detectors import analyze_text, detectors_health, DocumentAnalyzer, ResultCache
+from detectors.jobs import BatchJobs
+from utils import scoring, rewrite, profiling
 
 # ---------------- UI CONFIG ----------------
 st.set_page_config(page_title="Bias Detector", page_icon="🧪", layout="wide")
 st.title("Bias Detector — Clean Baseline")
 
-# session state for CSV download
-if "last_csv_results" not in st.session_state:
-    st.session_state["last_csv_results"] = None
+@st.cache_resource
+def get_result_cache() -> ResultCache:
+    # one cache per server process, shared by all sessions
+    return ResultCache()
+
+@st.cache_resource
+def get_batch_jobs() -> BatchJobs:
+    # uploads are scored in background threads, results kept on disk (shared by all sessions);
+    # no result cache: a bulk upload would fill it with full results and evict the single-text entries
+    return BatchJobs()
+
+@st.cache_data(max_entries=8)
+def rewrite_upload(data: bytes, column: str = "text") -> tuple:
+    # keyed on the file bytes and column: reruns reuse the rewrites and the export
+    try:
+        df = pd.read_csv(io.BytesIO(data))
+    except Exception as e:
+        raise ValueError(f"Failed to read CSV: {e}") from e
+    if column not in df.columns:
+        raise ValueError(f"CSV must contain a '{column}' column.")
+    df["rewrite"] = rewrite.rewrite_batch(df[column].tolist())
+    return df, df.to_csv(index=False).encode("utf-8")
+
+def get_document_analyzer() -> DocumentAnalyzer:
+    # per session: it diffs each analysis against that session's previous text
+    if "document_analyzer" not in st.session_state:
+        st.session_state["document_analyzer"] = DocumentAnalyzer()
+    return st.session_state["document_analyzer"]
 
 with st.expander("Environment / Health check"):
     st.write({
         "python_ok": True,
         "numpy_version": np.__version__,
         "pandas_version": pd.__version__,
-        "detectors_ok": detectors_health(),
+        "detectors_ok": detectors_health(wait_for_model=False),  # reports model readiness, loads it in background
+        "result_cache": get_result_cache().stats(),
     })
     st.caption("If any import fails here, fix requirements locally before deploying.")
 
+    # per-stage timings (process-wide; off by default, near-zero cost when off)
+    if st.checkbox("Record per-stage timings", value=profiling.active() is not None):
+        sink = profiling.active() or profiling.enable()
+        if isinstance(sink, profiling.InMemorySink):
+            snap = sink.snapshot()
+            if snap:
+                st.dataframe(pd.DataFrame.from_dict(snap, orient="index"), use_container_width=True)
+                st.code(sink.to_prometheus_text(), language="text")
+            else:
+                st.caption("No timings yet — run an analysis.")
+    elif profiling.active() is not None:
+        profiling.disable()
+
 tabs = st.tabs(["Single Text", "CSV Batch", "Rewrite Suggestion"])
 
 # ---------------- SINGLE TEXT ----------------
 with tabs[0]:
     text = st.text_area("Paste text", height=180, placeholder="Paste a paragraph...")
+    doc_mode = st.checkbox("Document mode (per-sentence; re-analyzing after an edit only scores changed sentences)")
+    fast = st.checkbox("Fast mode (skip the ML signal when it cannot change the severity)", key="cascade_single")
     if st.button("Analyze", type="primary"):
-        result = analyze_text(text or "")
+        if doc_mode:
+            result = get_document_analyzer().analyze(text or "")
+        else:
+            result = analyze_text(text or "", cache=get_result_cache(), cascade=fast)
         st.subheader("Result")
-        st.json(result)
+        st.json({k: v for k, v in result.items() if k != "sentences"})  # sentences shown as a table below
         # Show component scores + ML prob clearly
         cols = st.columns(4)
         cols[0].metric("Toxicity (0–10)", round(result["toxicity"]["score"], 2))
         cols[1].metric("Stereotypes (0–10)", round(result["stereotypes"]["score"], 2))
         cols[2].metric("Factuality (0–10)", round(result["factuality"]["score"], 2))
-        cols[3].metric("ML prob (0–1)", f"{result['mlsignal']['proba']:.2f}")
+        cols[3].metric("ML prob (0–1)", f"{result['mlsignal']['proba']:.2f}" if "mlsignal" in result else "skipped")
         st.metric("Overall bias score", round(result["overall"]["score"], 2))
-        ov = result["overall"]["score"]
-        # new thresholds (case-1 = MODERATE, case-2 = LOW)
-        if   ov >= 6.5: sev = "HIGH"
-        elif ov >= 2.5: sev = "MODERATE"
-        else:           sev = "LOW"
+        sev = scoring.severity_band(result["overall"]["score"])
         st.write(f"**Overall severity:** {sev}")
+        if result["domain"]["flags"]:
+            st.write("**Domain terms:** " + "; ".join(
+                f"{f['group']}: {', '.join(f['matches'])}" for f in result["domain"]["flags"]))
+        if doc_mode:
+            flagged = [
+                {"start": s["start"], "end": s["end"], "sentence": text[s["start"]:s["end"]], "score": s["score"],
+                 "matches": ", ".join(m for f in s["flags"] for m in f["matches"])}
+                for s in result["sentences"] if s["flags"]
+            ]
+            st.write(f"Sentences: {len(result['sentences'])} (re-scored {result['rescored']}), flagged: {len(flagged)}")
+            if flagged:
+                st.dataframe(pd.DataFrame(flagged), use_container_width=True)
         st.caption("Scores are heuristic and capped for stability.")
 
 # ---------------- CSV BATCH ----------------
-with tabs[1]:
-    st.markdown("Upload a CSV with a **text** column. Optional columns: **id**, **tag**.")
-    up = st.file_uploader("Upload CSV", type=["csv"])
-
-    if up:
+PAGE_ROWS = 50
+
+@st.fragment(run_every=1.0)
+def batch_progress(job) -> None:
+    # polls the background job without rerunning the rest of the page
+    if job.active:
+        label = "Queued (another batch is scoring)..." if job.state == "queued" else f"Scoring {job.done}/{job.total} rows..."
+        st.progress(job.progress, text=label)
+        if st.button("Cancel", key=f"cancel_{job.key}"):
+            job.cancel()
+    else:
+        st.rerun()  # finished: render the results once
+
+def show_batch_results(job) -> None:
+    if job.state == "error":
+        st.error(f"Failed to process upload: {job.error}")
+        return
+    if job.state == "cancelled":
+        st.warning(f"Cancelled after {job.done} of {job.total} rows.")
+    else:
+        st.success(f"Processed {job.total} rows in {job.seconds:.1f}s.")
+    if job.dedup:
+        d = job.dedup
+        clusters = (f"; {d['near_duplicates']} more texts fall in {d['clusters']} near-duplicate clusters"
+                    if d.get("near") is not None else "")
+        st.caption(f"Scored {d['groups']} of {d['rows']} rows: {d['exact_duplicates']} exact copies reuse their "
+                   f"group's result ({d['duplicate_rate']:.0%}){clusters}; see the group_id column.")
+    if not job.done:
+        return
+    pages = -(-job.done // PAGE_ROWS)
+    page = st.number_input(f"Page (of {pages}, {PAGE_ROWS} rows each)", 1, pages, 1, key=f"page_{job.key}")
+    st.dataframe(job.rows((page - 1) * PAGE_ROWS, PAGE_ROWS), use_container_width=True)
+
+    if job.state == "done" and st.checkbox("Prepare downloads", key=f"dl_{job.key}"):
+        with open(job.export("csv"), "rb") as f:
+            st.download_button(
+                label="Download results CSV",
+                data=f,
+                file_name="bias_eval_results.csv",
+                mime="text/csv",
+                type="primary",
+            )
         try:
-            df_in = pd.read_csv(up)
-        except Exception as e:
-            st.error(f"Failed to read CSV: {e}")
-            df_in = None
-
-        if df_in is not None:
-            if "text" not in df_in.columns:
-                st.error("CSV must contain a 'text' column.")
-            else:
-                # Normalize optional columns
-                has_id = "id" in df_in.columns
-                has_tag = "tag" in df_in.columns
-                if not has_id:
-                    df_in["id"] = range(1, len(df_in) + 1)
-                if not has_tag:
-                    df_in["tag"] = ""
-
-                # Run detectors row-wise
-                rows = []
-                for _id, text, tag in df_in[["id", "text", "tag"]].fillna("").itertuples(index=False):
-                    r = analyze_text(text)
-                    rows.append({
-                        "id": _id,
-                        "text": text,
-                        "tag": tag,
-                        "toxicity":     r["toxicity"]["score"],
-                        "stereotypes":  r["stereotypes"]["score"],
-                        "factuality":   r["factuality"]["score"],
-                        "ml_prob":      r["mlsignal"]["proba"],
-                        "overall":      r["overall"]["score"],
-                    })
-
-                results_df = pd.DataFrame(rows)
-                # Keep consistent column order
-                results_df = results_df[["id","text","tag","toxicity","stereotypes","factuality","ml_prob","overall"]]
-
-                # Save in session and display
-                st.session_state["last_csv_results"] = results_df
-
-                st.success(f"Processed {len(results_df)} rows. (Showing first 50)")
-                st.dataframe(results_df.head(50), use_container_width=True)
-
-                # Download button
-                csv_bytes = results_df.to_csv(index=False).encode("utf-8")
+            with open(job.export("parquet"), "rb") as f:
                 st.download_button(
-                    label="Download results CSV",
-                    data=csv_bytes,
-                    file_name="bias_eval_results.csv",
-                    mime="text/csv",
-                    type="primary",
+                    label="Download results Parquet",
+                    data=f,
+                    file_name="bias_eval_results.parquet",
+                    mime="application/vnd.apache.parquet",
                 )
+        except ImportError as e:
+            st.caption(str(e))
+
+with tabs[1]:
+    st.markdown("Upload a CSV (or Parquet / Arrow) with a **text** column. Optional columns: **id**, **tag**.")
+    up = st.file_uploader("Upload CSV", type=["csv", "parquet", "arrow", "feather"])
+    fast_csv = st.checkbox("Fast mode (ML only for rows where it can change the severity; others get an empty ml_prob)",
+                           key="cascade_csv")
+    dedup_csv = st.checkbox("Collapse duplicates (score each distinct text once; exact copies share the result)",
+                            key="dedup_csv")
+    near_csv = None
+    if dedup_csv and st.checkbox("Also label near-duplicates (group_id; case/spacing variants and similar rows, "
+                                 "each still scored)", key="near_csv"):
+        near_csv = st.slider("Near-duplicate similarity", 0.5, 1.0, 0.8, 0.05, key="near_csv_threshold")
+
+    jobs = get_batch_jobs()
+    if up:
+        # hash the upload once per file/option, not on every rerun
+        ident = (getattr(up, "file_id", up.name), up.size, fast_csv, dedup_csv, near_csv)
+        if st.session_state.get("batch_upload", (None,))[0] != ident:
+            st.session_state["batch_upload"] = (ident, jobs.key(up.getvalue(), fast_csv, dedup_csv, near_csv))
+        key = st.session_state["batch_upload"][1]
+        st.session_state["last_batch"] = key
+        # scored once per distinct upload, in the background; reruns just look the job up
+        job = jobs.get(key) or jobs.submit(up.getvalue(), up.name, cascade=fast_csv, key=key,
+                                           dedup=dedup_csv, near=near_csv)
+        if job.state in ("cancelled", "error") and st.button("Restart", key=f"restart_{key}"):
+            job = jobs.restart(key, up.getvalue(), up.name, cascade=fast_csv, dedup=dedup_csv, near=near_csv)
+        if job.active:
+            batch_progress(job)
+        else:
+            show_batch_results(job)
     else:
         # If nothing uploaded, show a hint + optional last results
         st.info("No CSV uploaded yet. You can test with `tests\\tests_snippets.csv`.")
-        if st.session_state["last_csv_results"] is not None:
-            st.write("Last results in memory:")
-            st.dataframe(st.session_state["last_csv_results"].head(20), use_container_width=True)
+        last = jobs.get(st.session_state.get("last_batch", ""))
+        if last is not None and not last.active:
+            st.write("Last results:")
+            st.dataframe(last.rows(0, 20), use_container_width=True)
 
 # ---------------- REWRITE ----------------
 with tabs[2]:
@@ -127,4 +207,22 @@ with tabs[2]:
     if st.button("Rewrite", key="rw"):
         st.write(rewrite.rewrite_text(sample or ""))
 
+    st.markdown("Or rewrite a whole CSV (**text** column) — adds a **rewrite** column.")
+    up_rw = st.file_uploader("Upload CSV to rewrite", type=["csv"], key="rw_csv")
+    if up_rw:
+        try:
+            df_rw, csv_rw = rewrite_upload(up_rw.getvalue(), "text")
+        except ValueError as e:
+            st.error(str(e))
+            df_rw = None
+        if df_rw is not None:
+            st.success(f"Rewrote {len(df_rw)} rows. (Showing first 50)")
+            st.dataframe(df_rw.head(50), use_container_width=True)
+            st.download_button(
+                label="Download rewritten CSV",
+                data=csv_rw,
+                file_name="bias_rewrites.csv",
+                mime="text/csv",
+            )
+
 st.caption("Baseline version; add ML later once this runs clean locally.")
@@ -1,39 +1,313 @@
-from .stereotypes import detect_stereotypes
-from .toxicity import detect_toxicity
-from .factuality import detect_factuality
-from .mlsignal import detect_mlsignal
-from utils.scoring import combine_scores
-
-def analyze_text(text: str) -> dict:
-    text = text or ""
-    ster = detect_stereotypes(text)
-    tox  = detect_toxicity(text)
-    fac  = detect_factuality(text)
-    ml   = detect_mlsignal(text)
-
-    parts = {
-        "stereotypes": ster["score"],
-        "toxicity": tox["score"],
-        "factuality": fac["score"],
-        "mlsignal": ml["score"],
-    }
-    overall = combine_scores(parts)
+import os
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from typing import List, Optional, Sequence, Union
+from .stereotypes import detect_stereotypes, stereotype_score
+from .toxicity import detect_toxicity, toxicity_score
+from .factuality import detect_factuality, factuality_score
+from .domain import detect_domain_terms
+from .mlsignal import detect_mlsignal, detect_mlsignal_batch, mlsignal_scores_batch
+from .lexicon import scan_lexicons, get_matcher, lexicon_status
+from .cache import ResultCache
+from .document import DocumentAnalyzer
+from .results import BatchScores, Scores
+from models.baseline import get_model, model_status, warm_model, warm_model_async
+from utils.scoring import combine_scores, combine_scores_batch, score_bounds, severity_band
+from utils.profiling import timed
+from utils.text import Document, as_document, clip_text
+
+MAX_CHARS_ENV = "BIAS_DETECTOR_MAX_CHARS"
+# longer texts are scored on their first MAX_TEXT_CHARS characters (0: no limit)
+MAX_TEXT_CHARS = int(os.environ.get(MAX_CHARS_ENV, "200000"))
+
+def _cache_variant(use_ml: bool, cascade: bool) -> str:
+    if not use_ml:
+        return "rules"
+    return "cascade" if cascade else ""
+
+def _ml_decides_band(parts: dict) -> bool:
+    # could mlsignal (0..10) still move the overall score across a severity band?
+    lo, hi = score_bounds(parts, ["mlsignal"])
+    return severity_band(lo) != severity_band(hi)
+
+def _over_limit(doc: Document) -> bool:
+    return 0 < MAX_TEXT_CHARS < len(doc.text)
+
+def _truncated(result, input_len: int):
+    if isinstance(result, Scores):
+        result.input_len, result.truncated = input_len, True
+        return result
+    # a copy: the result may be a cached entry shared with the clipped text
+    return {**result, "input_len": input_len, "scored_len": result["input_len"], "truncated": True}
+
+def _rule_scores(hits: dict) -> dict:
+    return {"stereotypes": stereotype_score(hits), "toxicity": toxicity_score(hits),
+            "factuality": factuality_score(hits)}
+
+def _analyze_scores(doc: Document, use_ml: bool, cascade: bool) -> Scores:
+    # analyze_text's scores without building any flags
+    with timed("analyze_text"):
+        parts = _rule_scores(scan_lexicons(doc))
+        ml = None
+        if use_ml and not (cascade and not _ml_decides_band(parts)):
+            ml = detect_mlsignal(doc)
+            parts["mlsignal"] = ml["score"]
+        overall = combine_scores(parts)["score"]
+    nan = float("nan")
+    return Scores(len(doc.text), parts["toxicity"], parts["stereotypes"], parts["factuality"],
+                  ml["score"] if ml else nan, ml["proba"] if ml else nan, overall)
+
+def analyze_text(text: Union[str, Document], cache: Optional[ResultCache] = None, use_ml: bool = True,
+                 cascade: bool = False, scores_only: bool = False) -> Union[dict, Scores]:
+    """
+    Run all detectors and combine their scores. The text is wrapped in one
+    Document that every detector shares (lowercased/tokenized once).
+    use_ml=False is the rules-only path: no "mlsignal" entry, weights
+    renormalize over the rule detectors, and sklearn is never imported.
+    cascade=True runs the cheap rule detectors first and skips mlsignal
+    when no ML score could change the severity band; the result then
+    looks like the rules-only one (its overall score lies inside the
+    band's bounds) and lists the skipped detectors under "skipped".
+    Texts longer than MAX_TEXT_CHARS are scored on a clipped prefix; the
+    result then has "truncated": True and the scored length as "scored_len".
+    scores_only=True returns a compact Scores record (no flags; the
+    cache, which holds full results, still stores the full one).
+    """
+    doc = as_document(text)
+    if _over_limit(doc):
+        clipped = Document(clip_text(doc.text, MAX_TEXT_CHARS))
+        return _truncated(analyze_text(clipped, cache, use_ml, cascade, scores_only), len(doc))
+    text = doc.text
+    if cache is not None:
+        variant = _cache_variant(use_ml, cascade)
+        result = cache.get(text, variant)
+        if result is None:
+            result = analyze_text(doc, use_ml=use_ml, cascade=cascade)
+            cache.put(text, result, variant)
+        return Scores.from_result(result) if scores_only else result
+    if scores_only:
+        return _analyze_scores(doc, use_ml, cascade)
+
+    with timed("analyze_text"):
+        with timed("lexicon_scan"):
+            hits = scan_lexicons(doc)  # one pass for all lexicon detectors
+        with timed("stereotypes"):
+            ster = detect_stereotypes(doc, hits)
+        with timed("toxicity"):
+            tox  = detect_toxicity(doc, hits)
+        with timed("factuality"):
+            fac  = detect_factuality(doc, hits)
+        with timed("domain"):
+            dom  = detect_domain_terms(doc, hits)
+        parts = {
+            "stereotypes": ster["score"],
+            "toxicity": tox["score"],
+            "factuality": fac["score"],
+        }
+        skipped = []
+        if use_ml and cascade and not _ml_decides_band(parts):
+            skipped.append("mlsignal")
+        elif use_ml:
+            with timed("mlsignal"):
+                ml   = detect_mlsignal(doc)
+            parts["mlsignal"] = ml["score"]
 
-    return {
+        with timed("combine"):
+            overall = combine_scores(parts)
+
+    result = {
         "input_len": len(text),
         "stereotypes": ster,
         "toxicity": tox,
         "factuality": fac,
-        "mlsignal": ml,
-        "overall": overall,
+        "domain": dom,
     }
+    if "mlsignal" in parts:
+        result["mlsignal"] = ml
+    result["overall"] = overall
+    if cascade:
+        result["skipped"] = skipped
+    return result
+
+# below this many rows a process pool costs more than it saves
+PARALLEL_MIN_ROWS = 5_000
+PARALLEL_PIECE_ROWS = 2_000
+
+def warm_up(use_ml: bool = True) -> None:
+    """
+    Load everything scoring touches (model, compiled lexicons, lazy
+    imports) so no request pays for it; safe to call from several threads.
+    Pre-fork servers call it in the parent so workers share the result.
+    """
+    if use_ml:
+        warm_model()
+    get_matcher()
+    analyze_text("warm up", use_ml=use_ml)
+    analyze_batch(["warm up", "warm up again"], use_ml=use_ml)
+
+def _init_worker(use_ml: bool = True) -> None:
+    # warm model + compiled lexicons once per worker process
+    warm_up(use_ml)
+
+def _score_batch(docs: List[Document], use_ml: bool, cascade: bool) -> BatchScores:
+    # analyze_batch's scores straight into columns, without building any flags
+    import numpy as np
+
+    out = BatchScores.empty(len(docs))
+    out.input_len[:] = [len(d.text) for d in docs]
+    with timed("batch.lexicon_scan"):
+        hits = [scan_lexicons(d) for d in docs]
+    with timed("batch.rules"):
+        rule_cols = {
+            "stereotypes": np.array([stereotype_score(h) for h in hits]),
+            "toxicity": np.array([toxicity_score(h) for h in hits]),
+            "factuality": np.array([factuality_score(h) for h in hits]),
+        }
+    for k, col in rule_cols.items():
+        out[k][:] = col
+    rows = np.arange(len(docs))
+    if not use_ml or cascade:
+        with timed("batch.combine"):
+            out["overall"][:] = combine_scores_batch(rule_cols)["score"]  # ML rows are overwritten below
+        if not use_ml:
+            return out
+        with timed("batch.cascade"):
+            lo = combine_scores_batch({**rule_cols, "mlsignal": np.zeros(len(docs))})["score"].tolist()
+            hi = combine_scores_batch({**rule_cols, "mlsignal": np.full(len(docs), 10.0)})["score"].tolist()
+            rows = np.array([i for i in rows.tolist() if severity_band(lo[i]) != severity_band(hi[i])], dtype=np.int64)
+    with timed("batch.mlsignal"):
+        ml_scores, probas = mlsignal_scores_batch([docs[i] for i in rows.tolist()])
+    out["mlsignal"][rows] = ml_scores
+    out["ml_prob"][rows] = probas
+    with timed("batch.combine"):
+        out["overall"][rows] = combine_scores_batch(
+            {**{k: col[rows] for k, col in rule_cols.items()}, "mlsignal": ml_scores})["score"]
+    return out
+
+def analyze_batch(texts: Sequence[Union[str, Document]], workers: int = 1, cache: Optional[ResultCache] = None,
+                  use_ml: bool = True, cascade: bool = False,
+                  scores_only: bool = False) -> Union[List[dict], BatchScores]:
+    """
+    analyze_text for many texts. Same per-row results, but the ML signal
+    runs as one vectorized model call and scores combine over arrays.
+    workers > 1 spreads pieces of the batch over a process pool (same output, same order).
+    With a cache, only misses are scored (each distinct text once).
+    cascade=True: the ML call covers only rows whose band it could change.
+    Rows longer than MAX_TEXT_CHARS are clipped and flagged as in analyze_text.
+    scores_only=True returns a BatchScores (typed columns, one entry per
+    row) instead of per-row dicts; no flags are collected.
+    """
+    docs = [as_document(t) for t in texts]
+    long = {i: len(d) for i, d in enumerate(docs) if _over_limit(d)}
+    if long:
+        docs = [Document(clip_text(d.text, MAX_TEXT_CHARS)) if i in long else d for i, d in enumerate(docs)]
+        out = analyze_batch(docs, workers, cache, use_ml, cascade, scores_only)
+        if scores_only:
+            rows = list(long)
+            out.input_len[rows] = [long[i] for i in rows]
+            out.truncated[rows] = True
+            return out
+        return [_truncated(r, long[i]) if i in long else r for i, r in enumerate(out)]
+    texts = [d.text for d in docs]
+    if not texts:
+        return BatchScores.empty(0) if scores_only else []
+    if cache is not None:
+        variant = _cache_variant(use_ml, cascade)
+        out = [cache.get(t, variant) for t in texts]
+        todo = list(dict.fromkeys(t for t, r in zip(texts, out) if r is None))
+        fresh = dict(zip(todo, analyze_batch(todo, workers, use_ml=use_ml, cascade=cascade)))
+        cache.put_many(fresh.items(), variant)
+        out = [r if r is not None else fresh[t] for t, r in zip(texts, out)]
+        return BatchScores.from_results(out) if scores_only else out
+    if workers > 1 and len(texts) >= PARALLEL_MIN_ROWS:
+        pieces = [texts[i:i + PARALLEL_PIECE_ROWS] for i in range(0, len(texts), PARALLEL_PIECE_ROWS)]
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(use_ml,)) as pool:
+            parts = list(pool.map(partial(analyze_batch, use_ml=use_ml, cascade=cascade, scores_only=scores_only),
+                                  pieces))
+        return BatchScores.concat(parts) if scores_only else [r for part in parts for r in part]
+    if scores_only:
+        return _score_batch(docs, use_ml, cascade)
+    if not use_ml:
+        return [analyze_text(d, use_ml=False, cascade=cascade) for d in docs]
+
+    # stage timings here are per batch, hence the "batch." prefix
+    with timed("batch.lexicon_scan"):
+        hits = [scan_lexicons(d) for d in docs]
+    with timed("batch.stereotypes"):
+        sters = [detect_stereotypes(d, h) for d, h in zip(docs, hits)]
+    with timed("batch.toxicity"):
+        toxs  = [detect_toxicity(d, h) for d, h in zip(docs, hits)]
+    with timed("batch.factuality"):
+        facs  = [detect_factuality(d, h) for d, h in zip(docs, hits)]
+    with timed("batch.domain"):
+        doms  = [detect_domain_terms(d, h) for d, h in zip(docs, hits)]
+    rows = range(len(texts))
+    rule_scores = None
+    if cascade:
+        with timed("batch.cascade"):
+            # band bounds for every row at once (mlsignal = 0 and = 10), then rules-only scores
+            rule_cols = {
+                "stereotypes": [r["score"] for r in sters],
+                "toxicity": [r["score"] for r in toxs],
+                "factuality": [r["score"] for r in facs],
+            }
+            lo = combine_scores_batch({**rule_cols, "mlsignal": [0.0] * len(texts)})["score"].tolist()
+            hi = combine_scores_batch({**rule_cols, "mlsignal": [10.0] * len(texts)})["score"].tolist()
+            rows = [i for i in rows if severity_band(lo[i]) != severity_band(hi[i])]
+            rule_only = combine_scores_batch(rule_cols)
+            rule_scores = rule_only["score"].tolist()
+    with timed("batch.mlsignal"):
+        mls = dict(zip(rows, detect_mlsignal_batch([docs[i] for i in rows])))
+
+    with timed("batch.combine"):
+        overall = combine_scores_batch({
+            "stereotypes": [sters[i]["score"] for i in rows],
+            "toxicity": [toxs[i]["score"] for i in rows],
+            "factuality": [facs[i]["score"] for i in rows],
+            "mlsignal": [mls[i]["score"] for i in rows],
+        })
+        ml_scores = dict(zip(rows, overall["score"].tolist()))
+
+    out = []
+    for i, (text, ster, tox, fac, dom) in enumerate(zip(texts, sters, toxs, facs, doms)):
+        parts = {
+            "stereotypes": ster["score"],
+            "toxicity": tox["score"],
+            "factuality": fac["score"],
+        }
+        result = {
+            "input_len": len(text),
+            "stereotypes": ster,
+            "toxicity": tox,
+            "factuality": fac,
+            "domain": dom,
+        }
+        if i in mls:
+            parts["mlsignal"] = mls[i]["score"]
+            result["mlsignal"] = mls[i]
+            result["overall"] = {"score": ml_scores[i], "weights": dict(overall["weights"]), "components": parts}
+        else:
+            result["overall"] = {"score": rule_scores[i], "weights": dict(rule_only["weights"]), "components": parts}
+        if cascade:
+            result["skipped"] = [] if i in mls else ["mlsignal"]
+        out.append(result)
+    return out
 
-def detectors_health() -> dict:
+def detectors_health(wait_for_model: bool = True) -> dict:
+    """
+    Smoke-test every detector. With wait_for_model=False the ML model is
+    not forced: its readiness is reported and loading starts in the
+    background, so the call returns immediately.
+    """
     try:
         _ = detect_stereotypes("health")
         _ = detect_toxicity("health")
         _ = detect_factuality("health")
-        _ = detect_mlsignal("health")
-        return {"ok": True}
+        _ = detect_domain_terms("health")
+        if wait_for_model:
+            _ = detect_mlsignal("health")
+            return {"ok": True}
+        warm_model_async()
+        return {"ok": True, "model": model_status()}
     except Exception as e:
         return {"ok": False, "error": repr(e)}
@@ -0,0 +1,74 @@
+from __future__ import annotations
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Callable, List, Optional, Sequence
+
+class MicroBatcher:
+    """
+    Gathers single-text requests from many threads into batches for one
+    `batch_fn` call (analyze_batch by default), so the ML step runs once
+    per batch. A batch closes at `max_batch` texts or `max_wait_ms` after
+    its first text arrived, whichever comes first, taking along whatever
+    is already queued by then. With max_wait_ms=0 nothing waits: a batch
+    is what queued up while the previous one was scored (one text when
+    idle, larger batches as load grows).
+    """
+
+    def __init__(self, batch_fn: Optional[Callable[[Sequence[str]], List[dict]]] = None,
+                 max_batch: int = 64, max_wait_ms: float = 5.0, max_queue: int = 10_000):
+        if batch_fn is None:
+            from . import analyze_batch
+            batch_fn = analyze_batch
+        self.batch_fn = batch_fn
+        self.max_batch = max_batch
+        self.max_wait = max_wait_ms / 1000.0
+        self._q: "queue.Queue[tuple[str, Future]]" = queue.Queue(maxsize=max_queue)
+        self._stop = threading.Event()
+        self.stats = {"requests": 0, "batches": 0, "max_batch_seen": 0}
+        self._thread = threading.Thread(target=self._run, name="micro-batcher", daemon=True)
+        self._thread.start()
+
+    def submit(self, text: str) -> Future:
+        fut: Future = Future()
+        self._q.put((text or "", fut))  # blocks when full (backpressure)
+        return fut
+
+    def analyze(self, text: str, timeout: Optional[float] = None) -> dict:
+        return self.submit(text).result(timeout)
+
+    def _run(self) -> None:
+        # after close(), keep going until queued requests are answered
+        while not (self._stop.is_set() and self._q.empty()):
+            try:
+                first = self._q.get(timeout=0.1)
+            except queue.Empty:
+                continue
+            batch = [first]
+            deadline = time.perf_counter() + self.max_wait
+            while len(batch) < self.max_batch:
+                left = deadline - time.perf_counter()
+                try:
+                    batch.append(self._q.get(timeout=left) if left > 0 else self._q.get_nowait())
+                except queue.Empty:
+                    break
+            self._flush(batch)
+
+    def _flush(self, batch: list) -> None:
+        texts = [t for t, _ in batch]
+        try:
+            results = self.batch_fn(texts)
+        except Exception as e:
+            for _, fut in batch:
+                fut.set_exception(e)
+            return
+        for (_, fut), r in zip(batch, results):
+            fut.set_result(r)
+        self.stats["requests"] += len(batch)
+        self.stats["batches"] += 1
+        self.stats["max_batch_seen"] = max(self.stats["max_batch_seen"], len(batch))
+
+    def close(self) -> None:
+        self._stop.set()
+        self._thread.join()
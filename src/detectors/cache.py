@@ -0,0 +1,162 @@
+from __future__ import annotations
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Iterable, Optional, Tuple
+
+from utils.storage import get_cache_dir
+from .lexicon import get_matcher
+
+def detectors_fingerprint() -> str:
+    """
+    Version of everything that affects analyze_text output: lexicons,
+    scoring weights, the ML model and the detector/scoring source itself.
+    """
+    from models.baseline import model_fingerprint
+    from utils import scoring
+
+    h = hashlib.sha256()
+    h.update(get_matcher().version.encode("utf-8"))
+    h.update(json.dumps(scoring.BASE_WEIGHTS, sort_keys=True).encode("utf-8"))
+    h.update(model_fingerprint().encode("utf-8"))
+    for path in [*sorted(Path(__file__).parent.glob("*.py")), Path(scoring.__file__)]:
+        h.update(path.read_bytes())
+    return h.hexdigest()[:16]
+
+class ResultCache:
+    """
+    Content-addressed cache for analyze_text results.
+
+    Two tiers: a bounded in-memory LRU and an optional SQLite file under
+    get_cache_dir() with size-based eviction (oldest entries first). Keys
+    hash the text together with detectors_fingerprint(), and the SQLite
+    tier is wiped on open when the fingerprint changed, so stale scores
+    are never served.
+    """
+
+    def __init__(self, max_items: int = 10_000, db_path: Path | str | None = "default",
+                 max_db_bytes: int = 256 * 1024 * 1024, fingerprint: str | None = None):
+        self.fingerprint = fingerprint or detectors_fingerprint()
+        self.max_items = max_items
+        self.max_db_bytes = max_db_bytes
+        self._mem: "OrderedDict[str, bytes]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.counters: Dict[str, int] = {
+            "hits_memory": 0, "hits_disk": 0, "misses": 0,
+            "evictions_memory": 0, "evictions_disk": 0,
+        }
+
+        self._db: sqlite3.Connection | None = None
+        self._db_bytes = 0
+        if db_path is not None:
+            path = get_cache_dir() / "results.sqlite3" if db_path == "default" else Path(db_path)
+            self._open_db(path)
+
+    def _open_db(self, path: Path) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        db = sqlite3.connect(str(path), check_same_thread=False, timeout=30)
+        db.execute("PRAGMA journal_mode=WAL")
+        db.execute("CREATE TABLE IF NOT EXISTS meta (k TEXT PRIMARY KEY, v TEXT)")
+        db.execute("CREATE TABLE IF NOT EXISTS results "
+                   "(key TEXT PRIMARY KEY, value BLOB, size INTEGER, created REAL)")
+        db.execute("CREATE INDEX IF NOT EXISTS results_created ON results(created)")
+        row = db.execute("SELECT v FROM meta WHERE k='fingerprint'").fetchone()
+        if row is None or row[0] != self.fingerprint:
+            db.execute("DELETE FROM results")
+            db.execute("INSERT OR REPLACE INTO meta VALUES ('fingerprint', ?)", (self.fingerprint,))
+        db.commit()
+        self._db = db
+        self._db_bytes = db.execute("SELECT COALESCE(SUM(size), 0) FROM results").fetchone()[0]
+
+    def key(self, text: str, variant: str = "") -> str:
+        # variant separates result shapes for the same text (e.g. rules-only);
+        # the live lexicon version keeps hot-reloaded lexicons from hitting stale entries
+        lex = get_matcher().version
+        return hashlib.sha256(f"{self.fingerprint}\0{lex}\0{variant}\0{text or ''}".encode("utf-8")).hexdigest()
+
+    def get(self, text: str, variant: str = "") -> Optional[dict]:
+        k = self.key(text, variant)
+        with self._lock:
+            blob = self._mem.get(k)
+            if blob is not None:
+                self._mem.move_to_end(k)
+                self.counters["hits_memory"] += 1
+                return json.loads(blob)
+            if self._db is not None:
+                row = self._db.execute("SELECT value FROM results WHERE key=?", (k,)).fetchone()
+                if row is not None:
+                    self.counters["hits_disk"] += 1
+                    self._remember(k, row[0])
+                    return json.loads(row[0])
+            self.counters["misses"] += 1
+            return None
+
+    def put(self, text: str, result: dict, variant: str = "") -> None:
+        self.put_many([(text, result)], variant)
+
+    def put_many(self, items: Iterable[Tuple[str, dict]], variant: str = "") -> None:
+        """Store (text, result) pairs; the SQLite tier writes them in one transaction."""
+        now = time.time()
+        rows = [(self.key(text, variant), json.dumps(result, separators=(",", ":")).encode("utf-8"))
+                for text, result in items]
+        if not rows:
+            return
+        with self._lock:
+            for k, blob in rows:
+                self._remember(k, blob)
+            if self._db is not None:
+                cur = self._db.executemany("INSERT OR IGNORE INTO results VALUES (?, ?, ?, ?)",
+                                           [(k, blob, len(blob), now) for k, blob in rows])
+                self._db.commit()
+                if cur.rowcount == len(rows):
+                    self._db_bytes += sum(len(blob) for _, blob in rows)
+                else:
+                    # some keys were already there (another process wrote them): recount
+                    self._db_bytes = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM results").fetchone()[0]
+                if self._db_bytes > self.max_db_bytes:
+                    self._evict_disk()
+
+    def _remember(self, k: str, blob: bytes) -> None:
+        self._mem[k] = blob
+        self._mem.move_to_end(k)
+        while len(self._mem) > self.max_items:
+            self._mem.popitem(last=False)
+            self.counters["evictions_memory"] += 1
+
+    def _evict_disk(self) -> None:
+        # other processes may share the file: re-read the real size first
+        db = self._db
+        self._db_bytes = db.execute("SELECT COALESCE(SUM(size), 0) FROM results").fetchone()[0]
+        target = int(self.max_db_bytes * 0.9)
+        if self._db_bytes <= target:
+            return
+        freed, keys = 0, []
+        for key, size in db.execute("SELECT key, size FROM results ORDER BY created"):
+            keys.append((key,))
+            freed += size
+            if self._db_bytes - freed <= target:
+                break
+        db.executemany("DELETE FROM results WHERE key=?", keys)
+        db.commit()
+        self._db_bytes -= freed
+        self.counters["evictions_disk"] += len(keys)
+
+    def stats(self) -> dict:
+        with self._lock:
+            out = dict(self.counters)
+            out["memory_items"] = len(self._mem)
+            out["disk_bytes"] = self._db_bytes
+            out["fingerprint"] = self.fingerprint
+            return out
+
+    def clear(self) -> None:
+        with self._lock:
+            self._mem.clear()
+            if self._db is not None:
+                self._db.execute("DELETE FROM results")
+                self._db.commit()
+                self._db_bytes = 0
@@ -0,0 +1,236 @@
+from __future__ import annotations
+import hashlib
+import threading
+from bisect import bisect_left
+from collections import OrderedDict
+from typing import Dict, List, Tuple
+
+from .stereotypes import detect_stereotypes
+from .toxicity import detect_toxicity
+from .factuality import detect_factuality
+from .domain import detect_domain_terms
+from .lexicon import get_matcher, scan_lexicons
+from .mlsignal import _from_proba, detect_mlsignal_batch
+from utils.scoring import combine_scores
+from utils.profiling import timed
+from utils.text import Document, clip_text, sentence_spans
+
+_BLOCK = 4096
+
+def _common_prefix(a: str, b: str) -> int:
+    # compare in blocks (C-level slice equality), then bisect inside the first differing block
+    n = min(len(a), len(b))
+    i = 0
+    while i < n and a[i:i + _BLOCK] == b[i:i + _BLOCK]:
+        i += _BLOCK
+    i = min(i, n)
+    lo, hi = i, min(i + _BLOCK, n)
+    while lo < hi:
+        mid = (lo + hi + 1) // 2
+        if a[i:mid] == b[i:mid]:
+            lo = mid
+        else:
+            hi = mid - 1
+    return lo
+
+def _common_suffix(a: str, b: str, limit: int) -> int:
+    # like _common_prefix, from the end, never past `limit` chars
+    la, lb = len(a), len(b)
+    i = 0
+    while i < limit and a[la - min(i + _BLOCK, limit):la - i] == b[lb - min(i + _BLOCK, limit):lb - i]:
+        i += _BLOCK
+    i = min(i, limit)
+    lo, hi = i, min(i + _BLOCK, limit)
+    while lo < hi:
+        mid = (lo + hi + 1) // 2
+        if a[la - mid:la - i] == b[lb - mid:lb - i]:
+            lo = mid
+        else:
+            hi = mid - 1
+    return lo
+
+def _add_hits(total: Dict[str, Dict[str, int]], hits: Dict[str, Dict[str, int]], sign: int) -> None:
+    for g, counts in hits.items():
+        acc = total.setdefault(g, {})
+        for w, c in counts.items():
+            n = acc.get(w, 0) + sign * c
+            if n:
+                acc[w] = n
+            else:
+                del acc[w]  # detectors treat any listed term as a hit
+        if not acc:
+            del total[g]
+
+class DocumentAnalyzer:
+    """
+    Sentence-level analysis for long documents that are edited and
+    re-analyzed repeatedly (one analyzer per editor/session).
+
+    Sentences come from utils.text.sentence_spans. Each is scored once and
+    kept in an LRU keyed by a hash of its text. On re-analysis the new text
+    is diffed against the previous one (common prefix/suffix): only the
+    sentences in the changed region are re-split, hashed and looked up,
+    and only unseen ones are scanned and model-scored. Document totals are
+    updated by subtracting the replaced sentences and adding the new ones:
+      - stereotypes/toxicity/factuality: the detectors run on the summed
+        per-sentence lexicon hits, which equals analyze_text on the whole
+        document as long as no lexicon term contains sentence punctuation;
+        when one does (matcher.crosses_sentences, e.g. "u.s." from a
+        lexicon file) the whole document is scanned again instead;
+      - mlsignal: length-weighted mean of the sentence probabilities (the
+        whole-document model call is what this mode avoids, so it can
+        differ slightly from analyze_text).
+    """
+
+    def __init__(self, max_sentences: int = 50_000, use_ml: bool = True):
+        self.max_sentences = max_sentences
+        self.use_ml = use_ml
+        self._mem: "OrderedDict[str, dict]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.counters: Dict[str, int] = {"sentences_scored": 0, "sentences_reused": 0, "evictions": 0}
+        self._lex_version: str | None = None
+        self._reset_doc()
+
+    def _reset_doc(self) -> None:
+        # the last analyzed document: sentence spans/ends and their entries, plus running totals
+        self._text: str | None = None
+        self._spans: List[Tuple[int, int]] = []
+        self._ends: List[int] = []
+        self._entries: List[dict] = []
+        self._hits: Dict[str, Dict[str, int]] = {}
+        self._ml_sum = 0  # sum of proba*1e4 (integer: exact under add/subtract) * sentence length
+        self._len_sum = 0
+
+    @staticmethod
+    def _key(sentence: str) -> str:
+        return hashlib.blake2b(sentence.encode("utf-8"), digest_size=16).hexdigest()
+
+    def _score_sentences(self, sentences: List[str]) -> List[dict]:
+        docs = [Document(s) for s in sentences]
+        with timed("document.lexicon_scan"):
+            hits = [scan_lexicons(d) for d in docs]
+        if self.use_ml:
+            with timed("document.mlsignal"):
+                mls = detect_mlsignal_batch(docs)
+        out = []
+        for i, (d, h) in enumerate(zip(docs, hits)):
+            ster, tox, fac = detect_stereotypes(d, h), detect_toxicity(d, h), detect_factuality(d, h)
+            parts = {"stereotypes": ster["score"], "toxicity": tox["score"], "factuality": fac["score"]}
+            flags = ster["flags"] + tox["flags"] + fac["flags"] + detect_domain_terms(d, h)["flags"]
+            entry = {"hits": h, "flags": flags, "len": len(d)}
+            if self.use_ml:
+                parts["mlsignal"] = mls[i]["score"]
+                entry["proba_e4"] = round(mls[i]["proba"] * 10_000)
+            entry["score"] = combine_scores(parts)["score"]
+            out.append(entry)
+        return out
+
+    def _entries_for(self, sentences: List[str]) -> List[dict]:
+        keys = [self._key(x) for x in sentences]
+        found: Dict[str, dict] = {}
+        for k in keys:
+            e = self._mem.get(k)
+            if e is not None:
+                self._mem.move_to_end(k)
+                found[k] = e
+        todo = {k: x for k, x in zip(keys, sentences) if k not in found}
+        if todo:
+            for k, e in zip(todo, self._score_sentences(list(todo.values()))):
+                self._mem[k] = found[k] = e
+            while len(self._mem) > self.max_sentences:
+                self._mem.popitem(last=False)
+                self.counters["evictions"] += 1
+        self.counters["sentences_scored"] += len(todo)
+        self.counters["sentences_reused"] += len(keys) - len(todo)
+        return [found[k] for k in keys]
+
+    def analyze(self, text: str) -> dict:
+        """
+        analyze_text-shaped result plus "sentences" (start/end offsets,
+        score and flags per sentence, for highlighting) and "rescored"
+        (sentences scored by this call). Text over MAX_TEXT_CHARS is clipped
+        and flagged as in analyze_text.
+        """
+        from . import MAX_TEXT_CHARS, _truncated
+
+        text = text or ""
+        input_len = len(text)
+        if 0 < MAX_TEXT_CHARS < input_len:
+            text = clip_text(text, MAX_TEXT_CHARS)
+        with self._lock, timed("document.analyze"):
+            matcher = get_matcher()
+            version = matcher.version
+            if version != self._lex_version:
+                # lexicons were reloaded: cached sentence hits are stale
+                self._mem.clear()
+                self._reset_doc()
+                self._lex_version = version
+            scored_before = self.counters["sentences_scored"]
+            old = self._text
+            if old is None:
+                head, tail, start, stop, shift = 0, 0, 0, len(text), 0
+            else:
+                p = _common_prefix(old, text)
+                q = _common_suffix(old, text, min(len(old), len(text)) - p)
+                # a sentence ending before the first changed char is unchanged, and so
+                # is every sentence after a boundary (a sentence end) inside the common suffix
+                head = bisect_left(self._ends, p)
+                tail = bisect_left(self._ends, len(old) - q + 1) + 1
+                tail = min(tail, len(self._spans))
+                shift = len(text) - len(old)
+                start = self._ends[head - 1] if head else 0
+                stop = self._ends[tail - 1] + shift if tail < len(self._spans) else len(text)
+
+            new_spans = [(a + start, b + start) for a, b in sentence_spans(text[start:stop])]
+            new_entries = self._entries_for([text[a:b] for a, b in new_spans])
+
+            with timed("document.aggregate"):
+                for e in self._entries[head:tail]:
+                    _add_hits(self._hits, e["hits"], -1)
+                    self._len_sum -= e["len"]
+                    if self.use_ml:
+                        self._ml_sum -= e["proba_e4"] * e["len"]
+                for e in new_entries:
+                    _add_hits(self._hits, e["hits"], 1)
+                    self._len_sum += e["len"]
+                    if self.use_ml:
+                        self._ml_sum += e["proba_e4"] * e["len"]
+
+                tail_spans = [(a + shift, b + shift) for a, b in self._spans[tail:]] if shift else self._spans[tail:]
+                self._spans = self._spans[:head] + new_spans + tail_spans
+                self._ends = [b for _, b in self._spans]
+                if self._spans and text[self._spans[-1][1] - 1] not in ".!?":
+                    self._ends[-1] = len(text)  # unterminated last sentence runs to the end of the text
+                self._entries = self._entries[:head] + new_entries + self._entries[tail:]
+                self._text = text
+
+                # summed sentence hits miss terms that span a sentence break: rescan the whole text then
+                hits = scan_lexicons(Document(text)) if matcher.crosses_sentences else self._hits
+                ster = detect_stereotypes(text, hits)
+                tox  = detect_toxicity(text, hits)
+                fac  = detect_factuality(text, hits)
+                dom  = detect_domain_terms(text, hits)
+                parts = {"stereotypes": ster["score"], "toxicity": tox["score"], "factuality": fac["score"]}
+                result = {"input_len": len(text), "stereotypes": ster, "toxicity": tox, "factuality": fac,
+                          "domain": dom}
+                if self.use_ml:
+                    p = self._ml_sum / self._len_sum / 10_000 if self._len_sum else 0.0
+                    result["mlsignal"] = _from_proba(p)
+                    parts["mlsignal"] = result["mlsignal"]["score"]
+                result["overall"] = combine_scores(parts)
+
+            result["sentences"] = [
+                {"start": a, "end": b, "score": e["score"], "flags": e["flags"]}
+                for (a, b), e in zip(self._spans, self._entries)
+            ]
+            result["rescored"] = self.counters["sentences_scored"] - scored_before
+        return _truncated(result, input_len) if len(text) < input_len else result
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {**self.counters, "cached_sentences": len(self._mem), "doc_sentences": len(self._spans)}
+
+    def clear(self) -> None:
+        with self._lock:
+            self._mem.clear()
+            self._reset_doc()
@@ -0,0 +1,22 @@
+from typing import Dict, Optional, Union
+from .lexicon import default_lexicons, scan_lexicons
+from utils.text import Document
+
+_RULE_GROUPS = frozenset(default_lexicons())
+
+def detect_domain_terms(text: Union[str, Document],
+                        lex_hits: Optional[Dict[str, Dict[str, int]]] = None) -> dict:
+    # domain groups: utils.domain.get_domain_terms() plus file-loaded lexicons that
+    # aren't one of the rule detectors' groups (see lexicon.all_lexicons)
+    if lex_hits is None:
+        lex_hits = scan_lexicons(text)
+    hits = []
+    for group in sorted(lex_hits):
+        if group not in _RULE_GROUPS and lex_hits[group]:
+            hits.append({"group": group, "matches": sorted(lex_hits[group])})
+
+    # reported alongside the other detectors, not weighted into the overall score
+    raw = sum(1.0 * len(h["matches"]) for h in hits)
+    score = round(min(raw, 10.0), 2)
+
+    return {"score": score, "flags": hits}
@@ -1,18 +1,25 @@
-import re
+from typing import Dict, Optional, Union
+from .lexicon import scan_lexicons
+from utils.text import Document
 
 # Heuristic signals only (no heavy NLP yet)
 CLAIMY = ["undeniably", "obviously", "everyone knows", "clearly", "without doubt"]
 HEDGES = ["maybe", "perhaps", "reportedly", "apparently", "it seems", "allegedly", "sort of", "kind of"]
 
-def detect_factuality(text: str) -> dict:
-    t = text.lower()
+def factuality_score(lex_hits: Dict[str, Dict[str, int]]) -> float:
+    # ↑ stronger weights than before (was 1.5/0.5)
+    raw = 2.0 * len(lex_hits.get("claiminess", ())) + 0.7 * len(lex_hits.get("hedges", ()))
+    return round(min(raw, 10.0), 2)
 
-    claim_hits = [w for w in CLAIMY if re.search(rf"(?<!\w){re.escape(w)}(?!\w)", t)]
-    hedge_hits = [w for w in HEDGES if re.search(rf"(?<!\w){re.escape(w)}(?!\w)", t)]
+def detect_factuality(text: Union[str, Document],
+                      lex_hits: Optional[Dict[str, Dict[str, int]]] = None) -> dict:
+    if lex_hits is None:
+        lex_hits = scan_lexicons(text)
 
-    # ↑ stronger weights than before (was 1.5/0.5)
-    raw = 2.0 * len(set(claim_hits)) + 0.7 * len(set(hedge_hits))
-    score = round(min(raw, 10.0), 2)
+    claim_hits = list(lex_hits.get("claiminess", {}))
+    hedge_hits = list(lex_hits.get("hedges", {}))
+
+    score = factuality_score(lex_hits)
 
     flags = []
     if claim_hits:
@@ -0,0 +1,276 @@
+from __future__ import annotations
+import hashlib
+import io
+import json
+import os
+import shutil
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import pandas as pd
+
+from .results import BatchScores
+from utils.dedup import Deduper
+from utils.storage import get_cache_dir
+from utils.tableio import TableWriter, read_columns, read_table, table_format
+
+RESULT_COLUMNS = ["id", "text", "tag", "toxicity", "stereotypes", "factuality", "ml_prob", "overall"]
+
+def read_upload(data: bytes, name: str) -> pd.DataFrame:
+    """
+    id/text/tag frame of an uploaded file (CSV, Parquet or Arrow by its
+    name); missing id/tag columns are filled in. ValueError without a text column.
+    """
+    fmt = table_format(name)
+    buf = io.BytesIO(data)
+    if fmt == "csv":
+        df = pd.read_csv(buf)
+    else:
+        # columnar: decode only the columns used here
+        wanted = [c for c in ("id", "text", "tag") if c in read_columns(buf, fmt)]
+        buf.seek(0)
+        df = read_table(buf, wanted, fmt=fmt)
+    if "text" not in df.columns:
+        raise ValueError("CSV must contain a 'text' column.")
+    if "id" not in df.columns:
+        df["id"] = range(1, len(df) + 1)
+    if "tag" not in df.columns:
+        df["tag"] = ""
+    return df[["id", "text", "tag"]].fillna("")
+
+def result_frame(rows: pd.DataFrame, results: BatchScores, group_ids=None) -> pd.DataFrame:
+    """
+    rows' id/text/tag next to their analyze_batch(scores_only=True)
+    columns, in RESULT_COLUMNS order (then group_id, if given).
+    """
+    df = pd.DataFrame({
+        "id": rows["id"].to_numpy(),
+        "text": rows["text"].to_numpy(),
+        "tag": rows["tag"].to_numpy(),
+        **{k: results[k] for k in RESULT_COLUMNS[3:]},
+    }, columns=RESULT_COLUMNS)
+    if group_ids is not None:
+        df["group_id"] = group_ids
+    return df
+
+class BatchJob:
+    """
+    One uploaded batch, scored in a background thread chunk by chunk.
+    Each chunk's results go to a CSV part file under `directory` as soon
+    as it is scored, so the job itself only holds counters; rows() pages
+    through the parts. A finished job leaves a manifest, so a later
+    process (or another session) finds the results without rescoring.
+    """
+
+    def __init__(self, key: str, directory: Path):
+        self.key = key
+        self.dir = Path(directory)
+        self.total = 0
+        self.done = 0
+        self.state = "queued"  # queued -> running -> done | cancelled | error
+        self.error: Optional[str] = None
+        self.seconds = 0.0
+        self.dedup: Optional[dict] = None  # Deduper.stats() when duplicates are collapsed
+        self._cancel = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        manifest = self.dir / "manifest.json"
+        if manifest.exists():
+            try:
+                m = json.loads(manifest.read_text(encoding="utf-8"))
+                self.total = self.done = m["rows"]
+                self.seconds = m["seconds"]
+                self.dedup = m.get("dedup")
+                self.state = "done"
+            except (OSError, ValueError, KeyError):
+                pass
+
+    @property
+    def progress(self) -> float:
+        return self.done / self.total if self.total else (1.0 if self.state == "done" else 0.0)
+
+    @property
+    def active(self) -> bool:
+        return self.state in ("queued", "running")
+
+    def cancel(self) -> None:
+        """Stop after the chunk being scored; rows scored so far stay readable."""
+        self._cancel.set()
+
+    def _part(self, i: int) -> Path:
+        return self.dir / f"part-{i:05d}.csv"
+
+    def rows(self, start: int, n: int) -> pd.DataFrame:
+        """Result rows [start, start + n) scored so far, read from the part files."""
+        frames, chunk = [], self._chunk_rows()
+        end = min(start + n, self.done)
+        while chunk and start < end:
+            i, off = divmod(start, chunk)
+            take = min(end - start, chunk - off)
+            df = pd.read_csv(self._part(i), skiprows=range(1, off + 1), nrows=take,
+                             dtype={"text": str, "tag": str}, keep_default_na=False, na_values={"ml_prob": [""]})
+            frames.append(df)
+            start += take
+        return pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(columns=RESULT_COLUMNS)
+
+    def _chunk_rows(self) -> int:
+        meta = self.dir / "chunk_rows"
+        try:
+            return int(meta.read_text())
+        except (OSError, ValueError):
+            return 0
+
+    def export(self, fmt: str = "csv") -> Path:
+        """Whole result as one .csv or .parquet file (built once, after the job finished)."""
+        path = self.dir / f"results.{fmt}"
+        if not path.exists():
+            tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+            with TableWriter(tmp, fmt) as w:
+                chunk = self._chunk_rows()
+                if not (chunk and self.done):
+                    w.write(pd.DataFrame(columns=RESULT_COLUMNS))
+                for i in range(-(-self.done // chunk) if chunk else 0):
+                    w.write(self.rows(i * chunk, chunk))
+            os.replace(tmp, path)
+        return path
+
+    def _run(self, data: bytes, name: str, analyze, chunk_rows: int, lock: threading.Semaphore,
+             deduper: Deduper | None = None) -> None:
+        with lock:  # one batch scores at a time; the others wait as "queued"
+            t0 = time.perf_counter()
+            try:
+                if self._cancel.is_set():
+                    self.state = "cancelled"
+                    return
+                self.state = "running"
+                rows = read_upload(data, name)
+                del data
+                self.total = len(rows)
+                shutil.rmtree(self.dir, ignore_errors=True)
+                self.dir.mkdir(parents=True)
+                (self.dir / "chunk_rows").write_text(str(chunk_rows))
+                for i, start in enumerate(range(0, len(rows), chunk_rows)):
+                    if self._cancel.is_set():
+                        self.state = "cancelled"
+                        return
+                    piece = rows.iloc[start:start + chunk_rows]
+                    texts = piece["text"].astype(str).tolist()
+                    group_ids = None
+                    if deduper is None:
+                        results = analyze(texts)
+                    else:
+                        # one representative per group of exact copies within the chunk
+                        groups = deduper.group(texts)
+                        results = analyze([texts[j] for j in groups.reps]).take(groups.group)
+                        group_ids = piece["id"].to_numpy()[groups.cluster_reps][groups.cluster]
+                        self.dedup = deduper.stats()
+                    result_frame(piece, results, group_ids).to_csv(self._part(i), index=False)
+                    self.done += len(piece)
+                self.seconds = time.perf_counter() - t0
+                manifest = {"rows": self.total, "seconds": self.seconds}
+                if self.dedup is not None:
+                    manifest["dedup"] = self.dedup
+                (self.dir / "manifest.json").write_text(json.dumps(manifest), encoding="utf-8")
+                self.state = "done"
+            except Exception as e:
+                self.error = str(e)
+                self.state = "error"
+            finally:
+                self.seconds = time.perf_counter() - t0
+
+class BatchJobs:
+    """
+    Process-wide registry of upload batches, keyed by a hash of the file
+    content, the scoring options and the detectors version: the same
+    upload is scored once, however often the page reruns, and by
+    whichever session uploads it. Results live on disk under
+    get_cache_dir()/batches (the newest `max_jobs` are kept).
+
+    Chunks are scored in the job's thread. A `cache` (ResultCache) makes
+    analyze_batch build full results for every row to store them; leave
+    it out unless rows repeat across uploads. workers > 1 is opt-in: each
+    chunk then gets its own process pool (forked from the calling
+    process, warmed up per chunk), which only pays off for chunk_rows
+    well above PARALLEL_MIN_ROWS and is unsafe to fork from a threaded
+    server such as Streamlit.
+    """
+
+    def __init__(self, cache=None, workers: int = 1, chunk_rows: int = 5_000, max_jobs: int = 20,
+                 max_running: int = 1, directory: Path | None = None):
+        from .cache import detectors_fingerprint
+
+        self.cache = cache
+        self.workers = workers
+        self.chunk_rows = chunk_rows
+        self.max_jobs = max_jobs
+        self.dir = Path(directory) if directory else get_cache_dir() / "batches"
+        self._fingerprint = detectors_fingerprint()
+        self._jobs: Dict[str, BatchJob] = {}
+        self._lock = threading.Lock()
+        self._running = threading.Semaphore(max_running)
+
+    def key(self, data: bytes, cascade: bool = False, dedup: bool = False, near: float | None = None) -> str:
+        from .lexicon import get_matcher
+
+        opts = f"{int(cascade)}\0{int(dedup)}\0{near}" if dedup or near is not None else f"{int(cascade)}"
+        h = hashlib.sha256(f"{self._fingerprint}\0{get_matcher().version}\0{opts}\0".encode("utf-8"))
+        h.update(data)
+        return h.hexdigest()[:24]
+
+    def get(self, key: str) -> Optional[BatchJob]:
+        with self._lock:
+            job = self._jobs.get(key)
+            if job is None and (self.dir / key / "manifest.json").exists():
+                job = self._jobs[key] = BatchJob(key, self.dir / key)
+            return job
+
+    def submit(self, data: bytes, name: str, cascade: bool = False, key: str | None = None,
+               dedup: bool = False, near: float | None = None) -> BatchJob:
+        """
+        The job for this upload: an existing one (running or finished), else a new one started now.
+        dedup/near collapse copies within each chunk before scoring (see utils.dedup.Deduper).
+        """
+        key = key or self.key(data, cascade, dedup, near)
+        job = self.get(key)
+        if job is not None and job.state not in ("cancelled", "error"):
+            return job
+        return self._start(key, data, name, cascade, dedup, near)
+
+    def restart(self, key: str, data: bytes, name: str, cascade: bool = False, dedup: bool = False,
+                near: float | None = None) -> BatchJob:
+        return self._start(key, data, name, cascade, dedup, near)
+
+    def _start(self, key: str, data: bytes, name: str, cascade: bool, dedup: bool = False,
+               near: float | None = None) -> BatchJob:
+        from . import analyze_batch
+
+        def analyze(texts: List[str]) -> BatchScores:
+            return analyze_batch(texts, workers=self.workers, cache=self.cache, cascade=cascade, scores_only=True)
+
+        with self._lock:
+            job = self._jobs.get(key)
+            if job is not None and job.active:
+                return job
+            job = self._jobs[key] = BatchJob(key, self.dir / key)
+            job.state, job.total, job.done = "queued", 0, 0  # rescoring, even if an older manifest is on disk
+            job.dedup = None
+            deduper = Deduper(near) if dedup or near is not None else None
+            job._thread = threading.Thread(target=job._run,
+                                           args=(data, name, analyze, self.chunk_rows, self._running, deduper),
+                                           name=f"batch-{key[:8]}", daemon=True)
+            job._thread.start()
+            self._evict()
+        return job
+
+    def _evict(self) -> None:
+        # drop the oldest finished batches beyond max_jobs (caller holds the lock)
+        if not self.dir.exists():
+            return
+        dirs = sorted((p for p in self.dir.iterdir() if p.is_dir()), key=lambda p: p.stat().st_mtime, reverse=True)
+        for p in dirs[self.max_jobs:]:
+            job = self._jobs.get(p.name)
+            if job is not None and job.active:
+                continue
+            self._jobs.pop(p.name, None)
+            shutil.rmtree(p, ignore_errors=True)
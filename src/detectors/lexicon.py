@@ -0,0 +1,416 @@
+from __future__ import annotations
+import hashlib
+import json
+import mmap
+import os
+import re
+import struct
+import sys
+import threading
+import time
+import zlib
+from array import array
+from pathlib import Path
+from typing import Dict, Iterable, List, Mapping, Tuple
+
+from utils.domain import get_domain_terms
+from utils.profiling import timed
+from utils.storage import get_cache_dir
+from utils.text import Document
+
+# directory of <group>.txt lexicon files, or a compiled .idx file (tools/build_lexicons.py);
+# its terms are added to the built-in lexicons and picked up again when the files change
+LEXICON_ENV = "BIAS_DETECTOR_LEXICONS"
+RELOAD_INTERVAL = 2.0  # seconds between checks of the lexicon source for changes
+SENTENCE_BREAKS = ".!?"  # utils.text.sentence_spans splits after runs of these
+
+class LexiconMatcher:
+    """
+    Compiles several named term lists into one regex and finds every hit
+    in a single scan. Word-boundary rules match the detectors' original
+    per-term searches: (?<!\\w)term(?!\\w) on the lowercased text.
+    """
+
+    def __init__(self, lexicons: Mapping[str, Iterable[str]]):
+        self.groups: Dict[str, List[str]] = {g: list(terms) for g, terms in lexicons.items()}
+
+        # term -> groups it belongs to (a term may sit in several lists)
+        self._term_groups: Dict[str, List[str]] = {}
+        for g, terms in self.groups.items():
+            for w in terms:
+                if w and g not in self._term_groups.setdefault(w, []):
+                    self._term_groups[w].append(g)
+
+        # shorter terms that also match wherever a longer one does
+        # (same start, next char of the longer term is not a word char)
+        self._co_matches: Dict[str, List[str]] = {}
+        for w in self._term_groups:
+            self._co_matches[w] = [
+                w[:i] for i in range(len(w) - 1, 0, -1)
+                if w[:i] in self._term_groups and not re.match(r"\w", w[i])
+            ]
+
+        self.pattern = self._compile(self._term_groups)
+        # a term with sentence punctuation can match across a sentence boundary
+        self.crosses_sentences = any(c in w for w in self._term_groups for c in SENTENCE_BREAKS)
+        self.group_names = list(self.groups)
+        self.n_terms = len(self._term_groups)
+        self.version = lexicon_version(self.groups)
+
+    @staticmethod
+    def _compile(terms: Iterable[str]) -> re.Pattern | None:
+        trie: dict = {}
+        for w in terms:
+            node = trie
+            for ch in w:
+                node = node.setdefault(ch, {})
+            node[""] = True
+        if not trie:
+            return None
+        # zero-width lookahead so overlapping hits at later positions are still seen;
+        # the trie regex prefers the longest term at each start
+        return re.compile(r"(?<!\w)(?=(" + LexiconMatcher._trie_regex(trie) + "))")
+
+    @staticmethod
+    def _trie_regex(node: dict) -> str:
+        alts = [re.escape(ch) + LexiconMatcher._trie_regex(node[ch]) for ch in sorted(k for k in node if k)]
+        if "" in node:
+            alts.append(r"(?!\w)")  # last, so longer continuations win
+        if len(alts) == 1:
+            return alts[0]
+        return "(?:" + "|".join(alts) + ")"
+
+    def scan(self, text: str) -> Dict[str, Dict[str, int]]:
+        """
+        Return {group: {term: count}} for every group with at least one hit.
+        Counts are non-overlapping per term, same as re.findall on that term.
+        """
+        return self.scan_lowered(text.lower()) if text else {}
+
+    def scan_lowered(self, t: str) -> Dict[str, Dict[str, int]]:
+        """scan() of text that is already lowercased."""
+        out: Dict[str, Dict[str, int]] = {}
+        if self.pattern is None or not t:
+            return out
+        last_end: Dict[str, int] = {}
+        for m in self.pattern.finditer(t):
+            start = m.start()
+            longest = m.group(1)
+            for w in (longest, *self._co_matches[longest]):
+                if start < last_end.get(w, 0):
+                    continue
+                last_end[w] = start + len(w)
+                for g in self._term_groups[w]:
+                    counts = out.setdefault(g, {})
+                    counts[w] = counts.get(w, 0) + 1
+        return out
+
+def lexicon_version(lexicons: Mapping[str, Iterable[str]]) -> str:
+    """Content hash of a set of lexicons (order of terms/groups doesn't matter)."""
+    payload = json.dumps({g: sorted(set(v)) for g, v in lexicons.items()}, sort_keys=True)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:16]
+
+_WORD_RE = re.compile(r"\w+")
+_INDEX_MAGIC = b"BDLX"
+_INDEX_FORMAT = 1
+_HEADER = struct.Struct("<4sIIIII")  # magic, format, slots, entries, links, blob bytes
+_ENTRY = 5  # u32 fields per entry: key offset, key length, is-prefix, first link, end link
+_MEMO_MAX = 20_000  # per-process word -> entry memo in LexiconIndex.scan
+
+def _indexable(term: str) -> bool:
+    # index lookups start/end at \w runs, so a term must start and end with a word char
+    return bool(term) and bool(_WORD_RE.match(term[0])) and bool(_WORD_RE.match(term[-1]))
+
+def compile_index(lexicons: Mapping[str, Iterable[str]], path: Path, sources: dict | None = None) -> Path:
+    """
+    Write `lexicons` as a memory-mappable index file (atomically: written
+    to a temp file, then renamed over `path`, so readers see either the old
+    or the new index). Layout: an open-addressing hash table (crc32 of the
+    UTF-8 key, linear probing) over every term and every word-prefix of a
+    multi-word term, the entries, their group ids and the key bytes, then
+    a JSON trailer with group names, version and the few terms that don't
+    start/end with a word char (matched by a small LexiconMatcher instead).
+    """
+    groups = {g: [w.lower() for w in terms if w] for g, terms in lexicons.items()}
+    names = list(groups)
+    term_groups: Dict[str, List[int]] = {}
+    extra: Dict[str, List[str]] = {}
+    for gi, (g, terms) in enumerate(groups.items()):
+        for w in terms:
+            if not _indexable(w):
+                if w not in extra.setdefault(g, []):
+                    extra[g].append(w)
+            elif gi not in term_groups.setdefault(w, []):
+                term_groups[w].append(gi)
+
+    keys: Dict[str, bool] = {}  # key -> is a prefix of a longer term
+    for w in term_groups:
+        keys.setdefault(w, False)
+        for m in _WORD_RE.finditer(w):
+            if m.end() < len(w):
+                keys[w[:m.end()]] = True
+
+    n_slots = 1 << max(4, (2 * len(keys)).bit_length())  # load factor <= 0.5
+    mask = n_slots - 1
+    slots = array("I", bytes(4 * n_slots))
+    entries = array("I")
+    links = array("I")
+    blob = bytearray()
+    for i, (k, is_prefix) in enumerate(keys.items()):
+        b = k.encode("utf-8")
+        gids = term_groups.get(k, [])
+        entries.extend((len(blob), len(b), int(is_prefix), len(links), len(links) + len(gids)))
+        links.extend(gids)
+        blob += b
+        slot = zlib.crc32(b) & mask
+        while slots[slot]:
+            slot = (slot + 1) & mask
+        slots[slot] = i + 1
+    blob += bytes(-len(blob) % 4)
+
+    meta = {
+        "version": lexicon_version(groups),
+        "groups": names,
+        "extra": extra,
+        "n_terms": len(term_groups) + sum(len(v) for v in extra.values()),
+        "byteorder": sys.byteorder,
+        "sources": sources or {},
+    }
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    with open(tmp, "wb") as f:
+        f.write(_HEADER.pack(_INDEX_MAGIC, _INDEX_FORMAT, n_slots, len(keys), len(links), len(blob)))
+        for part in (slots, entries, links):
+            f.write(part.tobytes())
+        f.write(blob)
+        f.write(json.dumps(meta).encode("utf-8"))
+    os.replace(tmp, path)
+    return path
+
+class LexiconIndex:
+    """
+    Lexicon matcher over a compile_index() file, memory-mapped read-only:
+    worker processes opening the same file share its pages, and opening
+    it costs the same at 100 terms or 100k. scan() gives the same result
+    as LexiconMatcher.scan over the same lexicons. Starting at each run of
+    word chars in the text it looks up the run, then extends the key run
+    by run while it is a prefix of a longer term, so the cost grows with
+    the text, not the lexicon.
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        with open(self.path, "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            magic, fmt, n_slots, n_entries, n_links, n_blob = _HEADER.unpack_from(self._mm, 0)
+            if magic != _INDEX_MAGIC or fmt != _INDEX_FORMAT:
+                raise ValueError(f"{self.path} is not a lexicon index (format {_INDEX_FORMAT})")
+            mv = memoryview(self._mm)
+            off = _HEADER.size
+            self._slots = mv[off:off + 4 * n_slots].cast("I")
+            off += 4 * n_slots
+            self._entries = mv[off:off + 4 * _ENTRY * n_entries].cast("I")
+            off += 4 * _ENTRY * n_entries
+            self._links = mv[off:off + 4 * n_links].cast("I")
+            off += 4 * n_links
+            self._blob = mv[off:off + n_blob]
+            meta = json.loads(bytes(mv[off + n_blob:]).decode("utf-8"))
+        except (struct.error, ValueError, TypeError):
+            self._mm.close()
+            raise
+        if meta["byteorder"] != sys.byteorder:
+            raise ValueError(f"{self.path} was built on a {meta['byteorder']}-endian machine")
+        self._mask = n_slots - 1
+        self.group_names: List[str] = meta["groups"]
+        self.version: str = meta["version"]
+        self.n_terms: int = meta["n_terms"]
+        self.sources: dict = meta["sources"]
+        self._extra = LexiconMatcher(meta["extra"]) if meta["extra"] else None
+        # the key bytes hold every indexed term (see LexiconMatcher.crosses_sentences)
+        self.crosses_sentences = (any(self._mm.find(c.encode(), off, off + n_blob) >= 0
+                                      for c in SENTENCE_BREAKS)
+                                  or bool(self._extra and self._extra.crosses_sentences))
+        self._memo: Dict[str, int] = {}
+
+    def _lookup(self, key: str) -> int:
+        b = key.encode("utf-8")
+        slots, entries, blob = self._slots, self._entries, self._blob
+        slot = zlib.crc32(b) & self._mask
+        while True:
+            e = slots[slot]
+            if not e:
+                return -1
+            i = (e - 1) * _ENTRY
+            off, n = entries[i], entries[i + 1]
+            if n == len(b) and blob[off:off + n] == b:
+                return i
+            slot = (slot + 1) & self._mask
+
+    def scan(self, text: str) -> Dict[str, Dict[str, int]]:
+        """Same as LexiconMatcher.scan: {group: {term: count}}, non-overlapping per term."""
+        return self.scan_lowered(text.lower()) if text else {}
+
+    def scan_lowered(self, t: str) -> Dict[str, Dict[str, int]]:
+        out: Dict[str, Dict[str, int]] = {}
+        if not t:
+            return out
+        runs = [m.span() for m in _WORD_RE.finditer(t)]
+        entries, links, names = self._entries, self._links, self.group_names
+        memo, lookup = self._memo, self._lookup
+        last_end: Dict[str, int] = {}
+        for r, (start, end) in enumerate(runs):
+            w = t[start:end]
+            # single words repeat a lot (and mostly miss): memoize their lookups
+            i = memo.get(w)
+            if i is None:
+                if len(memo) >= _MEMO_MAX:
+                    memo.clear()
+                i = memo[w] = lookup(w)
+            while i >= 0:
+                if entries[i + 4] > entries[i + 3] and start >= last_end.get(w, 0):
+                    last_end[w] = end
+                    for gi in links[entries[i + 3]:entries[i + 4]]:
+                        counts = out.setdefault(names[gi], {})
+                        counts[w] = counts.get(w, 0) + 1
+                r += 1
+                if not entries[i + 2] or r == len(runs):
+                    break
+                end = runs[r][1]
+                w = t[start:end]
+                i = lookup(w)
+        if self._extra is not None:
+            for g, counts in self._extra.scan_lowered(t).items():
+                out.setdefault(g, {}).update(counts)
+        return out
+
+_MATCHER: LexiconMatcher | LexiconIndex | None = None
+_MATCHER_SOURCE: tuple | None = None
+_MATCHER_CHECKED = 0.0
+_MATCHER_LOCK = threading.Lock()
+
+def default_lexicons() -> Dict[str, List[str]]:
+    """All detector lexicons keyed by the flag group they report under."""
+    from .stereotypes import GROUP_TERMS
+    from .toxicity import TOXIC_WORDS
+    from .factuality import CLAIMY, HEDGES
+
+    lex = {g: list(v) for g, v in GROUP_TERMS.items()}
+    lex["toxicity"] = list(TOXIC_WORDS)
+    lex["claiminess"] = list(CLAIMY)
+    lex["hedges"] = list(HEDGES)
+    return lex
+
+def lexicon_source() -> Path | None:
+    p = os.environ.get(LEXICON_ENV)
+    return Path(p) if p else None
+
+def read_lexicon_file(path: Path) -> Tuple[List[str], str | None]:
+    """
+    Terms of one lexicon file (UTF-8, one term per line, lowercased; blank
+    lines and "#" comments skipped) and its declared "# version: ..." header.
+    """
+    terms, version = [], None
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if line.startswith("#"):
+                if version is None and line[1:].strip().lower().startswith("version:"):
+                    version = line.split(":", 1)[1].strip()
+                continue
+            if line:
+                terms.append(line.lower())
+    return terms, version
+
+def read_lexicon_dir(directory: Path) -> Tuple[Dict[str, List[str]], Dict[str, str | None]]:
+    """{group: terms} from <group>.txt files, plus each file's declared version."""
+    lex, versions = {}, {}
+    for path in sorted(Path(directory).glob("*.txt")):
+        lex[path.stem], versions[path.stem] = read_lexicon_file(path)
+    return lex, versions
+
+def all_lexicons(extra: Mapping[str, Iterable[str]] | None = None) -> Dict[str, List[str]]:
+    """
+    Built-in detector lexicons, then utils.domain.get_domain_terms(), then
+    `extra` (file-loaded): a file named after an existing group extends it,
+    any other file adds a new domain group.
+    """
+    lex = default_lexicons()
+    for source in (get_domain_terms(), extra or {}):
+        for g, terms in source.items():
+            acc = lex.setdefault(g, [])
+            seen = set(acc)
+            acc.extend(w for w in terms if w not in seen and not seen.add(w))
+    return lex
+
+def _source_signature(src: Path | None) -> tuple:
+    # cheap change check: names, sizes and mtimes of the lexicon files
+    if src is None:
+        return ()
+    try:
+        files = sorted(src.glob("*.txt")) if src.is_dir() else [src]
+        return tuple((p.name, st.st_size, st.st_mtime_ns, st.st_ino) for p in files for st in [p.stat()])
+    except OSError:
+        return ("missing",)
+
+def _build_matcher(src: Path | None) -> LexiconMatcher | LexiconIndex:
+    if src is None:
+        return LexiconMatcher(all_lexicons())
+    if not src.exists():
+        raise FileNotFoundError(f"{LEXICON_ENV}={src} does not exist")
+    if src.is_file():
+        return LexiconIndex(src)  # prebuilt index (tools/build_lexicons.py); swapped by renaming over it
+    extra, versions = read_lexicon_dir(src)
+    lex = all_lexicons(extra)
+    path = get_cache_dir() / "lexicons" / f"lexicons-{lexicon_version(lex)}.idx"
+    if not path.exists():
+        with timed("lexicon_compile"):
+            compile_index(lex, path, versions)
+        for old in path.parent.glob("lexicons-*.idx"):
+            if old != path:
+                old.unlink(missing_ok=True)  # other processes keep their open mappings
+    return LexiconIndex(path)
+
+def get_matcher() -> LexiconMatcher | LexiconIndex:
+    """
+    The matcher for all_lexicons() plus the files under LEXICON_ENV. The
+    source is re-checked every RELOAD_INTERVAL seconds; when it changed a
+    new matcher is built and swapped in (in-flight scans finish on the old one).
+    """
+    global _MATCHER, _MATCHER_SOURCE, _MATCHER_CHECKED
+    now = time.monotonic()
+    if _MATCHER is not None and now - _MATCHER_CHECKED < RELOAD_INTERVAL:
+        return _MATCHER
+    with _MATCHER_LOCK:
+        if _MATCHER is None or now - _MATCHER_CHECKED >= RELOAD_INTERVAL:
+            src = lexicon_source()
+            sig = (str(src), _source_signature(src))
+            if _MATCHER is None or sig != _MATCHER_SOURCE:
+                try:
+                    _MATCHER, _MATCHER_SOURCE = _build_matcher(src), sig
+                except (OSError, ValueError):
+                    if _MATCHER is None:
+                        raise
+                    # half-written or broken update: keep serving the last good one and,
+                    # with the old signature kept, retry at the next check
+            _MATCHER_CHECKED = time.monotonic()
+    return _MATCHER
+
+def lexicon_status() -> dict:
+    """Version and size of the lexicons in use, and where they were loaded from."""
+    m = get_matcher()
+    return {
+        "version": m.version,
+        "terms": m.n_terms,
+        "groups": len(m.group_names),
+        "source": str(lexicon_source()) if lexicon_source() else None,
+        "index": str(m.path) if isinstance(m, LexiconIndex) else None,
+    }
+
+def scan_lexicons(text: str | Document | None) -> Dict[str, Dict[str, int]]:
+    """One pass over `text` for all detector lexicons (memoized on a Document)."""
+    m = get_matcher()
+    if isinstance(text, Document):
+        return text.view(("lexicon", m.version), m.scan_lowered, text.lower)
+    return m.scan(text or "")
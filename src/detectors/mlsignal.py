@@ -1,12 +1,28 @@
-from models.baseline import predict_proba
+from typing import List, Sequence, Tuple, Union
+from models.baseline import predict_proba, predict_proba_batch
+from utils.text import Document
 
-def detect_mlsignal(text: str) -> dict:
+GAMMA = 0.75  # < 1.0 => boosts values above ~0.5 a bit
+
+def _score(p: float) -> float:
+    return round((p ** GAMMA) * 10.0, 2)
+
+def _from_proba(p: float) -> dict:
+    label = "biased_like" if p >= 0.5 else "neutral_like"
+    return {"score": _score(p), "proba": round(p, 4), "label": label}
+
+def detect_mlsignal(text: Union[str, Document]) -> dict:
     """
     ML probability from a tiny TF-IDF + LogisticRegression model.
     Map probability to a 0–10 score with a mild gamma to separate highs.
     """
-    p = predict_proba(text or "")
-    gamma = 0.75  # < 1.0 => boosts values above ~0.5 a bit
-    score = round((p ** gamma) * 10.0, 2)
-    label = "biased_like" if p >= 0.5 else "neutral_like"
-    return {"score": score, "proba": round(p, 4), "label": label}
+    return _from_proba(predict_proba(text or ""))
+
+def detect_mlsignal_batch(texts: Sequence[Union[str, Document]]) -> List[dict]:
+    """detect_mlsignal for many texts with a single model call."""
+    return [_from_proba(p) for p in predict_proba_batch(texts).tolist()]
+
+def mlsignal_scores_batch(texts: Sequence[Union[str, Document]]) -> Tuple[List[float], List[float]]:
+    """(scores, probas) as detect_mlsignal_batch gives them, without the per-row dicts."""
+    probas = predict_proba_batch(texts).tolist()
+    return [_score(p) for p in probas], [round(p, 4) for p in probas]
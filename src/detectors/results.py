@@ -0,0 +1,119 @@
+"""
+Compact results for scores_only=True: just the numbers, no flag lists
+and no nested dicts. analyze_text gives one Scores record (__slots__);
+analyze_batch gives a BatchScores, whose score columns are rows of one
+float64 block, so to_frame() hands pandas the arrays without copying.
+numpy is imported where a BatchScores is built, so `import detectors`
+stays light.
+mlsignal/ml_prob are NaN where the ML signal did not run (rules-only,
+or skipped by the cascade).
+"""
+
+from __future__ import annotations
+from typing import TYPE_CHECKING, Iterator, Sequence
+
+if TYPE_CHECKING:
+    import numpy as np
+
+SCORE_FIELDS = ("toxicity", "stereotypes", "factuality", "mlsignal", "ml_prob", "overall")
+_ROW = {name: i for i, name in enumerate(SCORE_FIELDS)}
+
+class Scores:
+    """One text's scores (0..10, ml_prob 0..1), as in the full result."""
+
+    __slots__ = ("input_len", "truncated", *SCORE_FIELDS)
+
+    def __init__(self, input_len: int, toxicity: float, stereotypes: float, factuality: float,
+                 mlsignal: float, ml_prob: float, overall: float, truncated: bool = False):
+        self.input_len = input_len
+        self.truncated = truncated
+        self.toxicity = toxicity
+        self.stereotypes = stereotypes
+        self.factuality = factuality
+        self.mlsignal = mlsignal
+        self.ml_prob = ml_prob
+        self.overall = overall
+
+    @classmethod
+    def from_result(cls, r: dict) -> Scores:
+        """The compact form of a full analyze_text result."""
+        ml = r.get("mlsignal")
+        return cls(r["input_len"], r["toxicity"]["score"], r["stereotypes"]["score"], r["factuality"]["score"],
+                   ml["score"] if ml else float("nan"), ml["proba"] if ml else float("nan"),
+                   r["overall"]["score"], bool(r.get("truncated")))
+
+    def as_dict(self) -> dict:
+        return {k: getattr(self, k) for k in self.__slots__}
+
+    def __repr__(self) -> str:
+        return "Scores(" + ", ".join(f"{k}={getattr(self, k)!r}" for k in self.__slots__) + ")"
+
+class BatchScores:
+    """
+    Scores for a batch, column-wise: `scores` is a (len(SCORE_FIELDS), n)
+    float64 block (batch["overall"] is a view of one row of it), plus
+    input_len (int64) and truncated (bool) arrays.
+    """
+
+    def __init__(self, scores: np.ndarray, input_len: np.ndarray, truncated: np.ndarray | None = None):
+        import numpy as np
+
+        self.scores = scores
+        self.input_len = input_len
+        self.truncated = truncated if truncated is not None else np.zeros(len(input_len), dtype=bool)
+
+    @classmethod
+    def empty(cls, n: int) -> BatchScores:
+        import numpy as np
+
+        return cls(np.full((len(SCORE_FIELDS), n), np.nan), np.zeros(n, dtype=np.int64))
+
+    @classmethod
+    def from_results(cls, results: Sequence[dict]) -> BatchScores:
+        out = cls.empty(len(results))
+        for i, r in enumerate(results):
+            s = Scores.from_result(r)
+            out.scores[:, i] = [getattr(s, k) for k in SCORE_FIELDS]
+            out.input_len[i] = s.input_len
+            out.truncated[i] = s.truncated
+        return out
+
+    @classmethod
+    def concat(cls, parts: Sequence[BatchScores]) -> BatchScores:
+        import numpy as np
+
+        if not parts:
+            return cls.empty(0)
+        return cls(np.concatenate([p.scores for p in parts], axis=1),
+                   np.concatenate([p.input_len for p in parts]), np.concatenate([p.truncated for p in parts]))
+
+    def __len__(self) -> int:
+        return len(self.input_len)
+
+    def __getitem__(self, key):
+        """A column by name ("overall", "input_len", ...) or one row as a Scores record."""
+        if isinstance(key, str):
+            return self.scores[_ROW[key]] if key in _ROW else getattr(self, key)
+        i = range(len(self))[key]
+        return Scores(int(self.input_len[i]), *self.scores[:, i].tolist(), truncated=bool(self.truncated[i]))
+
+    def __iter__(self) -> Iterator[Scores]:
+        cols = self.scores.tolist()
+        for i, (n, cut) in enumerate(zip(self.input_len.tolist(), self.truncated.tolist())):
+            yield Scores(n, *(c[i] for c in cols), truncated=cut)
+
+    def take(self, rows) -> BatchScores:
+        """Rows by index (e.g. Groups.group, to fan group results out to every row)."""
+        return BatchScores(self.scores[:, rows], self.input_len[rows], self.truncated[rows])
+
+    @property
+    def nbytes(self) -> int:
+        return self.scores.nbytes + self.input_len.nbytes + self.truncated.nbytes
+
+    def to_frame(self):
+        """pandas DataFrame (input_len, truncated, then SCORE_FIELDS) sharing these arrays' memory."""
+        import pandas as pd
+
+        meta = pd.DataFrame({"input_len": self.input_len, "truncated": self.truncated}, copy=False)
+        return pd.concat([meta, pd.DataFrame(self.scores.T, columns=list(SCORE_FIELDS), copy=False)],
+                         axis=1, copy=False)
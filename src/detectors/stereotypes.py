@@ -1,4 +1,6 @@
-import re
+from typing import Dict, Optional, Union
+from .lexicon import scan_lexicons
+from utils.text import Document
 
 # Tiny demo lexicon; expand later
 GROUP_TERMS = {
@@ -7,19 +9,19 @@ GROUP_TERMS = {
     "region": ["third-world", "western", "eastern", "developed", "underdeveloped"],
 }
 
-def detect_stereotypes(text: str) -> dict:
-    t = text.lower()
-    hits = []
-    for group, vocab in GROUP_TERMS.items():
-        found = []
-        for w in vocab:
-            if re.search(rf"(?<!\w){re.escape(w)}(?!\w)", t):
-                found.append(w)
-        if found:
-            hits.append({"group": group, "matches": sorted(set(found))})
-
+def stereotype_score(lex_hits: Dict[str, Dict[str, int]]) -> float:
     # ↑ slightly stronger per-match weight (was 2.0)
-    raw = sum(2.5 * len(h["matches"]) for h in hits)
-    score = round(min(raw, 10.0), 2)
+    raw = sum(2.5 * len(found) for found in (lex_hits.get(group) for group in GROUP_TERMS) if found)
+    return round(min(raw, 10.0), 2)
 
-    return {"score": score, "flags": hits}
+def detect_stereotypes(text: Union[str, Document],
+                       lex_hits: Optional[Dict[str, Dict[str, int]]] = None) -> dict:
+    # lex_hits: precomputed scan_lexicons(text), so analyze_text scans once
+    if lex_hits is None:
+        lex_hits = scan_lexicons(text)
+    hits = []
+    for group in GROUP_TERMS:
+        found = lex_hits.get(group)
+        if found:
+            hits.append({"group": group, "matches": sorted(found)})
+    return {"score": stereotype_score(lex_hits), "flags": hits}
@@ -1,29 +1,32 @@
-import re
+from typing import Dict, Optional, Union
+from .lexicon import scan_lexicons
+from utils.text import Document
 
 TOXIC_WORDS = [
     "stupid", "idiot", "dumb", "trash", "garbage", "hate", "shut up",
     "loser", "moron", "pathetic", "terrible person",
 ]
 
-def detect_toxicity(text: str) -> dict:
-    t = text.lower()
-
-    # collect all matches (so we can count repeats)
-    found_all = []
-    for w in TOXIC_WORDS:
-        found_all += re.findall(rf"(?<!\w){re.escape(w)}(?!\w)", t)
-
-    found_unique = sorted(set(found_all))
+def toxicity_score(lex_hits: Dict[str, Dict[str, int]]) -> float:
+    # per-term counts (so we can count repeats)
+    counts = lex_hits.get("toxicity", {})
 
     # base weight per unique hit; phrases get a bump
     raw = 0.0
-    for w in found_unique:
+    for w in sorted(counts):
         raw += 2.0 if " " in w else 1.2
 
     # small bonus for repeats beyond the first
-    repeats = max(0, len(found_all) - len(found_unique))
+    repeats = max(0, sum(counts.values()) - len(counts))
     raw += 0.3 * repeats
+    return round(min(raw, 10.0), 2)
+
+def detect_toxicity(text: Union[str, Document],
+                    lex_hits: Optional[Dict[str, Dict[str, int]]] = None) -> dict:
+    if lex_hits is None:
+        lex_hits = scan_lexicons(text)
 
-    score = round(min(raw, 10.0), 2)
+    found_unique = sorted(lex_hits.get("toxicity", {}))
+    score = toxicity_score(lex_hits)
     flags = [{"group": "toxicity", "matches": found_unique}] if found_unique else []
     return {"score": score, "flags": flags}
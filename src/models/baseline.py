@@ -1,8 +1,36 @@
 from __future__ import annotations
+import hashlib
+import json
+import os
+import threading
 from dataclasses import dataclass
-from typing import List, Tuple
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.linear_model import LogisticRegression
+from pathlib import Path
+from typing import TYPE_CHECKING, List, Sequence, Tuple
+
+from models.compiled import CompiledModel, compile_bundle, load_compiled
+from utils.profiling import timed
+from utils.storage import get_cache_dir
+from utils.text import Document, text_of
+
+# sklearn/joblib/numpy are imported inside the functions that need them, so
+# `import detectors` (and rules-only scoring) never pays for them
+if TYPE_CHECKING:
+    import numpy as np
+    from sklearn.feature_extraction.text import TfidfVectorizer
+    from sklearn.linear_model import LogisticRegression
+
+_VECT_PARAMS = {"ngram_range": (1, 2), "stop_words": "english", "min_df": 1}
+_CLF_PARAMS = {"max_iter": 1000, "n_jobs": None, "class_weight": "balanced"}
+
+# prebuilt artifacts shipped with the code (see tools/build_model.py)
+ARTIFACT_DIR = Path(__file__).resolve().parent / "artifacts"
+
+# path of a model trained elsewhere (e.g. make_eval --ooc --save-model);
+# when set it replaces the built-in model instead of training one
+MODEL_ENV = "BIAS_DETECTOR_MODEL"
+
+# "0" scores through sklearn instead of the compiled model (same probabilities)
+COMPILED_ENV = "BIAS_DETECTOR_COMPILED"
 
 # --- tiny in-repo dataset (balanced, small, fast) ---
 def _samples() -> Tuple[List[str], List[int]]:
@@ -38,26 +66,232 @@ def _samples() -> Tuple[List[str], List[int]]:
 class _ModelBundle:
     vect: TfidfVectorizer
     clf: LogisticRegression
+    fingerprint: str = ""
 
 _MODEL: _ModelBundle | None = None
+_MODEL_LOCK = threading.Lock()
+_WARMING: threading.Thread | None = None
+_COMPILED: CompiledModel | None = None
+_COMPILED_DONE = False
+_COMPILED_LOCK = threading.Lock()
+
+def model_fingerprint() -> str:
+    """Hash of training data + hyperparameters + sklearn version; names the artifact."""
+    from importlib import metadata  # ~20 ms; only needed once a model is wanted
+
+    ext = external_model_path()
+    if ext is not None:
+        # identity of the file itself; a retrained file gets a new fingerprint
+        try:
+            st = ext.stat()
+            ident = f"{ext.resolve()}:{st.st_size}:{st.st_mtime_ns}"
+        except OSError:
+            ident = f"{ext}:missing"
+        return "ext-" + hashlib.sha256(ident.encode("utf-8")).hexdigest()[:12]
+
+    X, y = _samples()
+    payload = json.dumps(
+        {"X": X, "y": y, "vect": _VECT_PARAMS, "clf": _CLF_PARAMS, "sklearn": metadata.version("scikit-learn")},
+        sort_keys=True,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:16]
+
+def external_model_path() -> Path | None:
+    p = os.environ.get(MODEL_ENV)
+    return Path(p) if p else None
+
+def artifact_name(fingerprint: str) -> str:
+    return f"baseline-{fingerprint}.joblib"
+
+def compiled_name(fingerprint: str) -> str:
+    return f"compiled-{fingerprint}.npz"
 
 def _train() -> _ModelBundle:
+    from sklearn.feature_extraction.text import TfidfVectorizer
+    from sklearn.linear_model import LogisticRegression
+
     X, y = _samples()
-    vect = TfidfVectorizer(ngram_range=(1,2), stop_words="english", min_df=1)
+    vect = TfidfVectorizer(**_VECT_PARAMS)
     Xv = vect.fit_transform(X)
-    clf = LogisticRegression(max_iter=1000, n_jobs=None, class_weight="balanced")
+    clf = LogisticRegression(**_CLF_PARAMS)
     clf.fit(Xv, y)
-    return _ModelBundle(vect=vect, clf=clf)
+    return _ModelBundle(vect=vect, clf=clf, fingerprint=model_fingerprint())
+
+def write_model(bundle: _ModelBundle, path: Path) -> Path:
+    """Write `bundle` atomically to `path` (any name; see MODEL_ENV)."""
+    import joblib
+
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    joblib.dump(bundle, tmp)
+    os.replace(tmp, path)
+    return path
+
+def save_model(bundle: _ModelBundle, directory: Path) -> Path:
+    """Write `bundle` atomically as <directory>/baseline-<fingerprint>.joblib; drop older versions."""
+    directory = Path(directory)
+    path = write_model(bundle, directory / artifact_name(bundle.fingerprint))
+    for old in directory.glob("baseline-*.joblib"):
+        if old != path:
+            old.unlink(missing_ok=True)
+    return path
+
+def save_compiled(model: CompiledModel, fingerprint: str, directory: Path) -> Path:
+    """Write `model` as <directory>/compiled-<fingerprint>.npz; drop older versions."""
+    directory = Path(directory)
+    path = model.save(directory / compiled_name(fingerprint))
+    for old in directory.glob("compiled-*.npz"):
+        if old != path:
+            old.unlink(missing_ok=True)
+    return path
+
+def _load(path: Path, fingerprint: str | None) -> _ModelBundle | None:
+    import joblib
+
+    try:
+        # numpy arrays (idf_, coef_) are memory-mapped rather than copied
+        bundle = joblib.load(path, mmap_mode="r")
+    except Exception:
+        return None
+    if not isinstance(bundle, _ModelBundle):
+        return None
+    if fingerprint is not None and bundle.fingerprint != fingerprint:
+        return None
+    return bundle
+
+def load_model_file(path: Path) -> _ModelBundle | None:
+    """Load a bundle written by write_model/save_model, whatever it was trained on."""
+    return _load(Path(path), None)
+
+def _load_or_train() -> _ModelBundle:
+    ext = external_model_path()
+    if ext is not None:
+        bundle = _load(ext, None)
+        if bundle is None:
+            raise RuntimeError(f"{MODEL_ENV}={ext} is not a readable model file")
+        return bundle
+
+    fp = model_fingerprint()
+    cache_dir = get_cache_dir() / "models"
+    for directory in (ARTIFACT_DIR, cache_dir):
+        path = directory / artifact_name(fp)
+        if path.exists():
+            bundle = _load(path, fp)
+            if bundle is not None:
+                return bundle
+
+    bundle = _train()
+    try:
+        save_model(bundle, cache_dir)
+    except OSError:
+        pass  # read-only cache: still usable, just trains again next process
+    return bundle
+
+def find_artifact() -> Path | None:
+    """Path of a usable artifact for the current fingerprint, if one exists on disk."""
+    ext = external_model_path()
+    if ext is not None:
+        return ext if ext.exists() else None
+    fp = model_fingerprint()
+    for directory in (ARTIFACT_DIR, get_cache_dir() / "models"):
+        path = directory / artifact_name(fp)
+        if path.exists():
+            return path
+    return None
 
 def get_model() -> _ModelBundle:
     global _MODEL
     if _MODEL is None:
-        _MODEL = _train()
+        with _MODEL_LOCK:  # concurrent first calls load/train once
+            if _MODEL is None:
+                with timed("model_load"):
+                    _MODEL = _load_or_train()
     return _MODEL
 
-def predict_proba(text: str) -> float:
+def _load_or_compile() -> CompiledModel | None:
+    fp = model_fingerprint()
+    cache_dir = get_cache_dir() / "models"
+    for directory in (ARTIFACT_DIR, cache_dir):
+        path = directory / compiled_name(fp)
+        if path.exists():
+            model = load_compiled(path)
+            if model is not None:
+                return model
+
+    bundle = get_model()
+    try:
+        model = compile_bundle(bundle.vect, bundle.clf)
+    except ValueError:
+        return None  # e.g. a hashed out-of-core model: keeps scoring through sklearn
+    try:
+        save_compiled(model, fp, cache_dir)
+    except OSError:
+        pass
+    return model
+
+def get_compiled() -> CompiledModel | None:
+    """
+    Compiled form of the current model (models.compiled), loaded from its
+    artifact or compiled once from the sklearn bundle; None when disabled
+    via COMPILED_ENV or the model can't be compiled.
+    """
+    global _COMPILED, _COMPILED_DONE
+    if not _COMPILED_DONE:
+        with _COMPILED_LOCK:
+            if not _COMPILED_DONE:
+                if os.environ.get(COMPILED_ENV, "1") != "0":
+                    with timed("compiled_load"):
+                        _COMPILED = _load_or_compile()
+                _COMPILED_DONE = True
+    return _COMPILED
+
+def warm_model() -> None:
+    """Load whatever scoring will use: the compiled model, else the sklearn bundle."""
+    if get_compiled() is None:
+        get_model()
+
+def warm_model_async() -> None:
+    """Start loading the model in a background thread (no-op if loaded or loading)."""
+    global _WARMING
+    with _MODEL_LOCK:
+        if _MODEL is not None or _COMPILED is not None or (_WARMING is not None and _WARMING.is_alive()):
+            return
+        _WARMING = threading.Thread(target=warm_model, name="model-warmup", daemon=True)
+        _WARMING.start()
+
+def model_status() -> dict:
+    """Model readiness without loading it (never blocks)."""
+    artifact = find_artifact()
+    return {
+        "ready": _MODEL is not None or _COMPILED is not None,
+        "loading": _WARMING is not None and _WARMING.is_alive(),
+        "artifact": str(artifact) if artifact else None,
+    }
+
+def predict_proba(text: str | Document) -> float:
     """Return P(class=1 | text) ∈ [0,1]."""
+    scorer = get_compiled()
+    if scorer is not None:
+        with timed("compiled_predict"):
+            return scorer.predict_proba(text or "")
+    return float(predict_proba_batch([text])[0])
+
+def predict_proba_batch(texts: Sequence[str | Document]) -> np.ndarray:
+    """
+    P(class=1 | text) for every text: one transform + one predict_proba call.
+    Documents reuse their memoized tokens in the compiled scorer.
+    """
+    import numpy as np
+
+    if len(texts) == 0:
+        return np.zeros(0, dtype=float)
+    scorer = get_compiled()
+    if scorer is not None:
+        with timed("compiled_predict"):
+            return scorer.predict_proba_batch([t or "" for t in texts])
     bundle = get_model()
-    X = bundle.vect.transform([text or ""])
-    proba = bundle.clf.predict_proba(X)[0, 1]
-    return float(proba)
+    with timed("tfidf_transform"):
+        X = bundle.vect.transform([text_of(t) for t in texts])
+    with timed("predict_proba"):
+        return bundle.clf.predict_proba(X)[:, 1]
@@ -0,0 +1,183 @@
+"""
+Compiled form of the baseline TF-IDF + linear model for fast scoring.
+
+A fitted _ModelBundle is reduced to what scoring actually uses: the
+vocabulary (term -> feature index), the IDF weights, the coefficient
+vector and intercept, plus the analyzer settings (token pattern,
+lowercasing, stop words, n-gram range). CompiledModel re-implements
+TfidfVectorizer.transform + predict_proba for one text in plain Python
+over those arrays, in the same arithmetic order as sklearn (counts in
+feature-index order, L2 norm, sparse dot, logistic), so probabilities
+match sklearn's to the last bit on the models tested. Loading and
+scoring need only NumPy (for the .npz file), never sklearn/scipy.
+"""
+
+from __future__ import annotations
+import json
+import math
+import os
+import re
+from pathlib import Path
+from typing import TYPE_CHECKING, Dict, List, Sequence
+
+from utils.text import Document
+
+if TYPE_CHECKING:
+    import numpy as np
+
+FORMAT_VERSION = 1
+
+class CompiledModel:
+    def __init__(self, terms: List[str], idf: "np.ndarray | None", coef: "np.ndarray", intercept: float,
+                 config: dict):
+        self.terms = terms
+        self.vocab: Dict[str, int] = {t: i for i, t in enumerate(terms)}
+        self.idf = idf
+        self.coef = coef
+        self.intercept = float(intercept)
+        self.config = config
+        self._token_re = re.compile(config["token_pattern"])
+        self._stop = frozenset(config["stop_words"])
+        self._lowercase = config["lowercase"]
+        self._ngram_min, self._ngram_max = config["ngram_range"]
+        self._binary = config["binary"]
+        self._sublinear = config["sublinear_tf"]
+        self._l2 = config["norm"] == "l2"
+        # memoryviews index to plain Python floats without copying the arrays
+        self._idf_v = memoryview(idf) if idf is not None else None
+        self._coef_v = memoryview(coef)
+
+    def _tokens(self, text: str | Document) -> List[str]:
+        if isinstance(text, Document):
+            # tokenized once per document (shared with any other user of this pattern)
+            return text.findall(self._token_re) if self._lowercase else self._token_re.findall(text.text)
+        return self._token_re.findall(text.lower() if self._lowercase else text)
+
+    def _counts(self, text: str | Document) -> Dict[int, int]:
+        # TfidfVectorizer's word analyzer: preprocess, tokenize, drop stop words, n-grams
+        tokens = self._tokens(text)
+        if self._stop:
+            tokens = [w for w in tokens if w not in self._stop]
+        vocab = self.vocab
+        counts: Dict[int, int] = {}
+        n_tok = len(tokens)
+        for n in range(self._ngram_min, min(self._ngram_max, n_tok) + 1):
+            for i in range(n_tok - n + 1):
+                j = vocab.get(tokens[i] if n == 1 else " ".join(tokens[i:i + n]))
+                if j is not None:
+                    counts[j] = counts.get(j, 0) + 1
+        return counts
+
+    def decision(self, text: str | Document) -> float:
+        counts = self._counts(text or "")
+        idx = sorted(counts)  # CSR rows are index-sorted before any arithmetic
+        vals = []
+        for j in idx:
+            v = 1.0 if self._binary else float(counts[j])
+            if self._sublinear:
+                v = math.log(v) + 1.0
+            if self._idf_v is not None:
+                v *= self._idf_v[j]
+            vals.append(v)
+        if self._l2:
+            sq = 0.0
+            for v in vals:
+                sq += v * v
+            if sq != 0.0:
+                norm = math.sqrt(sq)
+                vals = [v / norm for v in vals]
+        coef = self._coef_v
+        acc = 0.0
+        for j, v in zip(idx, vals):
+            acc += v * coef[j]
+        return acc + self.intercept
+
+    def predict_proba(self, text: str | Document) -> float:
+        """P(class=1 | text), as the sklearn bundle's predict_proba(...)[:, 1]."""
+        d = self.decision(text)
+        # expit; exp(-d) overflows to inf for very negative d, giving 0.0 like scipy
+        try:
+            return 1.0 / (1.0 + math.exp(-d))
+        except OverflowError:
+            return 0.0
+
+    def predict_proba_batch(self, texts: Sequence[str | Document]) -> "np.ndarray":
+        import numpy as np
+
+        return np.fromiter((self.predict_proba(t) for t in texts), dtype=float, count=len(texts))
+
+    def save(self, path: Path) -> Path:
+        """Write an .npz (terms, idf, coef, config); atomic like save_model."""
+        import numpy as np
+
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp.npz")
+        arrays = {
+            "terms": np.array("\n".join(self.terms)),
+            "coef": self.coef,
+            "intercept": np.array(self.intercept),
+            "config": np.array(json.dumps({**self.config, "format": FORMAT_VERSION})),
+        }
+        if self.idf is not None:
+            arrays["idf"] = self.idf
+        np.savez(tmp, **arrays)
+        os.replace(tmp, path)
+        return path
+
+def load_compiled(path: Path) -> CompiledModel | None:
+    """CompiledModel from save(); None if the file is missing, unreadable or another format version."""
+    import numpy as np
+
+    try:
+        with np.load(path, allow_pickle=False) as z:
+            config = json.loads(str(z["config"]))
+            if config.pop("format", None) != FORMAT_VERSION:
+                return None
+            joined = str(z["terms"])
+            terms = joined.split("\n") if joined else []
+            idf = np.ascontiguousarray(z["idf"], dtype=np.float64) if "idf" in z.files else None
+            coef = np.ascontiguousarray(z["coef"], dtype=np.float64)
+            intercept = float(z["intercept"])
+    except (OSError, ValueError, KeyError):
+        return None
+    return CompiledModel(terms, idf, coef, intercept, config)
+
+def compile_bundle(vect, clf) -> CompiledModel:
+    """
+    Compile a fitted TfidfVectorizer (word analyzer, default tokenizer and
+    preprocessor) and a binary linear classifier with a logistic link
+    (LogisticRegression, or SGDClassifier with log loss).
+    Raises ValueError for anything else (e.g. a HashingVectorizer model).
+    """
+    import numpy as np
+
+    if not hasattr(vect, "vocabulary_") or not hasattr(vect, "build_analyzer"):
+        raise ValueError(f"cannot compile vectorizer {type(vect).__name__}: no fitted vocabulary")
+    if vect.analyzer != "word" or vect.tokenizer is not None or vect.preprocessor is not None \
+            or vect.strip_accents is not None or vect.norm not in ("l2", None):
+        raise ValueError("only word analyzers with the default tokenizer/preprocessor and l2/no norm compile")
+    if getattr(clf, "coef_", None) is None or clf.coef_.shape[0] != 1:
+        raise ValueError(f"cannot compile classifier {type(clf).__name__}: needs a binary linear model")
+    if type(clf).__name__ == "SGDClassifier" and clf.loss != "log_loss":
+        raise ValueError("SGDClassifier needs loss='log_loss' for probabilities")
+    if type(clf).__name__ == "LogisticRegression" and getattr(clf, "multi_class", "auto") == "multinomial":
+        raise ValueError("multinomial LogisticRegression is not supported")
+
+    n = len(vect.vocabulary_)
+    terms = [""] * n
+    for t, i in vect.vocabulary_.items():
+        terms[i] = t
+    stop = vect.get_stop_words()
+    config = {
+        "token_pattern": vect.token_pattern,
+        "lowercase": bool(vect.lowercase),
+        "stop_words": sorted(stop) if stop else [],
+        "ngram_range": list(vect.ngram_range),
+        "binary": bool(vect.binary),
+        "sublinear_tf": bool(getattr(vect, "sublinear_tf", False)),
+        "norm": vect.norm,
+    }
+    idf = np.ascontiguousarray(vect.idf_, dtype=np.float64) if getattr(vect, "use_idf", False) else None
+    coef = np.ascontiguousarray(clf.coef_[0], dtype=np.float64)
+    return CompiledModel(terms, idf, coef, float(clf.intercept_[0]), config)
@@ -1,10 +1,13 @@
-from .scoring import combine_scores
-from . import rewrite, storage, domain, text
+from .scoring import combine_scores, combine_scores_batch, severity_band
+from . import rewrite, storage, domain, text, profiling
 
 __all__ = [
     "combine_scores",
+    "combine_scores_batch",
+    "severity_band",
     "rewwrite",
     "storage",
     "domain",
     "text",
+    "profiling",
 ]
@@ -0,0 +1,219 @@
+"""
+Batch-level duplicate collapsing before scoring.
+
+Rows are grouped by their exact text: callers score one representative
+per group and fan the result out to every row (Groups.fan_out), keeping
+row order, so collapsing never changes a score (lexicon matches depend
+on case-folded text and on exact spacing, so variants are scored on
+their own). normalized=True groups by Document.normalized instead, for
+scorers that ignore case and whitespace runs (make_eval's rules and
+TF-IDF tokenizer). With a `near` threshold, rows are also clustered for
+reporting (Groups.cluster): by normalized text (Document.normalized:
+lowercased, whitespace collapsed) and by MinHash over character
+shingles, where LSH bands propose candidates and a text joins a cluster
+when its estimated Jaccard similarity to the cluster's first text is at
+least `near`. Clusters only label rows; every distinct text is scored.
+"""
+
+from __future__ import annotations
+import time
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .text import Document
+
+_MULT = np.uint32(0x9E3779B1)
+
+def _lsh_shape(threshold: float, num_perm: int) -> Tuple[int, int]:
+    # (bands, rows per band) whose S-curve midpoint (1/b)^(1/r) is closest to the threshold
+    best = None
+    for r in range(1, num_perm + 1):
+        if num_perm % r:
+            continue
+        b = num_perm // r
+        err = abs((1.0 / b) ** (1.0 / r) - threshold)
+        if best is None or err < best[0]:
+            best = (err, b, r)
+    return best[1], best[2]
+
+class MinHasher:
+    """
+    MinHash signatures of character k-shingles: num_perm hash functions
+    a*h + b (mod 2^32, a odd) over a polynomial hash h of each shingle.
+    All arithmetic is uint32 and runs over a block of texts at once.
+    """
+
+    def __init__(self, num_perm: int = 64, shingle: int = 5, seed: int = 1, block_windows: int = 1 << 14):
+        rng = np.random.default_rng(seed)
+        self.num_perm = num_perm
+        self.shingle = shingle
+        self.block_windows = block_windows  # shingles hashed per block (memory: num_perm * 4 bytes each)
+        self._a = (rng.integers(0, 1 << 31, num_perm, dtype=np.uint32) * 2 + 1)[:, None]
+        self._b = rng.integers(0, 1 << 32, num_perm, dtype=np.uint32)[:, None]
+
+    def signatures(self, texts: Sequence[str]) -> np.ndarray:
+        """(len(texts), num_perm) uint32 signatures."""
+        k = self.shingle
+        out = np.empty((len(texts), self.num_perm), dtype=np.uint32)
+        data = [t.encode("utf-8").ljust(k, b"\0") for t in texts]  # shorter texts: one padded shingle
+        i = 0
+        while i < len(data):
+            j, windows = i, 0
+            while j < len(data) and (j == i or windows + len(data[j]) <= self.block_windows):
+                windows += len(data[j]) - k + 1
+                j += 1
+            out[i:j] = self._block(data[i:j])
+            i = j
+        return out
+
+    def _block(self, data: List[bytes]) -> np.ndarray:
+        k = self.shingle
+        buf = np.frombuffer(b"".join(data), dtype=np.uint8).astype(np.uint32)
+        lens = np.fromiter((len(d) for d in data), dtype=np.int64, count=len(data))
+        # polynomial hash of every k-byte window of the joined bytes (uint32 wraps)
+        h = np.zeros(len(buf) - k + 1, dtype=np.uint32)
+        for j in range(k):
+            h = h * np.uint32(257) + buf[j:len(buf) - k + 1 + j]
+        # keep only the windows inside one text
+        n_win = lens - k + 1
+        starts = np.concatenate(([0], np.cumsum(lens)[:-1]))
+        firsts = np.concatenate(([0], np.cumsum(n_win)[:-1]))
+        idx = np.arange(int(n_win.sum())) + np.repeat(starts - firsts, n_win)
+        h = h[idx] * _MULT
+        perm = self._a * h
+        perm += self._b
+        return np.minimum.reduceat(perm, firsts, axis=1).T
+
+class Groups:
+    """
+    Row -> group assignment for one batch; group i is represented by row
+    reps[i]. cluster/cluster_reps are the same for near-duplicate
+    clusters (equal to group/reps without a `near` threshold).
+    """
+
+    def __init__(self, group: np.ndarray, reps: List[int], exact: int, near: int, seconds: float,
+                 cluster: np.ndarray | None = None, cluster_reps: List[int] | None = None):
+        self.group = group
+        self.reps = reps
+        self.exact = exact  # rows folded into an earlier row with the same (normalized) text (rows = groups + exact)
+        self.near = near    # distinct texts that joined an earlier text's cluster (scored all the same)
+        self.seconds = seconds
+        self.cluster = group if cluster is None else cluster
+        self.cluster_reps = reps if cluster_reps is None else cluster_reps
+
+    def __len__(self) -> int:
+        return len(self.reps)
+
+    def fan_out(self, results: Sequence) -> list:
+        """Per-group results (in reps order) -> one per row, in row order."""
+        return [results[g] for g in self.group.tolist()]
+
+class Deduper:
+    """
+    Groups texts batch by batch and keeps running counts over all
+    batches (stats()). Groups are exact copies (normalized=True: copies
+    that differ only in case/whitespace); 0 < near <= 1 also
+    clusters rows whose normalized text is equal or whose estimated
+    Jaccard similarity (character shingles) to a cluster's first row
+    reaches `near`.
+    """
+
+    def __init__(self, near: Optional[float] = None, num_perm: int = 64, shingle: int = 5,
+                 normalized: bool = False):
+        if near is not None and not 0.0 < near <= 1.0:
+            raise ValueError(f"near-duplicate threshold must be in (0, 1], got {near}")
+        self.near = near
+        self.normalized = normalized
+        self.hasher = MinHasher(num_perm, shingle) if near is not None else None
+        self.bands, self.rows_per_band = _lsh_shape(near, num_perm) if near is not None else (0, 0)
+        rng = np.random.default_rng(2)
+        self._band_mult = rng.integers(0, 1 << 62, self.rows_per_band, dtype=np.uint64) * np.uint64(2) + np.uint64(1)
+        self.counts = {"rows": 0, "groups": 0, "exact_duplicates": 0, "near_duplicates": 0, "clusters": 0}
+        self.seconds = 0.0
+
+    def config(self) -> dict:
+        return {"groups_by": "normalized" if self.normalized else "text", "near": self.near, "num_perm": self.hasher.num_perm if self.hasher else None,
+                "shingle": self.hasher.shingle if self.hasher else None}
+
+    def group(self, texts: Sequence[str]) -> Groups:
+        t0 = time.perf_counter()
+        # exact pass: one group per distinct (normalized) text, in first-row order
+        by_text: Dict[str, int] = {}
+        row_key = np.empty(len(texts), dtype=np.int64)
+        firsts: List[int] = []
+        for i, text in enumerate(texts):
+            key = Document(text).normalized if self.normalized else text
+            u = by_text.get(key)
+            if u is None:
+                u = by_text[key] = len(firsts)
+                firsts.append(i)
+            row_key[i] = u
+        exact = len(texts) - len(firsts)
+        cluster, cluster_reps, near = None, None, 0
+
+        # near pass (reporting only): each distinct normalized text joins the first similar cluster or starts one
+        if self.hasher is not None and firsts:
+            by_norm: Dict[str, int] = {}
+            group_norm = np.empty(len(firsts), dtype=np.int64)
+            keys: List[str] = []
+            norm_firsts: List[int] = []
+            for u, i in enumerate(firsts):
+                key = Document(texts[i]).normalized
+                n = by_norm.get(key)
+                if n is None:
+                    n = by_norm[key] = len(keys)
+                    keys.append(key)
+                    norm_firsts.append(i)
+                group_norm[u] = n
+            sigs = self.hasher.signatures(keys)
+            # one 64-bit key per (text, band): the band's rows mixed with fixed odd multipliers
+            band_keys = (sigs.reshape(len(keys), self.bands, self.rows_per_band).astype(np.uint64)
+                         * self._band_mult).sum(axis=2, dtype=np.uint64)
+            band_keys += np.arange(self.bands, dtype=np.uint64)  # keep the bands' buckets apart
+            key_group = np.empty(len(keys), dtype=np.int64)
+            reps: List[int] = []
+            buckets: Dict[int, List[int]] = {}
+            for u, bands in enumerate(band_keys.tolist()):
+                g = self._match(sigs[u], bands, buckets, sigs, reps)
+                if g is None:
+                    g = len(reps)
+                    reps.append(u)
+                    for band in bands:
+                        buckets.setdefault(band, []).append(g)
+                key_group[u] = g
+            cluster = key_group[group_norm][row_key]
+            cluster_reps = [norm_firsts[u] for u in reps]
+            near = len(firsts) - len(reps)
+
+        seconds = time.perf_counter() - t0
+        self.counts["rows"] += len(texts)
+        self.counts["groups"] += len(firsts)
+        self.counts["exact_duplicates"] += exact
+        self.counts["near_duplicates"] += near
+        self.counts["clusters"] += len(cluster_reps) if cluster_reps is not None else len(firsts)
+        self.seconds += seconds
+        return Groups(row_key, firsts, exact, near, seconds, cluster, cluster_reps)
+
+    def _match(self, sig: np.ndarray, bands, buckets, sigs: np.ndarray, reps: List[int]) -> Optional[int]:
+        # first (oldest) candidate group whose representative is similar enough
+        seen = set()
+        for band in bands:
+            for g in buckets.get(band, ()):
+                if g in seen:
+                    continue
+                seen.add(g)
+                if np.count_nonzero(sigs[reps[g]] == sig) >= self.near * len(sig):
+                    return g
+        return None
+
+    def stats(self) -> dict:
+        n, groups = self.counts["rows"], self.counts["groups"]
+        return {**self.counts, "duplicate_rate": (n - groups) / n if n else 0.0, "seconds": self.seconds,
+                **self.config()}
+
+    def restore(self, stats: dict) -> None:
+        """Continue the running counts from an earlier stats() (e.g. a resumed run)."""
+        for k in self.counts:
+            self.counts[k] = int(stats.get(k, 0))
+        self.seconds = float(stats.get("seconds", 0.0))
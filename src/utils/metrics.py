@@ -0,0 +1,162 @@
+"""
+Binary classification metrics over score arrays, vectorized with NumPy.
+
+Every metric comes from one sweep: rows sorted by score (descending),
+cumulative true/false positives at each distinct score, i.e. at every
+threshold "positive if score >= t". ROC-AUC is the trapezoid area under
+those points (ties count half, as in the rank definition). For sweeping
+many score columns (e.g. a grid of combine weights), binned_sweep() uses
+a fixed histogram instead of a sort: O(rows) per column, thresholds at
+bin resolution.
+"""
+
+from __future__ import annotations
+from typing import Dict, List, Optional
+
+import numpy as np
+
+_trapezoid = getattr(np, "trapezoid", None) or np.trapz  # numpy < 2.0
+
+class Sweep:
+    """Cumulative counts at descending thresholds: row i covers every score >= thresholds[i]."""
+
+    def __init__(self, thresholds: np.ndarray, tp: np.ndarray, fp: np.ndarray, positives: int, negatives: int):
+        self.thresholds = thresholds
+        self.tp = tp.astype(np.int64)
+        self.fp = fp.astype(np.int64)
+        self.positives = int(positives)
+        self.negatives = int(negatives)
+
+    @property
+    def precision(self) -> np.ndarray:
+        pred = self.tp + self.fp
+        return np.divide(self.tp, pred, out=np.zeros(len(pred)), where=pred > 0)
+
+    @property
+    def recall(self) -> np.ndarray:
+        return self.tp / self.positives if self.positives else np.zeros(len(self.tp))
+
+    @property
+    def f1(self) -> np.ndarray:
+        denom = 2 * self.tp + self.fp + (self.positives - self.tp)
+        return np.divide(2 * self.tp, denom, out=np.zeros(len(denom)), where=denom > 0)
+
+    def auc(self) -> Optional[float]:
+        if not (self.positives and self.negatives):
+            return None  # undefined with a single class
+        tpr = np.concatenate(([0.0], self.tp / self.positives))
+        fpr = np.concatenate(([0.0], self.fp / self.negatives))
+        return float(_trapezoid(tpr, fpr))
+
+    def best(self) -> int:
+        """Index of the threshold with the highest F1 (the highest such threshold on ties)."""
+        return int(np.argmax(self.f1)) if len(self.tp) else -1
+
+    def at(self, threshold: float) -> int:
+        """Index covering exactly the scores >= threshold (-1: nothing predicted positive)."""
+        # thresholds are descending: count those >= threshold
+        return int(np.searchsorted(-self.thresholds, -threshold, side="right")) - 1
+
+    def point(self, i: int) -> Dict[str, float]:
+        tp, fp = (int(self.tp[i]), int(self.fp[i])) if i >= 0 else (0, 0)
+        fn, tn = self.positives - tp, self.negatives - fp
+        return {
+            "threshold": float(self.thresholds[i]) if i >= 0 else float("inf"),
+            "precision": tp / (tp + fp) if tp + fp else 0.0,
+            "recall": tp / self.positives if self.positives else 0.0,
+            "f1": 2 * tp / (2 * tp + fp + fn) if tp + fp + fn else 0.0,
+            "confusion": {"tp": tp, "fp": fp, "fn": fn, "tn": tn},
+        }
+
+    def point_at(self, threshold: float) -> Dict[str, float]:
+        """point() for "positive if score >= threshold", reported at that threshold itself."""
+        return {**self.point(self.at(threshold)), "threshold": float(threshold)}
+
+    def curve(self, points: int = 21) -> List[List[float]]:
+        """[threshold, precision, recall, f1] at up to `points` thresholds spread over the sweep."""
+        if not len(self.tp):
+            return []
+        idx = np.unique(np.linspace(0, len(self.tp) - 1, min(points, len(self.tp))).round().astype(int))
+        p, r, f = self.precision[idx], self.recall[idx], self.f1[idx]
+        return [[round(float(self.thresholds[i]), 6), round(float(a), 4), round(float(b), 4), round(float(c), 4)]
+                for i, a, b, c in zip(idx, p, r, f)]
+
+def sweep(scores: np.ndarray, labels: np.ndarray) -> Sweep:
+    """Exact sweep over every distinct score. NaN scores are left out."""
+    scores = np.asarray(scores, dtype=float)
+    labels = np.asarray(labels).astype(bool)
+    keep = ~np.isnan(scores)
+    if not keep.all():
+        scores, labels = scores[keep], labels[keep]
+    order = np.argsort(-scores, kind="stable")
+    s, y = scores[order], labels[order]
+    tp = np.cumsum(y)
+    fp = np.arange(1, len(y) + 1) - tp
+    last = np.flatnonzero(np.r_[s[1:] != s[:-1], True]) if len(s) else np.zeros(0, dtype=int)
+    pos = int(tp[-1]) if len(tp) else 0
+    return Sweep(s[last], tp[last], fp[last], pos, len(y) - pos)
+
+def binned_sweep(scores: np.ndarray, labels: np.ndarray, bins: int = 10_000, lo: float = 0.0,
+                 hi: float = 1.0) -> Sweep:
+    """
+    Sweep at `bins` evenly spaced thresholds over [lo, hi] (scores outside
+    are clipped): two bincounts instead of a sort. Threshold i is the lower
+    edge of its bin, so results match sweep() up to the bin width.
+    """
+    scores = np.asarray(scores, dtype=float)
+    labels = np.asarray(labels).astype(bool)
+    idx = np.clip(((scores - lo) * (bins / (hi - lo))).astype(np.int64), 0, bins - 1)
+    total = np.bincount(idx, minlength=bins)[::-1]
+    pos = np.bincount(idx[labels], minlength=bins)[::-1]
+    tp = np.cumsum(pos)
+    fp = np.cumsum(total) - tp
+    edges = lo + np.arange(bins - 1, -1, -1) * ((hi - lo) / bins)
+    n_pos = int(tp[-1]) if bins else 0
+    return Sweep(edges, tp, fp, n_pos, len(scores) - n_pos)
+
+def weighted_sweeps(components: np.ndarray, labels: np.ndarray, weights: np.ndarray,
+                    bins: int = 10_000) -> List[Sweep]:
+    """
+    binned_sweep(components @ w) for every row w of `weights`, with
+    components in [0, 1] and each w summing to 1. Components are first
+    quantized to the bin width and rows collapsed into distinct
+    (components, label) groups, so each weight vector costs O(groups)
+    rather than O(rows).
+    """
+    comps = np.clip(np.asarray(components, dtype=float), 0.0, 1.0)
+    labels = np.asarray(labels).astype(np.int64)
+    q = np.rint(comps * bins).astype(np.int64)
+    radix = (bins + 1) ** np.arange(q.shape[1], dtype=np.int64)
+    keys, counts = np.unique((q @ radix) * 2 + labels, return_counts=True)
+    y = keys % 2
+    codes = keys // 2
+    groups = (codes[:, None] // radix) % (bins + 1)  # back to quantized components, one row per group
+
+    out = []
+    for w in np.asarray(weights, dtype=float):
+        # scores are sum(w * q) / bins; the epsilon keeps exact bin edges from rounding down
+        idx = np.minimum(np.floor(groups @ w + 1e-9).astype(np.int64), bins - 1)
+        hist = np.bincount(idx * 2 + y, weights=counts, minlength=2 * bins).reshape(bins, 2)[::-1]
+        tp = np.cumsum(hist[:, 1]).astype(np.int64)
+        fp = np.cumsum(hist[:, 0]).astype(np.int64)
+        edges = np.arange(bins - 1, -1, -1) / bins
+        out.append(Sweep(edges, tp, fp, int(tp[-1]), int(fp[-1])))
+    return out
+
+def summarize(sw: Sweep, points: int = 21) -> dict:
+    """Compact report for one score: AUC, best-F1 operating point (with confusion matrix), PR curve."""
+    return {"auc": sw.auc(), "best_f1": sw.point(sw.best()), "curve": sw.curve(points)}
+
+def weight_grid(n: int, step: float) -> np.ndarray:
+    """All weight vectors of length n with entries in multiples of `step` summing to 1."""
+    k = int(round(1 / step))
+    rows: List[List[int]] = []
+
+    def fill(prefix: List[int], left: int) -> None:
+        if len(prefix) == n - 1:
+            rows.append(prefix + [left])
+            return
+        for v in range(left + 1):
+            fill(prefix + [v], left - v)
+    fill([], k)
+    return np.array(rows, dtype=float) / k
@@ -0,0 +1,132 @@
+"""
+Pre-fork worker processes (POSIX only).
+
+The parent loads everything expensive once (model, compiled lexicons,
+imports), then forks workers that share those pages copy-on-write
+instead of each building its own copy. gc.freeze() before forking keeps
+the collector from touching (and so copying) the parent's objects.
+Workers report readiness and memory through a pipe; the parent restarts
+workers that die and stops them all on SIGINT/SIGTERM.
+"""
+
+from __future__ import annotations
+import gc
+import json
+import os
+import select
+import signal
+import time
+from typing import Callable, Dict, Optional
+
+def fork_supported() -> bool:
+    return hasattr(os, "fork")
+
+def memory_usage(pid: int | str = "self") -> Dict[str, float]:
+    """
+    rss/pss/uss in MB. pss splits shared pages between the processes
+    mapping them, so summing pss over workers gives their real footprint.
+    Linux only (smaps_rollup); elsewhere just this process's peak rss.
+    """
+    try:
+        fields = {}
+        with open(f"/proc/{pid}/smaps_rollup") as f:
+            for line in f:
+                parts = line.split()
+                if len(parts) == 3 and parts[2] == "kB":
+                    fields[parts[0].rstrip(":")] = int(parts[1]) / 1024
+        uss = fields.get("Private_Clean", 0.0) + fields.get("Private_Dirty", 0.0)
+        return {"rss_mb": fields.get("Rss", 0.0), "pss_mb": fields.get("Pss", 0.0), "uss_mb": uss}
+    except OSError:
+        import resource
+        import sys
+
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return {"rss_mb": peak / (1 << 20 if sys.platform == "darwin" else 1024)}
+
+def prefork(workers: int, child: Callable[[int, Callable[[dict], None]], None],
+            on_ready: Optional[Callable[[dict], None]] = None, respawn: bool = True) -> None:
+    """
+    Fork `workers` processes running child(index, ready). The child calls
+    ready(info) once it can serve; the parent passes info (plus pid, index
+    and ready_s, seconds since the fork) to on_ready, and ready returns
+    the same dict to the child. Returns when the parent is
+    interrupted or, with respawn=False, when every worker has exited.
+    """
+    if not fork_supported():
+        raise RuntimeError("pre-fork workers need os.fork (POSIX)")
+    read_fd, write_fd = os.pipe()
+    children: Dict[int, int] = {}  # pid -> worker index
+
+    def spawn(i: int) -> None:
+        t0 = time.perf_counter()
+        pid = os.fork()
+        if pid == 0:
+            os.close(read_fd)
+            signal.signal(signal.SIGINT, signal.SIG_DFL)
+            signal.signal(signal.SIGTERM, signal.SIG_DFL)
+            # no gc.unfreeze() here: the inherited objects stay out of collections (and uncopied)
+
+            def ready(info: dict) -> dict:
+                msg = {**info, "pid": os.getpid(), "index": i, "ready_s": time.perf_counter() - t0}
+                os.write(write_fd, (json.dumps(msg) + "\n").encode("utf-8"))
+                return msg
+
+            code = 0
+            try:
+                child(i, ready)
+            except BaseException:
+                import traceback
+                traceback.print_exc()
+                code = 1
+            finally:
+                os._exit(code)
+        children[pid] = i
+
+    stopping = False
+
+    def stop(signum, frame):
+        nonlocal stopping
+        stopping = True
+
+    old = {s: signal.signal(s, stop) for s in (signal.SIGINT, signal.SIGTERM)}
+    gc.collect()
+    gc.freeze()  # parent objects move to a permanent generation: no GC writes to shared pages
+    try:
+        for i in range(workers):
+            spawn(i)
+        buf = b""
+        while children and not stopping:
+            try:
+                readable, _, _ = select.select([read_fd], [], [], 0.5)
+            except InterruptedError:
+                continue
+            if readable:
+                buf += os.read(read_fd, 65536)
+                while b"\n" in buf:
+                    line, buf = buf.split(b"\n", 1)
+                    if on_ready is not None:
+                        on_ready(json.loads(line))
+            while children:
+                pid, status = os.waitpid(-1, os.WNOHANG)
+                if pid == 0:
+                    break
+                i = children.pop(pid)
+                if respawn and not stopping:
+                    print(f"[prefork] worker {i} (pid {pid}) exited with status {status}; restarting")
+                    spawn(i)
+    finally:
+        for pid in children:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+        for pid in list(children):
+            try:
+                os.waitpid(pid, 0)
+            except ChildProcessError:
+                pass
+        for s, h in old.items():
+            signal.signal(s, h)
+        gc.unfreeze()
+        os.close(read_fd)
+        os.close(write_fd)
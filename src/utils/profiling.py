@@ -0,0 +1,133 @@
+"""
+Opt-in per-stage timing for the analysis pipeline.
+
+Off by default: `timed(stage)` then returns a shared no-op context, so
+the cost is one global lookup per stage. `enable(sink)` turns it on;
+every finished stage is passed to the sink as (stage, seconds).
+
+Sinks:
+  InMemorySink  counters, total time and latency histograms per stage;
+                snapshot() for dicts, to_prometheus_text() for a text dump
+  LogSink       one log line per stage timing
+"""
+
+from __future__ import annotations
+import bisect
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+from typing import TYPE_CHECKING, Dict, Iterator, List, Optional, Protocol
+
+if TYPE_CHECKING:
+    import logging
+
+# histogram upper bounds in seconds (Prometheus-style, cumulative on export)
+BUCKETS = (1e-5, 2.5e-5, 5e-5, 1e-4, 2.5e-4, 5e-4, 1e-3, 2.5e-3, 5e-3, 1e-2, 2.5e-2, 5e-2, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+class Sink(Protocol):
+    def observe(self, stage: str, seconds: float) -> None: ...
+
+class InMemorySink:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.count: Dict[str, int] = {}
+        self.total: Dict[str, float] = {}
+        self.max: Dict[str, float] = {}
+        self.buckets: Dict[str, List[int]] = {}  # per-bucket (non-cumulative), last = +Inf
+
+    def observe(self, stage: str, seconds: float) -> None:
+        i = bisect.bisect_left(BUCKETS, seconds)
+        with self._lock:
+            if stage not in self.count:
+                self.count[stage] = 0
+                self.total[stage] = 0.0
+                self.max[stage] = 0.0
+                self.buckets[stage] = [0] * (len(BUCKETS) + 1)
+            self.count[stage] += 1
+            self.total[stage] += seconds
+            self.max[stage] = max(self.max[stage], seconds)
+            self.buckets[stage][i] += 1
+
+    def _quantile(self, stage: str, q: float) -> float:
+        # upper bound of the bucket holding the q-th observation
+        target, seen = q * self.count[stage], 0
+        for i, n in enumerate(self.buckets[stage]):
+            seen += n
+            if seen >= target:
+                return BUCKETS[i] if i < len(BUCKETS) else self.max[stage]
+        return self.max[stage]
+
+    def snapshot(self) -> Dict[str, dict]:
+        with self._lock:
+            return {
+                s: {
+                    "count": self.count[s],
+                    "total_ms": round(self.total[s] * 1e3, 3),
+                    "mean_ms": round(self.total[s] / self.count[s] * 1e3, 4),
+                    "p50_ms_le": round(self._quantile(s, 0.5) * 1e3, 4),
+                    "p99_ms_le": round(self._quantile(s, 0.99) * 1e3, 4),
+                    "max_ms": round(self.max[s] * 1e3, 4),
+                }
+                for s in sorted(self.count)
+            }
+
+    def to_prometheus_text(self, prefix: str = "bias_detector_stage") -> str:
+        lines = [
+            f"# HELP {prefix}_seconds Wall time per pipeline stage.",
+            f"# TYPE {prefix}_seconds histogram",
+        ]
+        with self._lock:
+            for s in sorted(self.count):
+                cum = 0
+                for bound, n in zip((*BUCKETS, float("inf")), self.buckets[s]):
+                    cum += n
+                    le = "+Inf" if bound == float("inf") else repr(bound)
+                    lines.append(f'{prefix}_seconds_bucket{{stage="{s}",le="{le}"}} {cum}')
+                lines.append(f'{prefix}_seconds_sum{{stage="{s}"}} {self.total[s]!r}')
+                lines.append(f'{prefix}_seconds_count{{stage="{s}"}} {self.count[s]}')
+        return "\n".join(lines) + "\n"
+
+    def reset(self) -> None:
+        with self._lock:
+            self.count.clear(); self.total.clear(); self.max.clear(); self.buckets.clear()
+
+class LogSink:
+    def __init__(self, logger: Optional[logging.Logger] = None, level: int = 20):  # logging.INFO
+        import logging  # not at module level: keeps `import detectors` lean
+
+        self.logger = logger or logging.getLogger("bias_detector.profile")
+        self.level = level
+
+    def observe(self, stage: str, seconds: float) -> None:
+        self.logger.log(self.level, "stage=%s ms=%.3f", stage, seconds * 1e3)
+
+_SINK: Optional[Sink] = None
+_NULL = nullcontext()
+
+def enable(sink: Optional[Sink] = None) -> Sink:
+    """Start recording stage timings into `sink` (a new InMemorySink by default)."""
+    global _SINK
+    _SINK = sink if sink is not None else InMemorySink()
+    return _SINK
+
+def disable() -> None:
+    global _SINK
+    _SINK = None
+
+def active() -> Optional[Sink]:
+    return _SINK
+
+@contextmanager
+def _timer(sink: Sink, stage: str) -> Iterator[None]:
+    t0 = time.perf_counter()
+    try:
+        yield
+    finally:
+        sink.observe(stage, time.perf_counter() - t0)
+
+def timed(stage: str):
+    """`with timed("stage"):` records wall time when enabled, no-op otherwise."""
+    sink = _SINK
+    if sink is None:
+        return _NULL
+    return _timer(sink, stage)
@@ -1,48 +1,65 @@
 # src/utils/rewrite.py
 from __future__ import annotations
 import re
+from typing import Iterable, List
 
+from .text import Document, text_of
+
+# whole-word patterns (\b is added around the combined pattern below)
 _SOFT_MAP = {
-    r"\bidiot\b": "person",
-    r"\bstupid\b": "unhelpful",
-    r"\bdumb\b": "unhelpful",
-    r"\bshut\s+up\b": "please be quiet",
-    r"\bhate\b": "dislike",
+    r"idiot": "person",
+    r"stupid": "unhelpful",
+    r"dumb": "unhelpful",
+    r"shut\s+up": "please be quiet",
+    r"hate": "dislike",
 }
+_INTENSIFIERS = r"so|very|extremely|really"
+
+# Three scans instead of one re.sub per rule:
+#   pass 1: collapse !!/?? runs, reduce 3+ repeated words to 2
+#   pass 2: softeners, intensifiers, ALL-CAPS lowering
+#   then whitespace collapse + strip
+# Pass 1 must finish first: a reduced repeat can form a new softener match
+# with the following word ("shut shut shut up" -> "shut please be quiet").
+# Within pass 2 the softeners are listed before the caps rule, so a caps
+# word that is also a softener is replaced, as when caps were lowered first.
+# Possessive runs (\w++, \s++) match the same text but never hand characters
+# back, so a long run of words or spaces is not re-split on failure.
+_PASS1 = re.compile(r"(!{2,})|(\?{2,})|\b(\w++)(?:\s++\3){2,}\b", re.IGNORECASE)
+
+_PASS2_REPL = [*_SOFT_MAP.values(), "quite", None]  # None: lowercase the match
+_PASS2 = re.compile(
+    r"\b(?:" + "|".join(f"({p})" for p in (*_SOFT_MAP, _INTENSIFIERS, r"(?-i:[A-Z]{3,})")) + r")\b",
+    re.IGNORECASE,
+)
 
-def _collapse_punct(s: str) -> str:
-    s = re.sub(r"!{2,}", "!", s)
-    s = re.sub(r"\?{2,}", "?", s)
-    return s
-
-def _limit_repeated_words(s: str) -> str:
-    # Reduce 3+ consecutive repeats to 2, keeping spaces
-    # Example: "idiot idiot idiot" -> "idiot idiot"
-    def repl(m: re.Match) -> str:
-        word = m.group(1)
-        return f"{word} {word}"
-    return re.sub(r"\b(\w+)(?:\s+\1){2,}\b", repl, s, flags=re.IGNORECASE)
-
-def _soften_all_caps(s: str) -> str:
-    return re.sub(r"\b[A-Z]{3,}\b", lambda m: m.group(0).lower(), s)
-
-def _apply_lexical_softeners(s: str) -> str:
-    for pat, repl in _SOFT_MAP.items():
-        s = re.sub(pat, repl, s, flags=re.IGNORECASE)
-    s = re.sub(r"\b(so|very|extremely|really)\b", "quite", s, flags=re.IGNORECASE)
-    return s
-
-def rewrite_text(text: str) -> str:
+def _pass1_repl(m: re.Match) -> str:
+    i = m.lastindex
+    if i == 1:
+        return "!"
+    if i == 2:
+        return "?"
+    # "idiot idiot idiot" -> "idiot idiot", keeping the first word's case
+    word = m.group(3)
+    return f"{word} {word}"
+
+def _pass2_repl(m: re.Match) -> str:
+    repl = _PASS2_REPL[m.lastindex - 1]
+    return m.group(0).lower() if repl is None else repl
+
+def rewrite_text(text: str | Document) -> str:
+    text = text_of(text)
     if not text:
         return ""
 
-    out = text
-    out = _collapse_punct(out)
-    out = _limit_repeated_words(out)
-    out = _soften_all_caps(out)
-    out = _apply_lexical_softeners(out)
-    out = re.sub(r"\s+", " ", out).strip()
+    out = _PASS1.sub(_pass1_repl, text)
+    out = _PASS2.sub(_pass2_repl, out)
+    out = " ".join(out.split())  # same as re.sub(r"\s+", " ", out).strip()
 
     if out and out[0].islower():
         out = out[0].upper() + out[1:]
     return out
+
+def rewrite_batch(texts: Iterable[str | Document]) -> List[str]:
+    """rewrite_text over many texts (e.g. a CSV column); None/NaN-like empties give ""."""
+    return [rewrite_text(t) if isinstance(t, (str, Document)) else "" for t in texts]
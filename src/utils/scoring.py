@@ -1,25 +1,72 @@
+from __future__ import annotations
+from typing import TYPE_CHECKING, Mapping
+
+if TYPE_CHECKING:
+    import numpy as np
+
+BASE_WEIGHTS = {
+    "toxicity": 0.40,     # ↑
+    "stereotypes": 0.30,  # =
+    "factuality": 0.10,   # ↓
+    "mlsignal": 0.20,     # =
+}
+
+def _norm_weights(keys) -> dict:
+    used = {k: BASE_WEIGHTS[k] for k in keys if k in BASE_WEIGHTS}
+    total_w = sum(used.values())
+    return {k: w / total_w for k, w in used.items()}
+
 def combine_scores(parts: dict) -> dict:
     """
     Weighted average over whichever detectors are present.
     Scores are on 0..10; weights renormalize to sum=1 over present keys.
     """
-    base_weights = {
-        "toxicity": 0.40,     # ↑
-        "stereotypes": 0.30,  # =
-        "factuality": 0.10,   # ↓
-        "mlsignal": 0.20,     # =
-    }
-
-    used = {k: base_weights[k] for k in parts.keys() if k in base_weights}
-    if not used:
+    norm_w = _norm_weights(parts.keys())
+    if not norm_w:
         return {"score": 0.0, "weights": {}, "components": parts}
 
-    total_w = sum(used.values())
-    norm_w = {k: w / total_w for k, w in used.items()}
-
     score = 0.0
     for k, w in norm_w.items():
         score += w * float(parts.get(k, 0.0))
 
     score = round(min(score, 10.0), 2)
     return {"score": score, "weights": norm_w, "components": parts}
+
+# severity bands on the overall score (lower bound, label), highest first
+SEVERITY_BANDS = ((6.5, "HIGH"), (2.5, "MODERATE"), (float("-inf"), "LOW"))
+
+def severity_band(score: float) -> str:
+    for lower, label in SEVERITY_BANDS:
+        if score >= lower:
+            return label
+    return SEVERITY_BANDS[-1][1]
+
+def score_bounds(parts: dict, pending) -> tuple:
+    """
+    (lowest, highest) overall score combine_scores can still give once the
+    `pending` detectors (scores 0..10, not yet run) are added to `parts`.
+    """
+    lo = combine_scores({**parts, **{k: 0.0 for k in pending}})["score"]
+    hi = combine_scores({**parts, **{k: 10.0 for k in pending}})["score"]
+    return lo, hi
+
+def combine_scores_batch(parts: Mapping[str, np.ndarray]) -> dict:
+    """
+    combine_scores over columns: parts maps detector -> array of scores (one per row).
+    Returns {"score": float array, "weights": {...}}; row i equals
+    combine_scores({k: parts[k][i] ...})["score"].
+    """
+    import numpy as np  # lazy: rules-only scoring never needs it
+
+    cols = {k: np.asarray(v, dtype=float) for k, v in parts.items()}
+    n = len(next(iter(cols.values()))) if cols else 0
+    norm_w = _norm_weights(cols.keys())
+
+    score = np.zeros(n, dtype=float)
+    for k, w in norm_w.items():
+        score += w * cols[k]
+    score = np.minimum(score, 10.0)
+
+    # Python's round(), not np.round, so rows match combine_scores exactly
+    score = np.fromiter((round(s, 2) for s in score.tolist()), dtype=float, count=n)
+    return {"score": score, "weights": norm_w}
@@ -0,0 +1,157 @@
+"""
+Tabular input/output by file extension: CSV, Parquet and Arrow IPC
+(Feather v2). Parquet/Arrow need pyarrow, imported only when such a file
+is actually read or written.
+"""
+
+from __future__ import annotations
+import contextlib
+import io
+from pathlib import Path
+from typing import IO, Iterator, List, Optional, Sequence
+
+import pandas as pd
+
+FORMATS = {
+    ".csv": "csv",
+    ".parquet": "parquet", ".pq": "parquet",
+    ".arrow": "arrow", ".feather": "arrow", ".ipc": "arrow",
+}
+
+def table_format(path) -> str:
+    """'csv', 'parquet' or 'arrow' from the file extension (unknown -> csv)."""
+    return FORMATS.get(Path(path).suffix.lower(), "csv")
+
+def _pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.ipc
+        import pyarrow.parquet
+    except ImportError as e:
+        raise ImportError("Parquet/Arrow files need pyarrow: pip install pyarrow") from e
+    return pyarrow
+
+def _ipc_source(pa, path):
+    # paths are memory-mapped; file-like objects (e.g. uploads) are read as they are
+    return pa.memory_map(str(path)) if isinstance(path, (str, Path)) else contextlib.nullcontext(path)
+
+def read_columns(path, fmt: Optional[str] = None) -> List[str]:
+    """Column names without reading any rows. `path` may be a file-like object when `fmt` is given."""
+    fmt = fmt or table_format(path)
+    if fmt == "csv":
+        return list(pd.read_csv(path, nrows=0).columns)
+    pa = _pyarrow()
+    if fmt == "parquet":
+        return list(pa.parquet.ParquetFile(path).schema_arrow.names)
+    with _ipc_source(pa, path) as src:
+        return list(pa.ipc.open_file(src).schema.names)
+
+def read_table(path, columns: Optional[Sequence[str]] = None, nrows: Optional[int] = None,
+               fmt: Optional[str] = None) -> pd.DataFrame:
+    """
+    Whole file (or its first `nrows` rows) as a DataFrame. `columns`
+    projects the read: columnar formats only decode those columns.
+    """
+    fmt = fmt or table_format(path)
+    if fmt == "csv":
+        return pd.read_csv(path, usecols=list(columns) if columns else None, nrows=nrows)
+    if nrows is not None:
+        chunk = next(iter_table(path, nrows, columns, fmt), None) if nrows > 0 else None
+        return chunk if chunk is not None else pd.DataFrame(columns=list(columns or read_columns(path, fmt)))
+    pa = _pyarrow()
+    if fmt == "parquet":
+        return pa.parquet.read_table(path, columns=list(columns) if columns else None).to_pandas()
+    with _ipc_source(pa, path) as src:
+        table = pa.ipc.open_file(src).read_all()
+    return (table.select(list(columns)) if columns else table).to_pandas()
+
+def iter_table(path, chunksize: int, columns: Optional[Sequence[str]] = None,
+               fmt: Optional[str] = None) -> Iterator[pd.DataFrame]:
+    """DataFrames of up to `chunksize` rows; memory stays bounded by the chunk size."""
+    fmt = fmt or table_format(path)
+    if fmt == "csv":
+        yield from pd.read_csv(path, chunksize=chunksize, usecols=list(columns) if columns else None)
+        return
+    pa = _pyarrow()
+    cols = list(columns) if columns else None
+    if fmt == "parquet":
+        pf = pa.parquet.ParquetFile(path)
+        for batch in pf.iter_batches(batch_size=chunksize, columns=cols):
+            yield batch.to_pandas()
+        return
+
+    # Arrow IPC file: record batches are memory-mapped; re-slice them to chunksize
+    with _ipc_source(pa, path) as src:
+        reader = pa.ipc.open_file(src)
+        pending: list = []
+        n = 0
+        for i in range(reader.num_record_batches):
+            batch = reader.get_batch(i)
+            if cols:
+                batch = batch.select(cols)
+            while batch.num_rows:
+                take = min(chunksize - n, batch.num_rows)
+                pending.append(batch.slice(0, take))
+                batch = batch.slice(take)
+                n += take
+                if n == chunksize:
+                    yield pa.Table.from_batches(pending).to_pandas()
+                    pending, n = [], 0
+        if pending:
+            yield pa.Table.from_batches(pending).to_pandas()
+
+class TableWriter:
+    """
+    Append DataFrames chunk by chunk to one output file. CSV writes a
+    header once; Parquet writes each chunk as a row group; Arrow writes
+    each chunk as a record batch. The schema is fixed by the first chunk.
+    """
+
+    def __init__(self, path, fmt: Optional[str] = None):
+        self.path = Path(path)
+        self.fmt = fmt or table_format(path)
+        self.rows = 0
+        self._f: Optional[IO] = None
+        self._writer = None
+        self._schema = None
+
+    def write(self, df: pd.DataFrame) -> None:
+        if self.fmt == "csv":
+            if self._f is None:
+                self._f = open(self.path, "w", encoding="utf-8", newline="")
+            df.to_csv(self._f, header=self.rows == 0, index=False)
+        else:
+            pa = _pyarrow()
+            table = pa.Table.from_pandas(df, schema=self._schema, preserve_index=False)
+            if self._writer is None:
+                self._schema = table.schema
+                if self.fmt == "parquet":
+                    self._writer = pa.parquet.ParquetWriter(str(self.path), self._schema, compression="zstd")
+                else:
+                    self._writer = pa.ipc.new_file(str(self.path), self._schema)
+            if self.fmt == "parquet":
+                self._writer.write_table(table, row_group_size=max(len(df), 1))
+            else:
+                self._writer.write_table(table)
+        self.rows += len(df)
+
+    def close(self) -> None:
+        if self._f is not None:
+            self._f.close()
+            self._f = None
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+
+    def __enter__(self) -> "TableWriter":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+def to_parquet_bytes(df: pd.DataFrame) -> bytes:
+    """In-memory Parquet file (e.g. for a download button)."""
+    _pyarrow()
+    buf = io.BytesIO()
+    df.to_parquet(buf, index=False, compression="zstd")
+    return buf.getvalue()
@@ -1,8 +1,9 @@
+from __future__ import annotations
 import re
 
 def normalize_whitespace(text: str) -> str:
     """Collapse multiple spaces and trim ends."""
-    return re.sub(r"\s+", " ", text).strip()
+    return " ".join(text.split())  # same as re.sub(r"\s+", " ", text).strip()
 
 def sentence_split(text: str) -> list[str]:
     """Naive sentence splitter by punctuation. Replace with nltk/spacy later."""
@@ -11,3 +12,105 @@ def sentence_split(text: str) -> list[str]:
 def word_tokenize(text: str) -> list[str]:
     """Naive whitespace tokenizer."""
     return text.split()
+
+def clip_text(text: str, limit: int, backoff: int = 64) -> str:
+    """
+    text cut to at most `limit` characters, at the last whitespace within
+    `backoff` characters of the cut when there is one (so the final word
+    is not split and cannot match as a different, shorter word).
+    """
+    if len(text) <= limit:
+        return text
+    for i in range(limit, max(limit - backoff, 0), -1):
+        if text[i].isspace():
+            return text[:i]
+    return text[:limit]
+
+_SENTENCE_RE = re.compile(r"[^.!?]*[.!?]*")
+
+def sentence_spans(text: str) -> list[tuple[int, int]]:
+    """
+    (start, end) offsets of the sentences sentence_split finds, each
+    including its closing punctuation and without surrounding whitespace.
+    Pieces with no text between the punctuation are skipped.
+    """
+    spans = []
+    for m in _SENTENCE_RE.finditer(text):
+        seg = m.group(0)
+        if not seg.strip(" \t\r\n\f\v.!?"):
+            continue
+        lead = len(seg) - len(seg.lstrip())
+        spans.append((m.start() + lead, m.start() + len(seg.rstrip())))
+    return spans
+
+_MISSING = object()
+
+class Document:
+    """
+    One input text with lazily computed, memoized views. Built once per
+    analysis and passed to every stage, so however many detectors read
+    it the text is lowercased, normalized and tokenized at most once.
+    view(key, build, *args) memoizes views owned by other modules
+    (lexicon hits, model tokens) the same way.
+    """
+
+    __slots__ = ("text", "_lower", "_views")
+
+    def __init__(self, text: str | None = ""):
+        self.text = text or ""
+        self._lower: str | None = None
+        self._views: dict = {}
+
+    def __len__(self) -> int:
+        return len(self.text)
+
+    def __repr__(self) -> str:
+        return f"Document({self.text[:40]!r}{'...' if len(self.text) > 40 else ''})"
+
+    def view(self, key, build, *args):
+        """build(*args) the first time `key` is asked for, the stored value after that."""
+        value = self._views.get(key, _MISSING)
+        if value is _MISSING:
+            value = self._views[key] = build(*args)
+        return value
+
+    @property
+    def lower(self) -> str:
+        if self._lower is None:
+            self._lower = self.text.lower()
+        return self._lower
+
+    @property
+    def normalized(self) -> str:
+        """Lowercased, with whitespace runs collapsed and the ends trimmed."""
+        return self.view("normalized", normalize_whitespace, self.lower)
+
+    @property
+    def tokens(self) -> list[str]:
+        """word_tokenize of the lowercased text."""
+        return self.view("tokens", word_tokenize, self.lower)
+
+    @property
+    def sentences(self) -> list[str]:
+        return self.view("sentences", sentence_split, self.text)
+
+    @property
+    def sentence_spans(self) -> list[tuple[int, int]]:
+        return self.view("sentence_spans", sentence_spans, self.text)
+
+    def ngrams(self, n: int) -> list[str]:
+        """Space-joined runs of n consecutive tokens."""
+        def build(toks: list[str]) -> list[str]:
+            return toks[:] if n == 1 else [" ".join(toks[i:i + n]) for i in range(len(toks) - n + 1)]
+        return self.view(("ngrams", n), build, self.tokens)
+
+    def findall(self, pattern: re.Pattern) -> list:
+        """pattern.findall over the lowercased text (e.g. a vectorizer's token pattern), memoized per pattern."""
+        return self.view(pattern, pattern.findall, self.lower)
+
+def as_document(text: str | Document | None) -> Document:
+    return text if isinstance(text, Document) else Document(text)
+
+def text_of(text: str | Document | None) -> str:
+    """The raw text of a str or Document (None gives "")."""
+    return text.text if isinstance(text, Document) else text or ""
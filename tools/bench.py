@@ -0,0 +1,254 @@
+"""
+Benchmark suite for the detectors, scoring, rewrite and the end-to-end
+pipeline on reproducible synthetic corpora.
+
+Corpora: short (~12 words), medium (~120 words) and long (~6000 words)
+texts at controlled hit densities (share of words drawn from the
+detector lexicons). Each case reports per-call latency, rows/sec and
+peak traced memory (tracemalloc, measured in a separate pass).
+
+Usage:
+  python tools/bench.py run --out bench_baseline.json
+  python tools/bench.py run --out new.json --quick --only detect_toxicity,rewrite_text
+  python tools/bench.py compare bench_baseline.json new.json --threshold 0.10
+
+`compare` exits with status 1 when any case got slower (or used more
+peak memory) than the baseline by more than the threshold.
+"""
+
+from __future__ import annotations
+import argparse
+import contextlib
+import io
+import json
+import platform
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Callable, Dict, List
+
+import numpy as np
+import pandas as pd
+
+ROOT = Path(__file__).resolve().parents[1]
+for p in (ROOT / "src", ROOT / "tools"):
+    if str(p) not in sys.path:
+        sys.path.insert(0, str(p))
+
+import make_eval
+from detectors import (
+    analyze_batch, analyze_text, detect_factuality, detect_mlsignal,
+    detect_stereotypes, detect_toxicity,
+)
+from detectors.lexicon import default_lexicons
+from utils.rewrite import rewrite_batch, rewrite_text
+from utils.scoring import combine_scores
+
+SIZES = {"short": 12, "medium": 120, "long": 6000}
+DENSITIES = [0.0, 0.05, 0.2]
+FILLER = (
+    "the a report said people often think that this is what we saw in "
+    "data shows results may vary by context and further analysis helps"
+).split()
+
+# ---- corpora ----
+
+def make_corpus(n_rows: int, n_words: int, density: float, seed: int) -> List[str]:
+    rng = random.Random(f"{seed}-{n_words}-{density}")
+    terms = [w for v in default_lexicons().values() for w in v]
+    rows = []
+    for _ in range(n_rows):
+        words = [rng.choice(terms) if rng.random() < density else rng.choice(FILLER) for _ in range(n_words)]
+        # some punctuation/caps so rewrite and toxicity extras have work to do
+        if rng.random() < density:
+            words[-1] = words[-1].upper() + "!!!"
+        rows.append(" ".join(words).capitalize() + ".")
+    return rows
+
+def rows_for(size: str, quick: bool) -> int:
+    n = {"short": 400, "medium": 100, "long": 4}[size]
+    return max(2, n // 4) if quick else n
+
+# ---- measurement ----
+
+def measure(fn: Callable[[str], object], rows: List[str], min_time: float) -> Dict[str, float]:
+    fn(rows[0])  # warm-up (model load, regex compile)
+    calls, t0 = 0, time.perf_counter()
+    while True:
+        for r in rows:
+            fn(r)
+        calls += len(rows)
+        el = time.perf_counter() - t0
+        if el >= min_time:
+            break
+
+    tracemalloc.start()
+    for r in rows:
+        fn(r)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    lat = el / calls
+    return {"latency_us": lat * 1e6, "rows_per_s": 1.0 / lat, "peak_kib": peak / 1024}
+
+def measure_batch(fn: Callable[[List[str]], object], rows: List[str], min_time: float) -> Dict[str, float]:
+    fn(rows[:1])
+    n, t0 = 0, time.perf_counter()
+    while True:
+        fn(rows)
+        n += 1
+        el = time.perf_counter() - t0
+        if el >= min_time:
+            break
+
+    tracemalloc.start()
+    fn(rows)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    lat = el / (n * len(rows))
+    return {"latency_us": lat * 1e6, "rows_per_s": 1.0 / lat, "peak_kib": peak / 1024}
+
+def _parts(text: str) -> dict:
+    r = analyze_text(text)
+    return {k: r[k]["score"] for k in ("stereotypes", "toxicity", "factuality", "mlsignal")}
+
+def _make_eval_main(rows: List[str], workdir: Path) -> Callable[[List[str]], object]:
+    inp = workdir / "bench_in.csv"
+    tags = ["neutral", "toxicity", "stereotype", "factuality-mixed"]
+    pd.DataFrame({"id": range(len(rows)), "text": rows,
+                  "tag": [tags[i % len(tags)] for i in range(len(rows))]}).to_csv(inp, index=False)
+    argv = ["make_eval.py", "--in", str(inp), "--out", str(workdir / "bench_out.csv")]
+
+    def run(_rows):
+        old = sys.argv
+        sys.argv = argv
+        try:
+            with contextlib.redirect_stdout(io.StringIO()):
+                make_eval.main()
+        finally:
+            sys.argv = old
+    return run
+
+# per-text cases: name -> fn(text)
+CASES: Dict[str, Callable[[str], object]] = {
+    "detect_stereotypes": detect_stereotypes,
+    "detect_toxicity": detect_toxicity,
+    "detect_factuality": detect_factuality,
+    "detect_mlsignal": detect_mlsignal,
+    "rewrite_text": rewrite_text,
+    "analyze_text": analyze_text,
+}
+
+# batch cases: name -> fn(rows); "make_eval.main" is built per corpus (needs a CSV)
+BATCH_CASES: Dict[str, Callable[[List[str]], object]] = {
+    "analyze_batch": analyze_batch,
+    "rewrite_batch": rewrite_batch,
+}
+
+def run_suite(quick: bool, only: set | None, seed: int, min_time: float) -> dict:
+    results: Dict[str, dict] = {}
+
+    def want(name: str) -> bool:
+        return only is None or name in only
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for size, n_words in SIZES.items():
+            for density in DENSITIES:
+                rows = make_corpus(rows_for(size, quick), n_words, density, seed)
+                tag = f"{size}/d{density:g}"
+
+                for name, fn in CASES.items():
+                    if want(name):
+                        results[f"{name}/{tag}"] = measure(fn, rows, min_time)
+                        _print(f"{name}/{tag}", results[f"{name}/{tag}"])
+
+                if want("combine_scores"):
+                    parts = [_parts(r) for r in rows]
+                    res = measure(lambda i: combine_scores(parts[i]), list(range(len(parts))), min_time)
+                    results[f"combine_scores/{tag}"] = res
+                    _print(f"combine_scores/{tag}", res)
+
+                for name, fn in BATCH_CASES.items():
+                    if want(name):
+                        results[f"{name}/{tag}"] = measure_batch(fn, rows, min_time)
+                        _print(f"{name}/{tag}", results[f"{name}/{tag}"])
+
+                if want("make_eval.main") and size != "long":
+                    res = measure_batch(_make_eval_main(rows, Path(tmp)), rows, min_time)
+                    results[f"make_eval.main/{tag}"] = res
+                    _print(f"make_eval.main/{tag}", res)
+
+    import sklearn
+    return {
+        "meta": {
+            "python": platform.python_version(), "platform": platform.platform(),
+            "numpy": np.__version__, "pandas": pd.__version__, "sklearn": sklearn.__version__,
+            "seed": seed, "quick": quick, "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        },
+        "results": results,
+    }
+
+def _print(name: str, r: dict) -> None:
+    print(f"{name:<40} {r['latency_us']:>12.1f} us {r['rows_per_s']:>12.0f} rows/s {r['peak_kib']:>10.1f} KiB")
+
+# ---- compare ----
+
+def compare(base: dict, new: dict, threshold: float) -> List[str]:
+    regressions = []
+    b, n = base["results"], new["results"]
+    print(f"{'case':<40} {'base us':>10} {'new us':>10} {'ratio':>7} {'mem ratio':>10}")
+    for name in sorted(set(b) & set(n)):
+        lat = n[name]["latency_us"] / max(b[name]["latency_us"], 1e-9)
+        mem = n[name]["peak_kib"] / max(b[name]["peak_kib"], 1e-9)
+        mark = ""
+        if lat > 1 + threshold:
+            mark += " SLOWER"
+        if mem > 1 + threshold and n[name]["peak_kib"] - b[name]["peak_kib"] > 16:
+            mark += " MORE-MEMORY"  # ignore noise on tiny allocations
+        if mark:
+            regressions.append(name)
+        print(f"{name:<40} {b[name]['latency_us']:>10.1f} {n[name]['latency_us']:>10.1f} {lat:>6.2f}x {mem:>9.2f}x{mark}")
+    for name in sorted(set(b) - set(n)):
+        print(f"{name:<40} (missing from new run)")
+    return regressions
+
+def main():
+    ap = argparse.ArgumentParser()
+    sub = ap.add_subparsers(dest="cmd", required=True)
+
+    r = sub.add_parser("run", help="Run the suite and save a JSON baseline")
+    r.add_argument("--out", required=True, help="Output JSON path")
+    r.add_argument("--quick", action="store_true", help="Smaller corpora and shorter timing")
+    r.add_argument("--only", default=None, help="Comma-separated case names")
+    r.add_argument("--seed", type=int, default=0)
+    r.add_argument("--min-time", type=float, default=None, help="Seconds per case (default 0.5, quick 0.1)")
+
+    c = sub.add_parser("compare", help="Compare two JSON results and flag regressions")
+    c.add_argument("base")
+    c.add_argument("new")
+    c.add_argument("--threshold", type=float, default=0.10, help="Allowed slowdown, e.g. 0.10 = 10%%")
+    args = ap.parse_args()
+
+    if args.cmd == "run":
+        only = set(args.only.split(",")) if args.only else None
+        min_time = args.min_time if args.min_time is not None else (0.1 if args.quick else 0.5)
+        data = run_suite(args.quick, only, args.seed, min_time)
+        out = Path(args.out)
+        out.parent.mkdir(parents=True, exist_ok=True)
+        out.write_text(json.dumps(data, indent=2), encoding="utf-8")
+        print(f"Saved: {out.resolve()}")
+    else:
+        base = json.loads(Path(args.base).read_text(encoding="utf-8"))
+        new = json.loads(Path(args.new).read_text(encoding="utf-8"))
+        regressions = compare(base, new, args.threshold)
+        if regressions:
+            print(f"\n{len(regressions)} regression(s) above {args.threshold:.0%}: {', '.join(regressions)}")
+            sys.exit(1)
+        print("\nNo regressions.")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""
+Compiled scorer (models.compiled) vs the sklearn bundle: cold load time
+and memory of a fresh process, single-text latency, batch throughput,
+and a check that probabilities are identical. Each side is measured in
+its own subprocess so imports and RSS don't leak between them.
+
+Usage:
+  python tools/bench_compiled.py
+  python tools/bench_compiled.py --texts 5000 --words 40
+"""
+
+from __future__ import annotations
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+for p in (ROOT / "src", ROOT / "tools"):
+    if str(p) not in sys.path:
+        sys.path.insert(0, str(p))
+
+CHILD = r"""
+import json, statistics, sys, time
+sys.path.insert(0, {src!r})
+t0 = time.perf_counter()
+import models.baseline as b
+if {compiled!r}:
+    m = b.get_compiled()
+    one, many = m.predict_proba, m.predict_proba_batch
+else:
+    bundle = b.get_model()
+    one = lambda t: float(bundle.clf.predict_proba(bundle.vect.transform([t]))[0, 1])
+    many = lambda ts: bundle.clf.predict_proba(bundle.vect.transform(ts))[:, 1]
+one("warm up")
+load = time.perf_counter() - t0
+try:  # current RSS; ru_maxrss would carry the parent's peak across exec on Linux
+    rss = next(int(l.split()[1]) for l in open("/proc/self/status") if l.startswith("VmRSS:")) / 1024
+except OSError:
+    import resource
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+texts = json.load(open({texts!r}, encoding="utf-8"))
+lat = []
+for t in texts[:{single}]:
+    s = time.perf_counter(); one(t); lat.append(time.perf_counter() - s)
+s = time.perf_counter(); probs = many(texts); batch = time.perf_counter() - s
+print(json.dumps({{"load": load, "rss": rss, "p50": statistics.median(lat), "batch": batch,
+                  "sklearn": "sklearn" in sys.modules, "probs": [float(p) for p in probs]}}))
+"""
+
+def run(compiled: bool, texts_path: str, single: int) -> dict:
+    code = CHILD.format(src=str(ROOT / "src"), compiled=compiled, texts=texts_path, single=single)
+    env = {**os.environ, "BIAS_DETECTOR_COMPILED": "1" if compiled else "0"}
+    out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, env=env, check=True)
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--texts", type=int, default=20_000)
+    ap.add_argument("--words", type=int, default=20, help="Words per text")
+    ap.add_argument("--single", type=int, default=2_000, help="Texts timed one by one")
+    ap.add_argument("--seed", type=int, default=0)
+    args = ap.parse_args()
+
+    from bench import make_corpus
+    from models.baseline import get_compiled
+
+    get_compiled()  # builds the compiled artifact once so the child processes only load it
+    texts = make_corpus(args.texts, args.words, 0.05, args.seed)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = str(Path(tmp) / "texts.json")
+        Path(path).write_text(json.dumps(texts), encoding="utf-8")
+        sk = run(False, path, args.single)
+        cm = run(True, path, args.single)
+
+    diff = sum(a != b for a, b in zip(sk["probs"], cm["probs"]))
+    print(f"texts={len(texts)} words={args.words}")
+    print(f"{'':<10} {'load ms':>9} {'RSS MB':>8} {'1-text us':>10} {'batch us/text':>14} {'sklearn imported':>17}")
+    for name, r in (("sklearn", sk), ("compiled", cm)):
+        print(f"{name:<10} {r['load'] * 1e3:>9.0f} {r['rss']:>8.1f} {r['p50'] * 1e6:>10.1f} "
+              f"{r['batch'] * 1e6 / len(texts):>14.1f} {str(r['sklearn']):>17}")
+    print(f"Probabilities differing from sklearn: {diff}/{len(texts)}")
+    if diff:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
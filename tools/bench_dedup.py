@@ -0,0 +1,103 @@
+"""
+Batch dedup before scoring: analyze_batch rows/sec with no dedup, with
+exact-copy grouping and with MinHash near-duplicate clustering on top,
+against the share of duplicates in the batch. Duplicates are exact
+copies, case/whitespace variants, "RT @user:" retweets and copies with
+one word changed. Only exact copies share a result, so the rows in a
+different severity band than when every row is scored must be 0 in
+every mode; near mode adds the clustering cost (its clusters go into
+group_id only).
+
+Usage:
+  python tools/bench_dedup.py
+  python tools/bench_dedup.py --rows 20000 --rates 0,0.3,0.6,0.9 --near 0.8
+"""
+
+from __future__ import annotations
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+SRC = ROOT / "src"
+if str(SRC) not in sys.path:
+    sys.path.insert(0, str(SRC))
+
+from detectors import analyze_batch
+from detectors.lexicon import default_lexicons
+from utils.dedup import Deduper
+from utils.scoring import severity_band
+
+FILLER = ("the a report said people often think that this is what we saw in data results today "
+          "news again city team game weather market update story thread video").split()
+
+def original(rng: random.Random, terms: list) -> str:
+    words = [rng.choice(terms) if rng.random() < 0.08 else rng.choice(FILLER) for _ in range(rng.randint(8, 30))]
+    return " ".join(words) + f" #{rng.randrange(10 ** 6)}"  # tag: distinct originals stay distinct
+
+def variant(rng: random.Random, text: str) -> str:
+    kind = rng.randrange(5)
+    if kind == 0:
+        return text
+    if kind == 1:
+        return text.upper()
+    if kind == 2:
+        return "  " + text.replace(" ", "   ") + "\n"
+    if kind == 3:
+        return f"RT @user{rng.randrange(1000)}: {text}"
+    words = text.split()
+    words[rng.randrange(len(words))] = rng.choice(FILLER)
+    return " ".join(words)
+
+def make_batch(rows: int, rate: float, rng: random.Random, terms: list) -> list:
+    out = []
+    for _ in range(rows):
+        if out and rng.random() < rate:
+            out.append(variant(rng, rng.choice(out)))
+        else:
+            out.append(original(rng, terms))
+    return out
+
+def score(texts: list, deduper: Deduper | None) -> list:
+    if deduper is None:
+        return analyze_batch(texts)
+    groups = deduper.group(texts)
+    return groups.fan_out(analyze_batch([texts[i] for i in groups.reps]))
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--rows", type=int, default=10_000)
+    ap.add_argument("--rates", default="0,0.3,0.45,0.6,0.9", help="Share of rows that copy an earlier row")
+    ap.add_argument("--near", type=float, default=0.8, help="MinHash similarity threshold")
+    ap.add_argument("--repeat", type=int, default=3, help="Runs per mode (fastest reported)")
+    ap.add_argument("--seed", type=int, default=0)
+    args = ap.parse_args()
+
+    rng = random.Random(args.seed)
+    terms = [w for v in default_lexicons().values() for w in v]
+    analyze_batch(["warm up"])  # model load is not part of any timing
+
+    print(f"{'dup rate':>8} | {'mode':<6} {'groups':>7} {'clusters':>8} {'group s':>8} {'rows/s':>9} {'speedup':>8} {'band changes':>13}")
+    for rate in [float(x) for x in args.rates.split(",")]:
+        texts = make_batch(args.rows, rate, rng, terms)
+        base = None
+        for mode in ("none", "exact", "near"):
+            el = float("inf")
+            for _ in range(args.repeat):
+                deduper = None if mode == "none" else Deduper(args.near if mode == "near" else None)
+                t0 = time.perf_counter()
+                results = score(texts, deduper)
+                el = min(el, time.perf_counter() - t0)
+            bands = [severity_band(r["overall"]["score"]) for r in results]
+            if base is None:
+                base = (el, bands)
+            changed = sum(a != b for a, b in zip(bands, base[1]))
+            stats = deduper.stats() if deduper else {"groups": len(texts), "seconds": 0.0}
+            clusters = stats.get("clusters", stats["groups"])
+            print(f"{rate:>8.0%} | {mode:<6} {stats['groups']:>7} {clusters:>8} {stats['seconds']:>8.2f} {len(texts) / el:>9.0f} "
+                  f"{base[0] / el:>7.2f}x {changed:>13}")
+
+if __name__ == "__main__":
+    main()
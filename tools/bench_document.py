@@ -0,0 +1,76 @@
+"""
+Re-analysis latency after a small edit: DocumentAnalyzer (only changed
+sentences are re-scored) against a full analyze_text, over growing
+document sizes. Also checks the rule-detector scores match analyze_text.
+
+Usage:
+  python tools/bench_document.py
+  python tools/bench_document.py --sentences 100,1000,10000 --edits 5 --rounds 10
+"""
+
+from __future__ import annotations
+import argparse
+import random
+import statistics
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+SRC = ROOT / "src"
+if str(SRC) not in sys.path:
+    sys.path.insert(0, str(SRC))
+
+from detectors import DocumentAnalyzer, analyze_text
+from detectors.lexicon import default_lexicons
+
+FILLER = "the a report said people often think that this is what we saw in data results".split()
+
+def make_sentence(rng: random.Random, terms: list) -> str:
+    words = [rng.choice(terms) if rng.random() < 0.05 else rng.choice(FILLER) for _ in range(rng.randint(6, 25))]
+    return " ".join(words).capitalize() + rng.choice([".", ".", "!", "?"])
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--sentences", default="100,1000,5000,20000", help="Document sizes in sentences")
+    ap.add_argument("--edits", type=int, default=1, help="Sentences replaced per edit")
+    ap.add_argument("--rounds", type=int, default=5, help="Edits per document size (median reported)")
+    ap.add_argument("--seed", type=int, default=0)
+    args = ap.parse_args()
+
+    rng = random.Random(args.seed)
+    terms = [w for v in default_lexicons().values() for w in v]
+    analyze_text("warm up")  # model load is not part of any timing
+
+    print(f"{'sentences':>9} {'chars':>9} {'first ms':>10} {'edit ms':>9} {'full ms':>9} {'speedup':>8} {'rescored':>8}")
+    for n in [int(x) for x in args.sentences.split(",")]:
+        sents = [make_sentence(rng, terms) for _ in range(n)]
+        doc = DocumentAnalyzer(max_sentences=max(50_000, 2 * n))
+
+        t0 = time.perf_counter()
+        doc.analyze(" ".join(sents))
+        first = time.perf_counter() - t0
+
+        edits, fulls = [], []
+        for _ in range(args.rounds):
+            for i in rng.sample(range(n), min(args.edits, n)):
+                sents[i] = make_sentence(rng, terms)
+            edited = " ".join(sents)
+
+            t0 = time.perf_counter()
+            r = doc.analyze(edited)
+            edits.append(time.perf_counter() - t0)
+            t0 = time.perf_counter()
+            full = analyze_text(edited)
+            fulls.append(time.perf_counter() - t0)
+        edit, t_full = statistics.median(edits), statistics.median(fulls)
+
+        for k in ("stereotypes", "toxicity", "factuality"):
+            if r[k] != full[k]:
+                print(f"[ERROR] {k} differs from analyze_text at {n} sentences", file=sys.stderr)
+                sys.exit(1)
+        print(f"{n:>9} {len(edited):>9} {first * 1e3:>10.1f} {edit * 1e3:>9.2f} {t_full * 1e3:>9.2f} "
+              f"{t_full / edit:>7.1f}x {r['rescored']:>8}")
+
+if __name__ == "__main__":
+    main()
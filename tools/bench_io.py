@@ -0,0 +1,96 @@
+"""
+CSV vs Parquet vs Arrow IPC for make_eval: read / score / write time per
+stage (make_eval --stream, profiled) and input/output file size, on a
+large synthetic corpus. --wide adds unused columns to the input to show
+column projection (columnar formats only decode id,text,tag).
+
+Usage:
+  python tools/bench_io.py --rows 300000
+  python tools/bench_io.py --rows 200000 --wide 10 --formats csv,parquet
+"""
+
+from __future__ import annotations
+import argparse
+import contextlib
+import io
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import pandas as pd
+
+ROOT = Path(__file__).resolve().parents[1]
+for p in (ROOT / "src", ROOT / "tools"):
+    if str(p) not in sys.path:
+        sys.path.insert(0, str(p))
+
+import make_eval
+from utils import profiling
+from utils.tableio import TableWriter
+
+EXT = {"csv": ".csv", "parquet": ".parquet", "arrow": ".arrow"}
+TAGS = ["neutral", "toxicity", "stereotype", "factuality-mixed", "mlsignal"]
+
+def make_frame(rows: int, wide: int, seed: int) -> pd.DataFrame:
+    from bench import make_corpus  # same synthetic text as the benchmark suite
+    rng = random.Random(seed)
+    df = pd.DataFrame({
+        "id": range(rows),
+        "text": make_corpus(rows, 40, 0.05, seed),  # distinct rows, so compression isn't flattered
+        "tag": [TAGS[i % len(TAGS)] for i in range(rows)],
+    })
+    for i in range(wide):
+        df[f"extra_{i}"] = [f"unused value {rng.random():.6f} for column {i}" for _ in range(rows)]
+    return df
+
+def run_make_eval(inp: Path, outp: Path, chunksize: int) -> dict:
+    argv = ["make_eval.py", "--in", str(inp), "--out", str(outp), "--stream", "--chunksize", str(chunksize)]
+    sink = profiling.enable()
+    old = sys.argv
+    sys.argv = argv
+    t0 = time.perf_counter()
+    try:
+        with contextlib.redirect_stdout(io.StringIO()), contextlib.redirect_stderr(io.StringIO()):
+            make_eval.main()
+    finally:
+        sys.argv = old
+        profiling.disable()
+    total = time.perf_counter() - t0
+    snap = sink.snapshot()
+
+    def ms(stage: str) -> float:
+        return snap.get(f"make_eval.{stage}", {}).get("total_ms", 0.0)
+    return {"read": ms("read"), "score": ms("rules") + ms("mlsignal") + ms("overall"),
+            "write": ms("write"), "total": total * 1e3}
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--rows", type=int, default=100_000)
+    ap.add_argument("--wide", type=int, default=0, help="Extra unused input columns")
+    ap.add_argument("--chunksize", type=int, default=50_000)
+    ap.add_argument("--formats", default="csv,parquet,arrow")
+    ap.add_argument("--seed", type=int, default=0)
+    args = ap.parse_args()
+
+    df = make_frame(args.rows, args.wide, args.seed)
+    formats = args.formats.split(",")
+    print(f"rows={args.rows} wide={args.wide} chunksize={args.chunksize}")
+    print(f"{'in -> out':<18} {'read ms':>9} {'score ms':>9} {'write ms':>9} {'total ms':>9} "
+          f"{'in MB':>8} {'out MB':>8}")
+    with tempfile.TemporaryDirectory() as tmp:
+        inputs = {}
+        for fmt in formats:
+            inputs[fmt] = Path(tmp) / f"in{EXT[fmt]}"
+            with TableWriter(inputs[fmt]) as w:
+                for i in range(0, len(df), args.chunksize):
+                    w.write(df.iloc[i:i + args.chunksize])
+        for fmt in formats:
+            outp = Path(tmp) / f"out{EXT[fmt]}"
+            r = run_make_eval(inputs[fmt], outp, args.chunksize)
+            print(f"{fmt + ' -> ' + fmt:<18} {r['read']:>9.0f} {r['score']:>9.0f} {r['write']:>9.0f} "
+                  f"{r['total']:>9.0f} {inputs[fmt].stat().st_size / 1e6:>8.1f} {outp.stat().st_size / 1e6:>8.1f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""
+Per-call latency of the compiled lexicon matcher vs the old per-term regex
+loop, as the lexicon grows. Also checks both give identical hits.
+
+Usage:
+  python tools/bench_lexicon.py
+  python tools/bench_lexicon.py --sizes 10,100,1000,10000 --text-words 200
+"""
+
+from __future__ import annotations
+import argparse
+import random
+import re
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+SRC = ROOT / "src"
+if str(SRC) not in sys.path:
+    sys.path.insert(0, str(SRC))
+
+from detectors.lexicon import LexiconMatcher, default_lexicons
+
+def legacy_scan(lexicons: dict, text: str) -> dict:
+    # the detectors' original approach: one regex per term
+    t = text.lower()
+    out = {}
+    for g, vocab in lexicons.items():
+        for w in vocab:
+            n = len(re.findall(rf"(?<!\w){re.escape(w)}(?!\w)", t))
+            if n:
+                out.setdefault(g, {})[w] = n
+    return out
+
+def synthetic_lexicons(n_terms: int, rng: random.Random) -> dict:
+    lex = default_lexicons()
+    alphabet = "abcdefghijklmnopqrstuvwxyz"
+    extra = set()
+    while len(extra) < max(0, n_terms - sum(len(v) for v in lex.values())):
+        words = ["".join(rng.choices(alphabet, k=rng.randint(3, 9))) for _ in range(rng.choice((1, 1, 2)))]
+        extra.add(" ".join(words))
+    for i, w in enumerate(sorted(extra)):
+        lex.setdefault(f"synthetic_{i % 8}", []).append(w)
+    return lex
+
+def synthetic_text(lexicons: dict, n_words: int, rng: random.Random) -> str:
+    terms = [w for v in lexicons.values() for w in v]
+    filler = ["the", "a", "report", "said", "people", "often", "think", "that", "this", "is"]
+    words = []
+    while len(words) < n_words:
+        words.append(rng.choice(terms) if rng.random() < 0.1 else rng.choice(filler))
+    return " ".join(words).capitalize() + "!"
+
+def time_per_call(fn, text: str, min_time: float = 0.2) -> float:
+    n, t0 = 0, time.perf_counter()
+    while True:
+        fn(text)
+        n += 1
+        el = time.perf_counter() - t0
+        if el >= min_time:
+            return el / n
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--sizes", default="30,100,1000,5000,20000", help="Comma-separated lexicon sizes")
+    ap.add_argument("--text-words", type=int, default=100, help="Words per synthetic text")
+    ap.add_argument("--seed", type=int, default=0)
+    args = ap.parse_args()
+
+    rng = random.Random(args.seed)
+    print(f"{'terms':>8} {'legacy us/call':>15} {'matcher us/call':>16} {'speedup':>8} {'compile ms':>11}")
+    for size in [int(s) for s in args.sizes.split(",")]:
+        lex = synthetic_lexicons(size, rng)
+        text = synthetic_text(lex, args.text_words, rng)
+
+        t0 = time.perf_counter()
+        m = LexiconMatcher(lex)
+        compile_ms = (time.perf_counter() - t0) * 1e3
+
+        if m.scan(text) != legacy_scan(lex, text):
+            print(f"[ERROR] hit mismatch at {size} terms", file=sys.stderr)
+            sys.exit(1)
+
+        legacy = time_per_call(lambda s: legacy_scan(lex, s), text)
+        fast = time_per_call(m.scan, text)
+        print(f"{size:>8} {legacy * 1e6:>15.1f} {fast * 1e6:>16.1f} {legacy / fast:>7.1f}x {compile_ms:>11.1f}")
+
+if __name__ == "__main__":
+    main()
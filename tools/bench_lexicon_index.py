@@ -0,0 +1,135 @@
+"""
+File-loaded lexicons at scale: the memory-mapped LexiconIndex against the
+in-process regex LexiconMatcher on a large synthetic lexicon (default
+100k terms). Reports build/load time, per-worker memory (RSS and PSS,
+which splits shared pages between the processes mapping them) with N
+worker processes loading the same lexicons, match latency, and how long
+a running process takes to pick up an atomically replaced index.
+Also checks both matchers give identical hits.
+
+Usage:
+  python tools/bench_lexicon_index.py
+  python tools/bench_lexicon_index.py --terms 100000 --workers 4 --no-regex
+"""
+
+from __future__ import annotations
+import argparse
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+for p in (ROOT / "src", ROOT / "tools"):
+    if str(p) not in sys.path:
+        sys.path.insert(0, str(p))
+
+from bench_lexicon import synthetic_lexicons, synthetic_text, time_per_call
+from detectors import lexicon
+from detectors.lexicon import LexiconIndex, LexiconMatcher, all_lexicons, compile_index
+
+WORKER = r"""
+import json, sys, time
+sys.path.insert(0, {src!r})
+from detectors.lexicon import LexiconIndex, LexiconMatcher, read_lexicon_dir
+t0 = time.perf_counter()
+if {index!r}:
+    m = LexiconIndex({path!r})
+else:
+    m = LexiconMatcher(read_lexicon_dir({path!r})[0])
+load = time.perf_counter() - t0
+texts = json.load(open({texts!r}, encoding="utf-8"))
+for t in texts:
+    m.scan(t)
+def mem(field, name):
+    try:
+        return next(int(l.split()[1]) for l in open(name) if l.startswith(field)) / 1024
+    except (OSError, StopIteration):
+        return 0.0
+print(json.dumps({{"load": load, "rss": mem("Rss:", "/proc/self/smaps_rollup") or mem("VmRSS:", "/proc/self/status"),
+                  "pss": mem("Pss:", "/proc/self/smaps_rollup")}}))
+sys.stdout.flush()
+sys.stdin.read()  # stay alive until every worker has reported, so shared pages are counted as shared
+"""
+
+def run_workers(n: int, index: bool, path: Path, texts_path: Path) -> list:
+    code = WORKER.format(src=str(ROOT / "src"), index=index, path=str(path), texts=str(texts_path))
+    procs = [subprocess.Popen([sys.executable, "-c", code], stdin=subprocess.PIPE, stdout=subprocess.PIPE, text=True)
+             for _ in range(n)]
+    lines = [p.stdout.readline() for p in procs]
+    for p in procs:
+        p.communicate("")
+    return [json.loads(x) for x in lines]
+
+def write_lexicon_dir(lex: dict, directory: Path) -> None:
+    directory.mkdir(parents=True, exist_ok=True)
+    for g, terms in lex.items():
+        (directory / f"{g}.txt").write_text("# version: bench\n" + "\n".join(terms) + "\n", encoding="utf-8")
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--terms", type=int, default=100_000)
+    ap.add_argument("--workers", type=int, default=4)
+    ap.add_argument("--text-words", type=int, default=100)
+    ap.add_argument("--texts", type=int, default=500, help="Distinct texts scanned per worker / timed")
+    ap.add_argument("--no-regex", action="store_true", help="Skip the regex matcher (slow to build at this size)")
+    ap.add_argument("--seed", type=int, default=0)
+    args = ap.parse_args()
+
+    rng = random.Random(args.seed)
+    lex = all_lexicons(synthetic_lexicons(args.terms, rng))
+    texts = [synthetic_text(lex, args.text_words, rng) for _ in range(args.texts)]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        src = tmp / "lexicons"
+        write_lexicon_dir(lex, src)
+        texts_path = tmp / "texts.json"
+        texts_path.write_text(json.dumps(texts), encoding="utf-8")
+
+        t0 = time.perf_counter()
+        idx_path = compile_index(lex, tmp / "lexicons.idx")
+        t_compile = time.perf_counter() - t0
+        t0 = time.perf_counter()
+        idx = LexiconIndex(idx_path)
+        t_open = time.perf_counter() - t0
+        print(f"terms={idx.n_terms} groups={len(idx.group_names)} index={idx_path.stat().st_size / 1e6:.1f} MB")
+        print(f"index: compile {t_compile * 1e3:.0f} ms (once per lexicon version), open {t_open * 1e3:.2f} ms")
+
+        rows = [("index", True, idx_path)]
+        if not args.no_regex:
+            t0 = time.perf_counter()
+            rx = LexiconMatcher(lex)
+            print(f"regex: build {(time.perf_counter() - t0) * 1e3:.0f} ms (every process)")
+            mism = sum(rx.scan(t) != idx.scan(t) for t in texts)
+            print(f"Texts with different hits: {mism}/{len(texts)}")
+            if mism:
+                sys.exit(1)
+            rows.append(("regex", False, src))
+
+        print(f"\n{'matcher':<8} {'us/call':>9} {'load ms':>9} {'RSS MB/worker':>14} {'PSS MB/worker':>14}  ({args.workers} workers)")
+        for name, index, path in rows:
+            m = idx if index else rx
+            per_call = sum(time_per_call(m.scan, t, 0.02) for t in texts[:20]) / min(20, len(texts))
+            stats = run_workers(args.workers, index, path, texts_path)
+            avg = {k: sum(s[k] for s in stats) / len(stats) for k in ("load", "rss", "pss")}
+            print(f"{name:<8} {per_call * 1e6:>9.1f} {avg['load'] * 1e3:>9.1f} {avg['rss']:>14.1f} {avg['pss']:>14.1f}")
+
+        # hot reload: replace the index file in place and time until get_matcher() serves it
+        os.environ[lexicon.LEXICON_ENV] = str(idx_path)
+        before = lexicon.get_matcher().version
+        extra = {"bench_reload": ["hot reload term"]}
+        compile_index(all_lexicons({**lex, **extra}), idx_path)
+        t0 = time.perf_counter()
+        while lexicon.get_matcher().version == before:
+            time.sleep(0.01)
+        hit = lexicon.scan_lexicons("a hot reload term").get("bench_reload")
+        print(f"\nhot reload: new index served after {time.perf_counter() - t0:.2f}s "
+              f"(RELOAD_INTERVAL={lexicon.RELOAD_INTERVAL}s), new term matched: {bool(hit)}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+"""
+Memory and time-to-ready of N scoring workers: one pre-forked
+`serve.py --workers N` (warm state loaded once in the parent, shared
+copy-on-write) against N independent `serve.py` processes (each loads
+its own). Memory is summed PSS over all processes after every worker
+served some requests, so shared pages count once. Linux only.
+
+Usage:
+  python tools/bench_prefork.py --workers 1,2,4,8
+  python tools/bench_prefork.py --workers 4 --sklearn   # uncompiled model (BIAS_DETECTOR_COMPILED=0)
+"""
+
+from __future__ import annotations
+import argparse
+import http.client
+import json
+import os
+import re
+import socket
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+SRC = ROOT / "src"
+if str(SRC) not in sys.path:
+    sys.path.insert(0, str(SRC))
+
+from utils.prefork import memory_usage
+
+SERVE = str(ROOT / "tools" / "serve.py")
+READY_RE = re.compile(r"worker (\d+) pid (\d+)")
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+def wait_health(port: int, timeout: float = 120.0) -> None:
+    deadline = time.perf_counter() + timeout
+    while time.perf_counter() < deadline:
+        try:
+            conn = http.client.HTTPConnection("127.0.0.1", port, timeout=60)
+            conn.request("GET", "/health")
+            if conn.getresponse().status == 200:
+                return
+        except OSError:
+            time.sleep(0.02)
+    raise TimeoutError(f"no /health on port {port}")
+
+def send(port: int, n: int) -> None:
+    conn = http.client.HTTPConnection("127.0.0.1", port, timeout=60)
+    for i in range(n):
+        conn.request("POST", "/analyze", body=json.dumps({"text": f"Obviously those boomers are stupid {i}"}))
+        conn.getresponse().read()
+
+def total_pss(pids) -> float:
+    return sum(memory_usage(pid).get("pss_mb", 0.0) for pid in pids)
+
+def run_prefork(n: int, env: dict, requests: int) -> dict:
+    port = free_port()
+    t0 = time.perf_counter()
+    proc = subprocess.Popen([sys.executable, SERVE, "--workers", str(n), "--port", str(port)],
+                            stdout=subprocess.PIPE, text=True, env=env)
+    pids = {proc.pid}
+    try:
+        for line in proc.stdout:
+            m = READY_RE.search(line)
+            if m:
+                pids.add(int(m.group(2)))
+            if line.startswith(f"All {n} workers ready"):
+                break
+        ready = time.perf_counter() - t0
+        send(port, requests * n)  # connections land on whichever worker accepts first
+        return {"ready_s": ready, "pss_mb": total_pss(pids),
+                "worker_rss_mb": max(memory_usage(p)["rss_mb"] for p in pids - {proc.pid})}
+    finally:
+        proc.terminate()
+        proc.wait()
+
+def run_independent(n: int, env: dict, requests: int) -> dict:
+    ports = [free_port() for _ in range(n)]
+    t0 = time.perf_counter()
+    procs = [subprocess.Popen([sys.executable, SERVE, "--port", str(p)], stdout=subprocess.DEVNULL, env=env)
+             for p in ports]
+    try:
+        for p in ports:
+            wait_health(p)
+        ready = time.perf_counter() - t0
+        for p in ports:
+            send(p, requests)
+        return {"ready_s": ready, "pss_mb": total_pss(p.pid for p in procs),
+                "worker_rss_mb": max(memory_usage(p.pid)["rss_mb"] for p in procs)}
+    finally:
+        for p in procs:
+            p.terminate()
+        for p in procs:
+            p.wait()
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--workers", default="1,2,4,8", help="Comma-separated worker counts")
+    ap.add_argument("--requests", type=int, default=200, help="Requests per worker before measuring memory")
+    ap.add_argument("--sklearn", action="store_true", help="Score through sklearn instead of the compiled model")
+    args = ap.parse_args()
+
+    env = dict(os.environ)
+    if args.sklearn:
+        env["BIAS_DETECTOR_COMPILED"] = "0"
+    subprocess.run([sys.executable, "-c", f"import sys; sys.path.insert(0, {str(SRC)!r}); "
+                    "import detectors; detectors.warm_up()"], env=env, check=True)  # artifacts built once, up front
+
+    print(f"{'workers':>7} | {'prefork ready s':>15} {'total PSS MB':>13} {'max RSS MB':>11} | "
+          f"{'separate ready s':>16} {'total PSS MB':>13} {'max RSS MB':>11}")
+    for n in [int(x) for x in args.workers.split(",")]:
+        pre = run_prefork(n, env, args.requests) if n > 1 else None
+        ind = run_independent(n, env, args.requests)
+        pre = pre or ind  # one worker: the same process either way
+        print(f"{n:>7} | {pre['ready_s']:>15.2f} {pre['pss_mb']:>13.1f} {pre['worker_rss_mb']:>11.1f} | "
+              f"{ind['ready_s']:>16.2f} {ind['pss_mb']:>13.1f} {ind['worker_rss_mb']:>11.1f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+"""
+Shared preprocessing: every stage reading one Document (lowercased,
+normalized and tokenized once, memoized) against the same stages each
+given the raw string (each lowercases/tokenizes on its own), for
+analyze_text and for make_eval's rule scorers. Reports per-row latency
+and the peak memory allocated while scoring one row (tracemalloc), per
+text length, and checks both paths give identical results.
+
+Usage:
+  python tools/bench_preprocess.py
+  python tools/bench_preprocess.py --words 20,200,2000 --rows 200
+"""
+
+from __future__ import annotations
+import argparse
+import random
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+for p in (ROOT / "src", ROOT / "tools"):
+    if str(p) not in sys.path:
+        sys.path.insert(0, str(p))
+
+from detectors import (analyze_text, detect_factuality, detect_mlsignal, detect_stereotypes, detect_toxicity,
+                       detect_domain_terms, scan_lexicons)
+from detectors.lexicon import default_lexicons
+from make_eval import compute_row_metrics, score_factuality, score_stereotypes, score_toxicity
+from utils.profiling import timed
+from utils.scoring import combine_scores
+
+FILLER = "the a report said people often think that this is what we saw in data results".split()
+
+def analyze_strings(text: str) -> dict:
+    # analyze_text's stages (and stage timers), each handed the raw string
+    with timed("analyze_text"):
+        with timed("lexicon_scan"):
+            hits = scan_lexicons(text)
+        with timed("stereotypes"):
+            ster = detect_stereotypes(text, hits)
+        with timed("toxicity"):
+            tox = detect_toxicity(text, hits)
+        with timed("factuality"):
+            fac = detect_factuality(text, hits)
+        with timed("domain"):
+            dom = detect_domain_terms(text, hits)
+        parts = {"stereotypes": ster["score"], "toxicity": tox["score"], "factuality": fac["score"]}
+        with timed("mlsignal"):
+            ml = detect_mlsignal(text)
+        parts["mlsignal"] = ml["score"]
+        with timed("combine"):
+            overall = combine_scores(parts)
+    return {"input_len": len(text), "stereotypes": ster, "toxicity": tox, "factuality": fac, "domain": dom,
+            "mlsignal": ml, "overall": overall}
+
+def rules_strings(text: str) -> tuple:
+    # make_eval's scorers, each normalizing the text itself
+    return score_toxicity(text), score_stereotypes(text), score_factuality(text)
+
+def per_row(fns, texts, rounds: int = 7) -> list:
+    # best of `rounds` passes, alternating the functions so load changes hit both alike
+    best = [float("inf")] * len(fns)
+    for _ in range(rounds):
+        for i, fn in enumerate(fns):
+            t0 = time.perf_counter()
+            for t in texts:
+                fn(t)
+            best[i] = min(best[i], (time.perf_counter() - t0) / len(texts))
+    return best
+
+def peak_kb(fn, texts) -> float:
+    # highest allocation high-water mark over single rows
+    peak = 0
+    tracemalloc.start()
+    try:
+        for t in texts:
+            tracemalloc.reset_peak()
+            base = tracemalloc.get_traced_memory()[0]
+            fn(t)
+            peak = max(peak, tracemalloc.get_traced_memory()[1] - base)
+    finally:
+        tracemalloc.stop()
+    return peak / 1024
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--words", default="20,200,2000", help="Words per text")
+    ap.add_argument("--rows", type=int, default=100, help="Distinct texts per size")
+    ap.add_argument("--seed", type=int, default=0)
+    args = ap.parse_args()
+
+    rng = random.Random(args.seed)
+    terms = [w for v in default_lexicons().values() for w in v]
+    analyze_text("warm up")  # model load is not part of any timing
+
+    pipelines = [
+        ("analyze_text", analyze_strings, analyze_text),
+        ("make_eval rules", rules_strings, compute_row_metrics),
+    ]
+    print(f"{'pipeline':<16} {'words':>6} | {'str us/row':>11} {'peak KB':>8} | {'Document us/row':>15} "
+          f"{'peak KB':>8} | {'speedup':>7}")
+    for words in [int(x) for x in args.words.split(",")]:
+        texts = [" ".join(rng.choice(terms) if rng.random() < 0.05 else rng.choice(FILLER).upper()
+                          if rng.random() < 0.1 else rng.choice(FILLER) for _ in range(words)) + "!"
+                 for _ in range(args.rows)]
+        for name, before, after in pipelines:
+            if any(before(t) != after(t) for t in texts):
+                print(f"{name}: results differ between the two paths")
+                sys.exit(1)
+            b, a = per_row([before, after], texts)
+            print(f"{name:<16} {words:>6} | {b * 1e6:>11.1f} {peak_kb(before, texts):>8.1f} | {a * 1e6:>15.1f} "
+                  f"{peak_kb(after, texts):>8.1f} | {b / a:>6.2f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""
+Full results vs scores_only: analyze_batch building one nested dict per
+row (then flattened into a DataFrame, as the CSV tab used to) against
+scores_only=True filling a BatchScores (typed columns, to_frame()
+without copying). Reports build time, time to a DataFrame, and per-row
+memory: what the results keep alive and the peak while building them
+(tracemalloc). Also per-text latency of analyze_text in both modes, and
+checks every score matches.
+
+Usage:
+  python tools/bench_results.py
+  python tools/bench_results.py --rows 200000 --no-ml
+"""
+
+from __future__ import annotations
+import argparse
+import random
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+ROOT = Path(__file__).resolve().parents[1]
+SRC = ROOT / "src"
+if str(SRC) not in sys.path:
+    sys.path.insert(0, str(SRC))
+
+from detectors import analyze_batch, analyze_text
+from detectors.lexicon import default_lexicons
+from detectors.results import BatchScores
+
+FILLER = "the a report said people often think that this is what we saw in data results".split()
+
+def flatten(results: list) -> pd.DataFrame:
+    # per-row dicts -> DataFrame, the way callers flattened full results
+    return pd.DataFrame([{
+        "input_len": r["input_len"],
+        "toxicity": r["toxicity"]["score"],
+        "stereotypes": r["stereotypes"]["score"],
+        "factuality": r["factuality"]["score"],
+        "ml_prob": r["mlsignal"]["proba"] if "mlsignal" in r else None,
+        "overall": r["overall"]["score"],
+    } for r in results])
+
+def best_of(fns, rounds: int) -> list:
+    # fastest of `rounds` runs each, alternating so load changes hit every mode alike
+    best = [float("inf")] * len(fns)
+    for _ in range(rounds):
+        for i, fn in enumerate(fns):
+            t0 = time.perf_counter()
+            fn()
+            best[i] = min(best[i], time.perf_counter() - t0)
+    return best
+
+def memory(fn) -> tuple:
+    # (bytes still allocated by the result, peak bytes while building it)
+    tracemalloc.start()
+    try:
+        base = tracemalloc.get_traced_memory()[0]
+        result = fn()
+        kept, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    del result
+    return kept - base, peak - base
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--rows", type=int, default=50_000)
+    ap.add_argument("--words", type=int, default=25, help="Words per text")
+    ap.add_argument("--rounds", type=int, default=3)
+    ap.add_argument("--no-ml", action="store_true", help="Rules-only scoring (use_ml=False)")
+    ap.add_argument("--seed", type=int, default=0)
+    args = ap.parse_args()
+
+    rng = random.Random(args.seed)
+    terms = [w for v in default_lexicons().values() for w in v]
+    texts = [" ".join(rng.choice(terms) if rng.random() < 0.05 else rng.choice(FILLER)
+                      for _ in range(rng.randint(args.words // 2, args.words * 3 // 2))) for _ in range(args.rows)]
+    use_ml = not args.no_ml
+    analyze_batch(["warm up"], use_ml=use_ml)  # model load is not part of any timing
+
+    full = analyze_batch(texts, use_ml=use_ml)
+    compact = analyze_batch(texts, use_ml=use_ml, scores_only=True)
+    if not np.array_equal(BatchScores.from_results(full).scores, compact.scores, equal_nan=True):
+        print("scores differ between the two modes")
+        sys.exit(1)
+    frame = compact.to_frame()
+    print(f"to_frame() shares memory with the batch: {np.shares_memory(frame['overall'].to_numpy(), compact.scores)}")
+    del full, compact, frame
+
+    n = len(texts)
+    modes = [
+        ("full dicts", lambda: analyze_batch(texts, use_ml=use_ml), flatten),
+        ("scores_only", lambda: analyze_batch(texts, use_ml=use_ml, scores_only=True), BatchScores.to_frame),
+    ]
+    build = best_of([m[1] for m in modes], args.rounds)
+    print(f"{'mode':<12} | {'build s':>8} {'rows/s':>9} {'frame ms':>9} | {'kept B/row':>10} {'peak B/row':>10}")
+    for (name, run, to_frame), el in zip(modes, build):
+        results = run()
+        frame_s = best_of([lambda: to_frame(results)], args.rounds)[0]
+        del results
+        kept, peak = memory(run)
+        print(f"{name:<12} | {el:>8.2f} {n / el:>9.0f} {frame_s * 1e3:>9.1f} | {kept / n:>10.0f} {peak / n:>10.0f}")
+
+    sample = texts[:2000]
+    single = best_of([lambda: [analyze_text(t, use_ml=use_ml) for t in sample],
+                      lambda: [analyze_text(t, use_ml=use_ml, scores_only=True) for t in sample]], args.rounds)
+    print(f"analyze_text us/row: full {single[0] / len(sample) * 1e6:.1f}, "
+          f"scores_only {single[1] / len(sample) * 1e6:.1f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""
+rewrite_text latency vs input length: compiled two-pass engine against
+the previous one-re.sub-per-rule implementation (kept here as reference),
+plus rewrite_batch throughput. Checks outputs are identical.
+
+Usage:
+  python tools/bench_rewrite.py
+  python tools/bench_rewrite.py --lengths 1000,100000,1000000
+"""
+
+from __future__ import annotations
+import argparse
+import random
+import re
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+SRC = ROOT / "src"
+if str(SRC) not in sys.path:
+    sys.path.insert(0, str(SRC))
+
+from utils.rewrite import rewrite_batch, rewrite_text
+
+LEGACY_SOFT_MAP = {
+    r"\bidiot\b": "person",
+    r"\bstupid\b": "unhelpful",
+    r"\bdumb\b": "unhelpful",
+    r"\bshut\s+up\b": "please be quiet",
+    r"\bhate\b": "dislike",
+}
+
+def legacy_rewrite(text: str) -> str:
+    if not text:
+        return ""
+    out = re.sub(r"!{2,}", "!", text)
+    out = re.sub(r"\?{2,}", "?", out)
+    out = re.sub(r"\b(\w+)(?:\s+\1){2,}\b", lambda m: f"{m.group(1)} {m.group(1)}", out, flags=re.IGNORECASE)
+    out = re.sub(r"\b[A-Z]{3,}\b", lambda m: m.group(0).lower(), out)
+    for pat, repl in LEGACY_SOFT_MAP.items():
+        out = re.sub(pat, repl, out, flags=re.IGNORECASE)
+    out = re.sub(r"\b(so|very|extremely|really)\b", "quite", out, flags=re.IGNORECASE)
+    out = re.sub(r"\s+", " ", out).strip()
+    if out and out[0].islower():
+        out = out[0].upper() + out[1:]
+    return out
+
+WORDS = ("the report said people IDIOT stupid so very REALLY shut up hate dumb "
+         "fine okay data results analysis").split()
+
+def make_text(n_chars: int, rng: random.Random) -> str:
+    parts, size = [], 0
+    while size < n_chars:
+        w = rng.choice(WORDS)
+        if rng.random() < 0.03:
+            w = " ".join([w] * 3)
+        sep = rng.choice([" ", " ", " ", "  ", "!!! ", "?? ", ". ", "\n"])
+        parts.append(w + sep)
+        size += len(w) + len(sep)
+    return "".join(parts)[:n_chars]
+
+def per_call(fn, arg, min_time: float = 0.3) -> float:
+    n, t0 = 0, time.perf_counter()
+    while True:
+        fn(arg)
+        n += 1
+        el = time.perf_counter() - t0
+        if el >= min_time:
+            return el / n
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--lengths", default="100,1000,10000,100000,1000000", help="Input sizes in chars")
+    ap.add_argument("--batch-rows", type=int, default=20_000)
+    ap.add_argument("--seed", type=int, default=0)
+    args = ap.parse_args()
+
+    rng = random.Random(args.seed)
+    print(f"{'chars':>9} {'legacy ms':>10} {'engine ms':>10} {'speedup':>8} {'engine MB/s':>12}")
+    for n in [int(x) for x in args.lengths.split(",")]:
+        text = make_text(n, rng)
+        if rewrite_text(text) != legacy_rewrite(text):
+            print(f"[ERROR] output mismatch at {n} chars", file=sys.stderr)
+            sys.exit(1)
+        old = per_call(legacy_rewrite, text)
+        new = per_call(rewrite_text, text)
+        print(f"{n:>9} {old * 1e3:>10.3f} {new * 1e3:>10.3f} {old / new:>7.2f}x {n / new / 1e6:>12.2f}")
+
+    rows = [make_text(rng.randint(40, 400), rng) for _ in range(args.batch_rows)]
+    t0 = time.perf_counter()
+    legacy = [legacy_rewrite(t) for t in rows]
+    t_old = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    out = rewrite_batch(rows)
+    t_new = time.perf_counter() - t0
+    if out != legacy:
+        print("[ERROR] rewrite_batch output mismatch", file=sys.stderr)
+        sys.exit(1)
+    print(f"\nrewrite_batch: {args.batch_rows / t_new:,.0f} rows/s (legacy loop {args.batch_rows / t_old:,.0f} rows/s)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""
+Cold-start cost in fresh interpreters: `import detectors` (from
+python -X importtime) and time-to-first-result for the rules-only path,
+the full path with a saved model artifact, and the full path with an
+empty cache (training run), with the heavy modules (numpy, pandas,
+sklearn) each one loaded.
+
+Usage:
+  python tools/bench_startup.py --repeat 5
+"""
+
+from __future__ import annotations
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+SRC = ROOT / "src"
+
+TEXT = "Obviously those boomers are stupid, maybe."
+HEAVY = ("numpy", "pandas", "sklearn")
+LOADED = f"print(','.join(m for m in {HEAVY!r} if m in sys.modules) or '-')"
+
+FIRST_RESULT = """
+import sys, time
+t0 = time.perf_counter()
+sys.path.insert(0, {src!r})
+import detectors
+detectors.analyze_text({text!r}, use_ml={use_ml})
+print(time.perf_counter() - t0)
+""" + LOADED
+
+def run(code: str, env: dict, *flags: str) -> subprocess.CompletedProcess:
+    return subprocess.run([sys.executable, *flags, "-c", code], env=env, capture_output=True, text=True, check=True)
+
+def import_time_ms(env: dict) -> tuple:
+    # last line of -X importtime is the top-level package; cumulative column is in us
+    code = f"import sys; sys.path.insert(0, {str(SRC)!r}); import detectors\n" + LOADED
+    proc = run(code, env, "-X", "importtime")
+    line = [l for l in proc.stderr.strip().splitlines() if l.rstrip().endswith("| detectors")][-1]
+    return int(line.split("|")[1]) / 1e3, proc.stdout.strip()
+
+def first_result(env: dict, use_ml: bool) -> tuple:
+    out = run(FIRST_RESULT.format(src=str(SRC), text=TEXT, use_ml=use_ml), env).stdout.split()
+    return float(out[0]) * 1e3, out[1]
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--repeat", type=int, default=5)
+    args = ap.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        env = dict(os.environ, BIAS_DETECTOR_CACHE_DIR=tmp)
+        rows = []
+
+        imports = [import_time_ms(env) for _ in range(args.repeat)]
+        rows.append(("import detectors", statistics.median(r[0] for r in imports), imports[0][1]))
+
+        rules = [first_result(env, use_ml=False) for _ in range(args.repeat)]
+        rows.append(("first result, rules-only", statistics.median(r[0] for r in rules), rules[0][1]))
+
+        # empty cache: first full run trains and saves the artifact
+        for f in Path(tmp).glob("models/*"):
+            f.unlink()
+        cold = first_result(env, use_ml=True)
+        rows.append(("first result, full (train)", cold[0], cold[1]))
+
+        warm = [first_result(env, use_ml=True) for _ in range(args.repeat)]
+        rows.append(("first result, full (artifact)", statistics.median(r[0] for r in warm), warm[0][1]))
+
+    print(f"{'measurement':<32} {'ms':>9}  heavy modules loaded")
+    for name, ms, loaded in rows:
+        print(f"{name:<32} {ms:>9.1f}  {loaded}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+"""
+Sustained throughput and per-record latency of tools/score_jsonl.py.
+A generator thread writes JSONL records into its stdin at a fixed rate
+(or as fast as the pipe takes them), a reader thread timestamps each
+output line. Latency runs from a record's scheduled send time, so time
+spent blocked on a full pipe (backpressure) counts too. Also checks
+output order.
+
+With --emit N it only generates: N records on stdout, for trying the
+scorer in a real pipeline.
+
+Usage:
+  python tools/bench_stream.py
+  python tools/bench_stream.py --rates 500,2000,max --records 20000 --scorer-args="--cascade"
+  python tools/bench_stream.py --emit 100000 | python tools/score_jsonl.py > /dev/null
+"""
+
+from __future__ import annotations
+import argparse
+import json
+import os
+import random
+import shlex
+import subprocess
+import sys
+import threading
+import time
+from pathlib import Path
+
+import numpy as np
+
+ROOT = Path(__file__).resolve().parents[1]
+SRC = ROOT / "src"
+if str(SRC) not in sys.path:
+    sys.path.insert(0, str(SRC))
+
+from detectors.lexicon import default_lexicons
+
+SCORER = str(ROOT / "tools" / "score_jsonl.py")
+FILLER = "the a report said people often think that this is what we saw in data results today".split()
+
+def records(n: int, seed: int = 0):
+    rng = random.Random(seed)
+    terms = [w for v in default_lexicons().values() for w in v]
+    for i in range(n):
+        words = [rng.choice(terms) if rng.random() < 0.06 else rng.choice(FILLER) for _ in range(rng.randint(6, 40))]
+        yield {"id": i, "user": f"u{rng.randrange(1000)}", "text": " ".join(words)}
+
+def run(rate: float | None, n: int, scorer_args: list, seed: int) -> dict:
+    proc = subprocess.Popen([sys.executable, SCORER, *scorer_args], stdin=subprocess.PIPE, stdout=subprocess.PIPE)
+    # one record through first: warm-up is not part of the measurement
+    proc.stdin.write(b'{"text": "warm up"}\n')
+    proc.stdin.flush()
+    proc.stdout.readline()
+
+    lines = [json.dumps(r).encode("utf-8") + b"\n" for r in records(n, seed)]
+    sent = np.zeros(n)
+    recv = np.zeros(n)
+    ids = []
+
+    def read() -> None:
+        for i in range(n):
+            line = proc.stdout.readline()
+            recv[i] = time.perf_counter()
+            ids.append(json.loads(line)["id"])
+
+    reader = threading.Thread(target=read, daemon=True)
+    reader.start()
+    t0 = time.perf_counter()
+    for i, line in enumerate(lines):
+        if rate:
+            due = t0 + i / rate
+            sent[i] = due
+            wait = due - time.perf_counter()
+            if wait > 0:
+                time.sleep(wait)
+        else:
+            sent[i] = time.perf_counter()
+        proc.stdin.write(line)
+        if rate:
+            proc.stdin.flush()
+    proc.stdin.close()
+    reader.join()
+    proc.wait()
+
+    lat = (recv - sent) * 1e3
+    return {"records_s": n / (recv.max() - t0), "p50": np.percentile(lat, 50), "p95": np.percentile(lat, 95),
+            "p99": np.percentile(lat, 99), "max": lat.max(), "ordered": ids == list(range(n))}
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--rates", default="200,1000,5000,max", help="Records/s offered ('max': as fast as possible)")
+    ap.add_argument("--records", type=int, default=20_000, help="Records per rate (capped at --seconds worth)")
+    ap.add_argument("--seconds", type=float, default=10.0, help="Max duration per fixed rate")
+    ap.add_argument("--scorer-args", default="", help="Extra score_jsonl.py arguments")
+    ap.add_argument("--emit", type=int, default=0, help="Only write this many records to stdout")
+    ap.add_argument("--seed", type=int, default=0)
+    args = ap.parse_args()
+
+    if args.emit:
+        try:
+            for r in records(args.emit, args.seed):
+                sys.stdout.write(json.dumps(r) + "\n")
+            sys.stdout.flush()
+        except BrokenPipeError:
+            os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+        return
+
+    print(f"{'offered/s':>9} {'records':>8} | {'sustained/s':>11} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} "
+          f"{'max ms':>8} {'ordered':>8}")
+    for spec in args.rates.split(","):
+        rate = None if spec == "max" else float(spec)
+        n = args.records if rate is None else min(args.records, int(rate * args.seconds))
+        r = run(rate, n, shlex.split(args.scorer_args), args.seed)
+        print(f"{spec:>9} {n:>8} | {r['records_s']:>11.0f} {r['p50']:>8.2f} {r['p95']:>8.2f} {r['p99']:>8.2f} "
+              f"{r['max']:>8.1f} {str(r['ordered']):>8}")
+
+if __name__ == "__main__":
+    main()
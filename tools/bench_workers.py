@@ -0,0 +1,86 @@
+"""
+Scaling of make_eval scoring and detectors.analyze_batch with --workers
+1..N on a synthetic corpus. Checks every run matches the 1-worker output.
+
+Usage:
+  python tools/bench_workers.py --rows 200000 --max-workers 32
+"""
+
+from __future__ import annotations
+import argparse
+import os
+import random
+import sys
+import time
+from pathlib import Path
+
+import pandas as pd
+
+ROOT = Path(__file__).resolve().parents[1]
+SRC = ROOT / "src"
+for p in (SRC, ROOT / "tools"):
+    if str(p) not in sys.path:
+        sys.path.insert(0, str(p))
+
+import make_eval
+from detectors import analyze_batch
+
+WORDS = (
+    "women are men always never people from the report said idiot stupid shut up "
+    "obviously clearly maybe seems it could boomer emotional hate this that !!!"
+).split()
+TAGS = ["neutral", "toxicity", "stereotype", "factuality-mixed", "mlsignal"]
+
+def synthetic_frame(rows: int, seed: int) -> pd.DataFrame:
+    rng = random.Random(seed)
+    return pd.DataFrame({
+        "id": range(rows),
+        "text": [" ".join(rng.choices(WORDS, k=rng.randint(5, 40))) for _ in range(rows)],
+        "tag": [rng.choice(TAGS) for _ in range(rows)],
+    })
+
+def worker_counts(max_workers: int) -> list:
+    out, n = [], 1
+    while n < max_workers:
+        out.append(n)
+        n *= 2
+    return out + [max_workers]
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--rows", type=int, default=50_000)
+    ap.add_argument("--max-workers", type=int, default=os.cpu_count() or 1)
+    ap.add_argument("--seed", type=int, default=0)
+    args = ap.parse_args()
+
+    df = synthetic_frame(args.rows, args.seed)
+    vect, clf = make_eval.train_or_load_mlsignal(df)
+    texts = df["text"].tolist()
+
+    print(f"rows={args.rows} cpus={os.cpu_count()}")
+    print(f"{'workers':>7} {'make_eval rows/s':>17} {'speedup':>8} {'analyze_batch rows/s':>21} {'speedup':>8}")
+    ref_csv = ref_batch = None
+    base_me = base_ab = None
+    for w in worker_counts(args.max_workers):
+        t0 = time.perf_counter()
+        pool = make_eval.make_pool(w, vect, clf)
+        try:
+            out_csv = make_eval.score_frame(df.copy(), vect, clf, pool).to_csv(index=False)
+        finally:
+            if pool is not None:
+                pool.shutdown()
+        me = args.rows / (time.perf_counter() - t0)
+
+        t0 = time.perf_counter()
+        out_batch = analyze_batch(texts, workers=w)
+        ab = args.rows / (time.perf_counter() - t0)
+
+        if ref_csv is None:
+            ref_csv, ref_batch, base_me, base_ab = out_csv, out_batch, me, ab
+        elif out_csv != ref_csv or out_batch != ref_batch:
+            print(f"[ERROR] output with {w} workers differs from 1 worker", file=sys.stderr)
+            sys.exit(1)
+        print(f"{w:>7} {me:>17.0f} {me / base_me:>7.2f}x {ab:>21.0f} {ab / base_ab:>7.2f}x")
+
+if __name__ == "__main__":
+    main()
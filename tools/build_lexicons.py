@@ -0,0 +1,43 @@
+"""
+Compile a directory of lexicon files (<group>.txt, one term per line)
+together with the built-in lexicons into one memory-mapped index file.
+
+Point BIAS_DETECTOR_LEXICONS at the .idx file and every worker process
+maps the same pages. Re-running this script replaces the file atomically
+(write + rename), and running services switch to it within
+RELOAD_INTERVAL seconds without a restart.
+
+Usage:
+  python tools/build_lexicons.py --src lexicons/ --out .cache/lexicons.idx
+"""
+
+from __future__ import annotations
+import argparse
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+SRC = ROOT / "src"
+if str(SRC) not in sys.path:
+    sys.path.insert(0, str(SRC))
+
+from detectors.lexicon import LexiconIndex, all_lexicons, compile_index, read_lexicon_dir
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--src", required=True, help="Directory of <group>.txt lexicon files")
+    ap.add_argument("--out", required=True, help="Index file to write (replaced atomically)")
+    args = ap.parse_args()
+
+    t0 = time.perf_counter()
+    extra, versions = read_lexicon_dir(Path(args.src))
+    path = compile_index(all_lexicons(extra), Path(args.out), versions)
+    idx = LexiconIndex(path)
+    print(f"Saved: {path.resolve()} ({path.stat().st_size / 1e6:.1f} MB, {idx.n_terms} terms, "
+          f"{len(idx.group_names)} groups, version {idx.version}, {time.perf_counter() - t0:.2f}s)")
+    for g, v in versions.items():
+        print(f"  {g}: {len(extra[g])} terms" + (f" (version {v})" if v else ""))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,42 @@
+"""
+Train the baseline ML model once and write prebuilt artifacts that
+scoring processes load instead of retraining: the sklearn bundle and its
+compiled form (models.compiled), which scoring uses without sklearn.
+
+Default output is src/models/artifacts/, which models.baseline checks
+before the cache dir. The file name carries the training fingerprint,
+so an artifact is ignored automatically once data/hyperparams change.
+
+Usage:
+  python tools/build_model.py
+  python tools/build_model.py --out .cache/models
+"""
+
+from __future__ import annotations
+import argparse
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+SRC = ROOT / "src"
+if str(SRC) not in sys.path:
+    sys.path.insert(0, str(SRC))
+
+from models.baseline import ARTIFACT_DIR, _train, save_compiled, save_model
+from models.compiled import compile_bundle
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--out", dest="outdir", default=str(ARTIFACT_DIR), help="Output directory")
+    args = ap.parse_args()
+
+    t0 = time.perf_counter()
+    bundle = _train()
+    path = save_model(bundle, Path(args.outdir))
+    print(f"Saved: {path.resolve()} ({path.stat().st_size / 1024:.1f} KiB, trained in {time.perf_counter() - t0:.2f}s)")
+    path = save_compiled(compile_bundle(bundle.vect, bundle.clf), bundle.fingerprint, Path(args.outdir))
+    print(f"Saved: {path.resolve()} ({path.stat().st_size / 1024:.1f} KiB)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+"""
+Evaluation report for cascade mode (analyze_batch(..., cascade=True)):
+share of ML calls avoided, per-band breakdown, wall time, and a check
+that no row changes severity band against the full pipeline. Rows that
+did run the ML signal must match the full result exactly.
+
+Usage:
+  python tools/eval_cascade.py --in tests/tests_snippets.csv
+  python tools/eval_cascade.py --synthetic 5000 --out cascade_report.json
+
+Exits with status 1 if any row differs (band change or ML-row mismatch).
+"""
+
+from __future__ import annotations
+import argparse
+import json
+import sys
+import time
+from collections import Counter
+from pathlib import Path
+
+import pandas as pd
+
+ROOT = Path(__file__).resolve().parents[1]
+for p in (ROOT / "src", ROOT / "tools"):
+    if str(p) not in sys.path:
+        sys.path.insert(0, str(p))
+
+from detectors import analyze_batch, analyze_text, warm_model
+from utils.scoring import severity_band
+
+def _synthetic(n: int, seed: int) -> list:
+    from bench import make_corpus  # same reproducible corpora as the benchmark suite
+    per = max(1, n // 8)
+    rows = []
+    for d in (0.0, 0.05, 0.2, 0.5):
+        rows += make_corpus(per, 12, d, seed) + make_corpus(per, 120, d, seed)
+    return rows
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--in", dest="inp", default=None, help="CSV with a text column")
+    ap.add_argument("--synthetic", type=int, default=0, help="Use N synthetic rows (mixed lengths/densities)")
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--per-text-sample", type=int, default=2000,
+                    help="Rows timed through analyze_text one by one (the per-request path)")
+    ap.add_argument("--out", default=None, help="Also write the report as JSON")
+    args = ap.parse_args()
+
+    if args.synthetic:
+        texts = _synthetic(args.synthetic, args.seed)
+        source = f"synthetic:{len(texts)}"
+    else:
+        inp = Path(args.inp or ROOT / "tests" / "tests_snippets.csv")
+        texts = pd.read_csv(inp)["text"].fillna("").astype(str).tolist()
+        source = str(inp)
+
+    warm_model()  # model load is not part of either timing
+    t0 = time.perf_counter()
+    full = analyze_batch(texts)
+    t_full = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    cas = analyze_batch(texts, cascade=True)
+    t_cas = time.perf_counter() - t0
+
+    sample = texts[:args.per_text_sample]
+    t0 = time.perf_counter()
+    for t in sample:
+        analyze_text(t)
+    t_full_1 = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    for t in sample:
+        analyze_text(t, cascade=True)
+    t_cas_1 = time.perf_counter() - t0
+
+    skipped = band_changes = ml_mismatch = 0
+    by_band: Counter = Counter()
+    skipped_by_band: Counter = Counter()
+    for f, c in zip(full, cas):
+        band = severity_band(f["overall"]["score"])
+        by_band[band] += 1
+        if severity_band(c["overall"]["score"]) != band:
+            band_changes += 1
+        if c["skipped"]:
+            skipped += 1
+            skipped_by_band[band] += 1
+        elif {k: v for k, v in c.items() if k != "skipped"} != f:
+            ml_mismatch += 1
+
+    n = len(texts)
+    report = {
+        "source": source,
+        "rows": n,
+        "ml_calls_full": n,
+        "ml_calls_cascade": n - skipped,
+        "ml_calls_avoided": skipped / n if n else 0.0,
+        "band_changes": band_changes,
+        "ml_row_mismatches": ml_mismatch,
+        "by_band": {b: {"rows": by_band[b], "ml_skipped": skipped_by_band[b]} for b in sorted(by_band)},
+        "seconds_full": t_full,
+        "seconds_cascade": t_cas,
+        "per_text_rows": len(sample),
+        "per_text_seconds_full": t_full_1,
+        "per_text_seconds_cascade": t_cas_1,
+    }
+
+    print(f"Source: {source}  rows: {n}")
+    print(f"ML calls avoided: {skipped}/{n} ({report['ml_calls_avoided']:.1%})")
+    for b, r in report["by_band"].items():
+        print(f"  {b:<9} rows {r['rows']:>7}  ML skipped {r['ml_skipped']:>7}")
+    print(f"Band changes vs full pipeline: {band_changes}")
+    print(f"Rows with ML that differ from full: {ml_mismatch}")
+    print(f"Batch time: full {t_full:.3f}s, cascade {t_cas:.3f}s ({t_full / t_cas if t_cas else 0:.2f}x)")
+    print(f"Per-text time ({len(sample)} rows): full {t_full_1:.3f}s, cascade {t_cas_1:.3f}s "
+          f"({t_full_1 / t_cas_1 if t_cas_1 else 0:.2f}x)")
+    if args.out:
+        Path(args.out).write_text(json.dumps(report, indent=2), encoding="utf-8")
+        print(f"Saved: {Path(args.out).resolve()}")
+    if band_changes or ml_mismatch:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+"""
+Worst-case time per megabyte on pathological inputs: long runs of one
+character, repeated words that almost form a repeat run, near-miss
+lexicon prefixes and stereotype patterns, whitespace and punctuation
+floods, non-ASCII. Every hot text path (lexicon scan with the regex
+matcher and the file index, rewrite, sentence splitting, make_eval's
+rule scorers, the compiled model's tokenizer, analyze_text with no
+length limit) is timed on each input at two sizes. Fails (exit 1) when
+any case costs more than --budget seconds per MB, or grows more than
+--max-growth times for 4x the input (superlinear matching). Also checks
+that analyze_text on a --huge MB paste is clipped to MAX_TEXT_CHARS.
+
+Usage:
+  python tools/fuzz_inputs.py
+  python tools/fuzz_inputs.py --mb 2 --budget 1.0 --only rewrite,analyze_text
+"""
+
+from __future__ import annotations
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+for p in (ROOT / "src", ROOT / "tools"):
+    if str(p) not in sys.path:
+        sys.path.insert(0, str(p))
+
+import detectors
+from detectors import analyze_text
+from detectors.lexicon import LexiconIndex, LexiconMatcher, all_lexicons, compile_index
+from make_eval import compute_row_metrics
+from models.baseline import get_compiled
+from utils.rewrite import rewrite_text
+from utils.text import sentence_spans
+
+def repeat(unit: str):
+    return lambda n: (unit * (n // len(unit) + 1))[:n]
+
+INPUTS = {
+    "one char": repeat("a"),
+    "spaces": repeat(" "),
+    "one-letter words": repeat("a "),
+    "repeated word": repeat("idiot "),
+    "repeat then miss": repeat("idiot " * 50 + "idiotx "),
+    "prefix repeats": repeat("ab " * 30 + "abc "),
+    "word + space runs": repeat("word" + " " * 50),
+    "bangs": repeat("!"),
+    "?! alternating": repeat("?!"),
+    "caps words": repeat("ABC "),
+    "lexicon prefix": repeat("kids these "),
+    "stereotype miss": repeat("people from "),
+    "group word run": repeat("women "),
+    "tabs/newlines": repeat("a\t\n"),
+    "dots": repeat("a."),
+    "non-ASCII": repeat("é日本 "),
+}
+
+def targets(index_path: Path) -> dict:
+    regex = LexiconMatcher(all_lexicons())
+    index = LexiconIndex(index_path)
+    model = get_compiled()
+    return {
+        "scan regex": regex.scan,
+        "scan index": index.scan,
+        "rewrite": rewrite_text,
+        "sentence_spans": sentence_spans,
+        "make_eval rules": compute_row_metrics,
+        "model tokens": model.predict_proba if model is not None else None,
+        "analyze_text": analyze_text,
+    }
+
+def best_time(fn, text: str, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn(text)
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--mb", type=float, default=1.0, help="Large input size in MB (small is a quarter of it)")
+    ap.add_argument("--budget", type=float, default=2.0, help="Max seconds per MB for any case")
+    ap.add_argument("--max-growth", type=float, default=8.0, help="Max time ratio for 4x the input")
+    ap.add_argument("--min-time", type=float, default=0.02, help="Growth is only judged above this many seconds")
+    ap.add_argument("--huge", type=float, default=8.0, help="MB pasted into analyze_text with the length limit on")
+    ap.add_argument("--only", default="", help="Comma-separated subset of the timed functions")
+    ap.add_argument("--repeat", type=int, default=2, help="Runs per case (fastest counts)")
+    args = ap.parse_args()
+
+    limit = detectors.MAX_TEXT_CHARS
+    detectors.MAX_TEXT_CHARS = 0  # time the full input; the limit is checked separately below
+    analyze_text("warm up")
+    with tempfile.TemporaryDirectory() as tmp:
+        fns = {k: v for k, v in targets(compile_index(all_lexicons(), Path(tmp) / "lexicons.idx")).items()
+               if v is not None and (not args.only or k in args.only.split(","))}
+
+        large = int(args.mb * 1_000_000)
+        failures = []
+        print(f"{'input':<18} {'function':<16} {'s/MB':>7} {'x4 growth':>10}")
+        for label, make in INPUTS.items():
+            small_text, large_text = make(large // 4), make(large)
+            for name, fn in fns.items():
+                small = best_time(fn, small_text, args.repeat)
+                big = best_time(fn, large_text, args.repeat)
+                per_mb = big / args.mb
+                growth = big / max(small, 1e-9)
+                bad = per_mb > args.budget or (big > args.min_time and growth > args.max_growth)
+                if bad:
+                    failures.append((label, name))
+                print(f"{label:<18} {name:<16} {per_mb:>7.3f} {growth:>9.1f}x{'  FAIL' if bad else ''}")
+
+    detectors.MAX_TEXT_CHARS = limit
+    if limit:
+        huge = INPUTS["repeat then miss"](int(args.huge * 1_000_000))
+        t0 = time.perf_counter()
+        result = analyze_text(huge)
+        el = time.perf_counter() - t0
+        ok = result.get("truncated") and result["scored_len"] <= limit and el <= args.budget * max(limit / 1e6, 0.1)
+        print(f"analyze_text on {args.huge:g} MB: scored {result.get('scored_len', result['input_len'])} chars "
+              f"in {el:.3f}s{'' if ok else '  FAIL'}")
+        if not ok:
+            failures.append(("huge paste", "analyze_text"))
+    else:
+        print(f"length limit off ({detectors.MAX_CHARS_ENV}=0): huge-paste check skipped")
+
+    if failures:
+        print(f"{len(failures)} case(s) over budget: " + ", ".join(f"{n} on {l}" for l, n in failures))
+        sys.exit(1)
+    print("all cases within budget")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""
+Load test for tools/serve.py: p50/p99 latency and throughput at several
+concurrency levels. Starts an in-process server unless --url is given.
+
+Usage:
+  python tools/loadtest_server.py --concurrency 1,8,32,128 --requests 2000
+  python tools/loadtest_server.py --url http://127.0.0.1:8765
+"""
+
+from __future__ import annotations
+import argparse
+import http.client
+import json
+import random
+import sys
+import threading
+import time
+from pathlib import Path
+from urllib.parse import urlparse
+
+import numpy as np
+
+ROOT = Path(__file__).resolve().parents[1]
+for p in (ROOT / "src", ROOT / "tools"):
+    if str(p) not in sys.path:
+        sys.path.insert(0, str(p))
+
+WORDS = "people are always the report said idiot stupid obviously maybe seems boomer emotional this that".split()
+
+def worker(host: str, port: int, texts: list, latencies: list) -> None:
+    conn = http.client.HTTPConnection(host, port, timeout=60)
+    for t in texts:
+        body = json.dumps({"text": t})
+        t0 = time.perf_counter()
+        conn.request("POST", "/analyze", body=body, headers={"Content-Type": "application/json"})
+        resp = conn.getresponse()
+        resp.read()
+        latencies.append(time.perf_counter() - t0)
+        if resp.status != 200:
+            raise RuntimeError(f"HTTP {resp.status}")
+    conn.close()
+
+def run_level(host: str, port: int, concurrency: int, n_requests: int, rng: random.Random) -> dict:
+    per = max(1, n_requests // concurrency)
+    latencies: list = []
+    threads = [
+        threading.Thread(target=worker, args=(host, port, [" ".join(rng.choices(WORDS, k=20)) for _ in range(per)], latencies))
+        for _ in range(concurrency)
+    ]
+    t0 = time.perf_counter()
+    for th in threads:
+        th.start()
+    for th in threads:
+        th.join()
+    elapsed = time.perf_counter() - t0
+    lat = np.array(latencies) * 1e3
+    return {
+        "concurrency": concurrency, "requests": len(lat), "rps": len(lat) / elapsed,
+        "p50_ms": float(np.percentile(lat, 50)), "p99_ms": float(np.percentile(lat, 99)),
+    }
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--url", default=None, help="Existing server (default: start one in-process)")
+    ap.add_argument("--concurrency", default="1,4,16,64")
+    ap.add_argument("--requests", type=int, default=1000, help="Requests per concurrency level")
+    ap.add_argument("--max-batch", type=int, default=64)
+    ap.add_argument("--max-wait-ms", type=float, default=5.0)
+    args = ap.parse_args()
+
+    server = batcher = None
+    if args.url:
+        u = urlparse(args.url)
+        host, port = u.hostname, u.port or 80
+    else:
+        import serve
+        server, batcher = serve.make_server("127.0.0.1", 0, args.max_batch, args.max_wait_ms)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        host, port = server.server_address[0], server.server_address[1]
+
+    rng = random.Random(0)
+    run_level(host, port, 1, 20, rng)  # warm-up: model load
+    print(f"{'conc':>5} {'reqs':>6} {'req/s':>8} {'p50 ms':>8} {'p99 ms':>8}")
+    for c in [int(x) for x in args.concurrency.split(",")]:
+        r = run_level(host, port, c, args.requests, rng)
+        print(f"{r['concurrency']:>5} {r['requests']:>6} {r['rps']:>8.0f} {r['p50_ms']:>8.2f} {r['p99_ms']:>8.2f}")
+
+    if server is not None:
+        print(f"batching: {batcher.stats}")
+        server.shutdown()
+        batcher.close()
+
+if __name__ == "__main__":
+    main()
@@ -2,28 +2,81 @@
 Run all detectors (toxicity, stereotypes, factuality, mlsignal) on a CSV
 and save per-row metrics + overall score.
 
-Inputs (CSV):
+Inputs (CSV, Parquet or Arrow IPC, by extension; columnar inputs only read these columns):
   id,text,tag
 
-Outputs (CSV):
+Outputs (CSV, Parquet or Arrow IPC, by extension):
   id,text,tag,toxicity,stereotypes,factuality,ml_prob,overall
 
 Usage (Windows CMD):
   python tools\\make_eval.py --in tests\\tests_snippets.csv --out tests\\evals_output.csv
+
+Use all cores (same output as a single-process run):
+  python tools/make_eval.py --in big.csv --out big_eval.csv --workers 8
+
+Per-stage timings (read, train, rules, mlsignal, overall, write):
+  python tools/make_eval.py --in big.csv --out big_eval.csv --profile
+
+Large inputs (chunked, bounded memory, resumable after a crash):
+  python tools/make_eval.py --in big.csv --out big_eval.csv --stream --chunksize 100000
+  python tools/make_eval.py --in big.csv --out big_eval.csv --stream --resume
+
+Columnar I/O (needs pyarrow; one Parquet row group / Arrow batch per chunk; --resume is CSV-only):
+  python tools/make_eval.py --in data.parquet --out results.parquet --stream --chunksize 100000
+
+Score one row per group of copies that differ only in case/whitespace (the
+scorers here ignore both, so every copy gets its own score) and copy its
+scores to the rest (adds a group_id column: the id of the group's first row).
+--near-dup also labels clusters of rows whose MinHash similarity reaches the
+threshold in group_id; those are still scored individually (in --stream mode,
+groups and clusters are per chunk):
+  python tools/make_eval.py --in tweets.csv --out tweets_eval.csv --dedup
+  python tools/make_eval.py --in tweets.csv --out tweets_eval.csv --near-dup 0.8
+
+Evaluate scored output (no detectors re-run): precision/recall/F1, ROC-AUC and
+confusion matrices per detector and overall, every threshold, and a grid of
+combine weights; --report also writes the report as JSON:
+  python tools/make_eval.py --in big_eval.parquet --evaluate --report eval_report.json --weight-step 0.05
+  python tools/make_eval.py --in big.csv --out big_eval.csv --report eval_report.json
+
+Train the ML stub on every labeled row (hashed features + SGD, one chunk
+in memory at a time) and keep it for the app/service (BIAS_DETECTOR_MODEL):
+  python tools/make_eval.py --in big.csv --out big_eval.csv --stream --ooc --save-model .cache/models/ooc.joblib
+  python tools/make_eval.py --in other.csv --out other_eval.csv --model .cache/models/ooc.joblib
 """
 
 
 from __future__ import annotations
 import argparse
+import itertools
+import json
+import os
+import hashlib
 import re
 import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-from typing import List, Tuple
+from typing import Dict, List, Tuple
 
 import numpy as np
 import pandas as pd
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.linear_model import LogisticRegression
+from sklearn.feature_extraction.text import HashingVectorizer, TfidfVectorizer
+from sklearn.linear_model import LogisticRegression, SGDClassifier
+
+# --- make `src/` importable (shared profiling hooks) ---
+ROOT = Path(__file__).resolve().parents[1]
+SRC = ROOT / "src"
+if str(SRC) not in sys.path:
+    sys.path.insert(0, str(SRC))
+
+from models.baseline import _ModelBundle, load_model_file, write_model
+from utils import metrics, profiling
+from utils.profiling import timed
+from utils.scoring import SEVERITY_BANDS
+from utils.tableio import TableWriter, iter_table, read_columns, read_table, table_format
+from utils.dedup import Deduper
+from utils.text import Document, as_document
 
 # ---- Weights & hyperparams (match app) ----
 W_TOX = 0.40
@@ -37,8 +90,8 @@ BAD_WORDS = {
     "idiot", "stupid", "dumb", "shut up", "moron", "trash", "hate"
 }
 STEREO_PATTERNS = [
-    r"\b(women|men|girls|boys|teenagers|immigrants|elderly)\s+(are|can't|shouldn't|always|never)\b",
-    r"\b(people from|folks from)\s+\w+\s+(are|can't|shouldn't|always|never)\b",
+    r"\b(women|men|girls|boys|teenagers|immigrants|elderly)\s++(are|can't|shouldn't|always|never)\b",
+    r"\b(people from|folks from)\s++\w++\s++(are|can't|shouldn't|always|never)\b",
 ]
 CLAIMY_PHRASES = [
     "everyone knows", "100% true", "without a doubt", "obviously", "clearly",
@@ -47,18 +100,18 @@ HEDGE_PHRASES = [
     "maybe", "might", "it might", "it could", "possibly", "it may", "seems", "appears",
 ]
 
-def _norm_ws(s: str) -> str:
-    return re.sub(r"\s+", " ", s.lower()).strip()
+_WORD_TOKENS = re.compile(r"[a-z']+")
 
-def score_toxicity(text: str) -> float:
-    t = _norm_ws(text)
+def score_toxicity(text: str | Document) -> float:
+    doc = as_document(text)
+    t = doc.normalized
     score = 0.0
     # phrase bump: each bad word adds 1.0
     for w in BAD_WORDS:
         if w in t:
             score += 1.0
     # repeats: any token appearing >=3 times adds 1.0
-    toks = re.findall(r"[a-z']+", t)
+    toks = doc.findall(_WORD_TOKENS)  # same tokens as in `t`: the pattern never matches whitespace
     if not toks:
         return score
     from collections import Counter
@@ -70,16 +123,16 @@ def score_toxicity(text: str) -> float:
         score += 0.5
     return score
 
-def score_stereotypes(text: str) -> float:
-    t = _norm_ws(text)
+def score_stereotypes(text: str | Document) -> float:
+    t = as_document(text).normalized
     matches = 0
     for p in STEREO_PATTERNS:
         matches += len(re.findall(p, t))
     # 2.5 per match
     return 2.5 * matches
 
-def score_factuality(text: str) -> float:
-    t = _norm_ws(text)
+def score_factuality(text: str | Document) -> float:
+    t = as_document(text).normalized
     score = 0.0
     # claimy = +2.0 each
     for p in CLAIMY_PHRASES:
@@ -98,9 +151,7 @@ def train_or_load_mlsignal(df: pd.DataFrame) -> Tuple[TfidfVectorizer, LogisticR
     as positive (biased-ish), others negative. This is just for stub evals.
     """
     X_text = df["text"].astype(str).tolist()
-    y = df["tag"].astype(str).str.contains(
-        r"(toxicity|stereotype|mlsignal)", case=False, regex=True
-    ).astype(int).to_numpy()
+    y = _labels(df["tag"])
 
     vect = TfidfVectorizer(ngram_range=(1,2), min_df=1)
     X = vect.fit_transform(X_text)
@@ -108,6 +159,43 @@ def train_or_load_mlsignal(df: pd.DataFrame) -> Tuple[TfidfVectorizer, LogisticR
     clf.fit(X, y)
     return vect, clf
 
+def _labels(tags: pd.Series) -> np.ndarray:
+    return tags.astype(str).str.contains(
+        r"(toxicity|stereotype|mlsignal)", case=False, regex=True
+    ).astype(int).to_numpy()
+
+# ---- Out-of-core training: fixed hashed feature space + incremental linear model ----
+HASH_FEATURES = 2 ** 20
+
+def train_out_of_core(inp: Path, chunksize: int, n_features: int = HASH_FEATURES, epochs: int = 1
+                      ) -> Tuple[HashingVectorizer, SGDClassifier]:
+    """
+    Same labels as train_or_load_mlsignal, but over the whole CSV one chunk
+    at a time: HashingVectorizer needs no vocabulary and SGDClassifier
+    (log loss, so predict_proba works) learns via partial_fit. Memory is
+    bounded by chunksize and n_features, not by the number of rows.
+    """
+    vect = HashingVectorizer(ngram_range=(1, 2), n_features=n_features, alternate_sign=False, norm="l2")
+    clf = SGDClassifier(loss="log_loss", alpha=1e-5, random_state=0)
+    rows, t0 = 0, time.perf_counter()
+    for _ in range(epochs):
+        for chunk in iter_table(inp, chunksize, ["text", "tag"]):
+            X = vect.transform(chunk["text"].astype(str).tolist())
+            clf.partial_fit(X, _labels(chunk["tag"]), classes=[0, 1])
+            rows += len(chunk)
+    el = time.perf_counter() - t0
+    print(f"Trained out-of-core: {rows} rows x {epochs} epoch(s) in {el:.2f}s "
+          f"({rows / el if el else 0:,.0f} rows/s)", file=sys.stderr)
+    return vect, clf
+
+def _ooc_fingerprint(inp: Path, n_features: int, epochs: int) -> str:
+    import sklearn
+    st = inp.stat()
+    payload = json.dumps({"input": str(inp.resolve()), "size": st.st_size, "mtime": st.st_mtime,
+                          "n_features": n_features, "epochs": epochs, "sklearn": sklearn.__version__},
+                         sort_keys=True)
+    return "ooc-" + hashlib.sha256(payload.encode("utf-8")).hexdigest()[:12]
+
 def ml_probability(vect: TfidfVectorizer, clf: LogisticRegression, texts: List[str]) -> np.ndarray:
     X = vect.transform(texts)
     p = clf.predict_proba(X)[:, 1]
@@ -122,67 +210,507 @@ def normalize_for_overall(tox: float, st: float, fact: float, ml_prob: float) ->
     ml_n   = float(np.clip(ml_prob, 0, 1))
     return tox_n, st_n, fact_n, ml_n
 
-def compute_row_metrics(text: str) -> Tuple[float,float,float]:
-    tox  = score_toxicity(text)
-    st   = score_stereotypes(text)
-    fact = score_factuality(text)
+def compute_row_metrics(text: str | Document) -> Tuple[float,float,float]:
+    doc  = as_document(text)  # normalized once for all three scorers
+    tox  = score_toxicity(doc)
+    st   = score_stereotypes(doc)
+    fact = score_factuality(doc)
     return tox, st, fact
 
+def score_texts(texts: List[str], vect: TfidfVectorizer, clf: LogisticRegression
+                ) -> Tuple[List[float], List[float], List[float], np.ndarray]:
+    """Per-row (toxicity, stereotypes, factuality, ml_prob) for `texts`."""
+    # compute rule-based detectors
+    with timed("make_eval.rules"):
+        tox_list, st_list, fact_list = [], [], []
+        for txt in texts:
+            tox, st, fact = compute_row_metrics(txt)
+            tox_list.append(tox); st_list.append(st); fact_list.append(fact)
+
+    # mlsignal (TF-IDF + LogReg on stub)
+    with timed("make_eval.mlsignal"):
+        ml_probs = ml_probability(vect, clf, texts)
+    return tox_list, st_list, fact_list, ml_probs
+
+# ---- Process-pool workers: model is sent once per worker, then reused ----
+WORKER_PIECE_ROWS = 2_000
+_WORKER_MODEL: Tuple[TfidfVectorizer, LogisticRegression] | None = None
+
+def _init_worker(vect: TfidfVectorizer, clf: LogisticRegression) -> None:
+    global _WORKER_MODEL
+    _WORKER_MODEL = (vect, clf)
+
+def _score_texts_worker(texts: List[str]):
+    vect, clf = _WORKER_MODEL
+    return score_texts(texts, vect, clf)
+
+def make_pool(workers: int, vect: TfidfVectorizer, clf: LogisticRegression) -> ProcessPoolExecutor | None:
+    if workers <= 1:
+        return None
+    return ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(vect, clf))
+
+def score_frame(df: pd.DataFrame, vect: TfidfVectorizer, clf: LogisticRegression,
+                pool: ProcessPoolExecutor | None = None, deduper: Deduper | None = None) -> pd.DataFrame:
+    """
+    Add toxicity, stereotypes, factuality, ml_prob, overall columns to `df` (in place).
+    With a deduper only the first row of each group of copies is scored;
+    every row gets its group's scores and a group_id column (the id of the first
+    row of its group, or of its near-duplicate cluster with a `near` threshold).
+    """
+    texts = df["text"].astype(str).tolist()
+    groups = None
+    if deduper is not None:
+        with timed("make_eval.dedup"):
+            groups = deduper.group(texts)
+        texts = [texts[i] for i in groups.reps]
+
+    if pool is None:
+        tox_list, st_list, fact_list, ml_probs = score_texts(texts, vect, clf)
+    else:
+        # small fixed-size pieces for load balance; map() keeps input order;
+        # workers don't report stage timings, so the pool is timed as one stage
+        with timed("make_eval.pool_score"):
+            pieces = [texts[i:i + WORKER_PIECE_ROWS] for i in range(0, len(texts), WORKER_PIECE_ROWS)]
+            tox_list, st_list, fact_list, ml_parts = [], [], [], []
+            for tox, st, fact, mp in pool.map(_score_texts_worker, pieces):
+                tox_list += tox; st_list += st; fact_list += fact; ml_parts.append(mp)
+            ml_probs = np.concatenate(ml_parts) if ml_parts else ml_probability(vect, clf, texts)
+
+    # overall
+    with timed("make_eval.overall"):
+        overalls = []
+        for tox, st, fact, mp in zip(tox_list, st_list, fact_list, ml_probs):
+            tox_n, st_n, fact_n, ml_n = normalize_for_overall(tox, st, fact, mp)
+            overall = (W_TOX * tox_n) + (W_ST * st_n) + (W_FACT * fact_n) + (W_ML * ml_n)
+            overalls.append(overall)
+
+    if groups is not None:
+        idx = groups.group
+        tox_list, st_list, fact_list, ml_probs, overalls = (
+            np.asarray(col)[idx] for col in (tox_list, st_list, fact_list, ml_probs, overalls))
+    df["toxicity"]     = tox_list
+    df["stereotypes"]  = st_list
+    df["factuality"]   = fact_list
+    df["ml_prob"]      = ml_probs
+    df["overall"]      = overalls
+    if groups is not None:
+        df["group_id"] = df["id"].to_numpy()[groups.cluster_reps][groups.cluster]
+    return df
+
+def report_dedup(stats: dict) -> None:
+    copies = "normalized text" if stats.get("groups_by") == "normalized" else "exact copies"
+    mode = f"{copies}, near-duplicate clusters >= {stats['near']}" if stats["near"] is not None else copies
+    print(f"\n== Dedup ({mode}) ==")
+    print(f"Rows: {stats['rows']}  scored: {stats['groups']}  copies: {stats['exact_duplicates']}  "
+          f"({stats['duplicate_rate']:.1%} not rescored, grouping {stats['seconds']:.2f}s)")
+    if stats["near"] is not None:
+        print(f"Near-duplicate clusters: {stats.get('clusters', 0)}  texts joining an earlier one: "
+              f"{stats['near_duplicates']} (scored individually)")
+
+class RunningSummary:
+    """Mean overall (total and per tag), updated chunk by chunk."""
+
+    def __init__(self, n: int = 0, total: float = 0.0, by_tag: Dict[str, List[float]] | None = None):
+        self.n = n
+        self.total = total
+        self.by_tag = by_tag or {}  # tag -> [count, sum]
+
+    def update(self, out: pd.DataFrame) -> None:
+        self.n += len(out)
+        self.total += float(out["overall"].sum())
+        grouped = out.groupby("tag")["overall"].agg(["count", "sum"])
+        for tag, r in grouped.iterrows():
+            acc = self.by_tag.setdefault(str(tag), [0, 0.0])
+            acc[0] += int(r["count"]); acc[1] += float(r["sum"])
+
+    def to_dict(self) -> dict:
+        return {"n": self.n, "total": self.total, "by_tag": self.by_tag}
+
+    @classmethod
+    def from_dict(cls, d: dict) -> "RunningSummary":
+        return cls(d["n"], d["total"], {k: list(v) for k, v in d["by_tag"].items()})
+
+    def report(self, outp: Path) -> None:
+        print(f"Saved: {outp.resolve()}")
+        print("\n== Summary ==")
+        print(f"Rows: {self.n}")
+        print(f"Mean overall: {(self.total / self.n if self.n else float('nan')):.3f}")
+        print("Mean overall by tag:")
+        for tag in sorted(self.by_tag):
+            cnt, tot = self.by_tag[tag]
+            print(f"  {tag}: {tot / cnt:.3f}")
+
+# ---- Evaluation: metrics and threshold/weight sweeps over scored output ----
+EVAL_SCORES = ["toxicity", "stereotypes", "factuality", "ml_prob", "overall"]
+EVAL_BINS = 10_000  # threshold resolution of the weight grid (overall is on 0..1)
+
+def overall_components(df: pd.DataFrame) -> np.ndarray:
+    """normalize_for_overall for every row at once: columns tox_n, st_n, fact_n, ml_n."""
+    return np.column_stack([
+        np.minimum(df["toxicity"].to_numpy(dtype=float) / 3.0, 1.0),
+        np.minimum(df["stereotypes"].to_numpy(dtype=float) / 5.0, 1.0),
+        np.minimum(df["factuality"].to_numpy(dtype=float) / 3.0, 1.0),
+        np.clip(np.nan_to_num(df["ml_prob"].to_numpy(dtype=float)), 0, 1),
+    ])
+
+def evaluate(df: pd.DataFrame, weight_step: float = 0.1, top: int = 5) -> dict:
+    """
+    Report over scored rows (EVAL_SCORES + tag; label as in _labels):
+    per score, an exact sweep of every threshold (AUC, best-F1 point with
+    its confusion matrix, PR curve); for overall also the severity-band
+    cut-offs; then every weight vector on a `weight_step` grid, combined
+    from the stored components without re-running any detector.
+    """
+    t0 = time.perf_counter()
+    codes, tags = pd.factorize(df["tag"].astype(str))
+    y = _labels(pd.Series(tags))[codes]  # label each distinct tag once
+    report = {"rows": len(df), "positives": int(y.sum()), "scores": {}}
+    for col in EVAL_SCORES:
+        sw = metrics.sweep(df[col].to_numpy(dtype=float), y)
+        report["scores"][col] = metrics.summarize(sw)
+        if col == "overall":
+            # app bands are on 0..10; make_eval's overall is on 0..1
+            report["scores"][col]["bands"] = {
+                label: sw.point_at(lower / 10.0) for lower, label in SEVERITY_BANDS if lower > float("-inf")
+            }
+
+    current = np.array([W_TOX, W_ST, W_FACT, W_ML])
+    grid = metrics.weight_grid(4, weight_step)
+    if not np.isclose(grid, current).all(axis=1).any():
+        grid = np.vstack([current, grid])
+    sweeps = metrics.weighted_sweeps(overall_components(df), y, grid, EVAL_BINS)
+    rows = []
+    for w, sw in zip(grid, sweeps):
+        best = sw.point(sw.best())
+        rows.append({"weights": dict(zip(["toxicity", "stereotypes", "factuality", "mlsignal"], w.round(6).tolist())),
+                     "auc": sw.auc(), "f1": best["f1"], "threshold": best["threshold"],
+                     "precision": best["precision"], "recall": best["recall"]})
+    is_current = np.isclose(grid, current).all(axis=1)
+    report["weights"] = {
+        "step": weight_step,
+        "evaluated": len(grid),
+        "current": rows[int(np.flatnonzero(is_current)[0])],
+        "top_f1": sorted(rows, key=lambda r: -r["f1"])[:top],
+        "top_auc": sorted(rows, key=lambda r: -(r["auc"] or 0.0))[:top],
+    }
+    report["seconds"] = time.perf_counter() - t0
+    return report
+
+def print_evaluation(report: dict) -> None:
+    print(f"\n== Evaluation ({report['rows']} rows, {report['positives']} positive, {report['seconds']:.2f}s) ==")
+    print(f"{'score':<12} {'AUC':>6} {'best F1':>8} {'@thr':>9} {'P':>6} {'R':>6}   confusion (tp fp fn tn)")
+    for col, r in report["scores"].items():
+        b, c = r["best_f1"], r["best_f1"]["confusion"]
+        auc = f"{r['auc']:.3f}" if r["auc"] is not None else "n/a"
+        print(f"{col:<12} {auc:>6} {b['f1']:>8.3f} {b['threshold']:>9.4g} {b['precision']:>6.3f} {b['recall']:>6.3f}"
+              f"   {c['tp']} {c['fp']} {c['fn']} {c['tn']}")
+    for label, b in report["scores"]["overall"].get("bands", {}).items():
+        c = b["confusion"]
+        print(f"  overall >= {label:<9} (thr {b['threshold']:.4g}): P {b['precision']:.3f} R {b['recall']:.3f} "
+              f"F1 {b['f1']:.3f}   {c['tp']} {c['fp']} {c['fn']} {c['tn']}")
+    w = report["weights"]
+    print(f"\nWeight grid: {w['evaluated']} settings (step {w['step']})")
+
+    def line(r: dict) -> str:
+        ws = " ".join(f"{k[:4]}={v:.2f}" for k, v in r["weights"].items())
+        return f"  {ws}   F1 {r['f1']:.3f} @ {r['threshold']:.4f}   AUC {r['auc'] or float('nan'):.3f}"
+    print("current:\n" + line(w["current"]))
+    print("best F1:")
+    for r in w["top_f1"]:
+        print(line(r))
+
+def _evaluate_file(path: Path, args: argparse.Namespace, df: pd.DataFrame | None = None) -> None:
+    with timed("make_eval.evaluate"):
+        if df is None:
+            df = read_table(path, ["tag", *EVAL_SCORES])
+        report = evaluate(df, args.weight_step, args.top)
+    print_evaluation(report)
+    if args.report:
+        Path(args.report).write_text(json.dumps(report, indent=2), encoding="utf-8")
+        print(f"Saved: {Path(args.report).resolve()}")
+
+# ---- Streaming mode: chunked read -> score -> append, with a resumable checkpoint ----
+
+def _checkpoint_path(outp: Path) -> Path:
+    return outp.with_name(outp.name + ".ckpt.json")
+
+def _write_checkpoint(path: Path, state: dict) -> None:
+    tmp = path.with_name(path.name + ".tmp")
+    tmp.write_text(json.dumps(state), encoding="utf-8")
+    os.replace(tmp, path)
+
+IO_COLUMNS = ["id", "text", "tag"]
+
+def _input_columns(inp: Path):
+    # CSV rows pass through whole (as before); columnar inputs are projected
+    return None if table_format(inp) == "csv" else IO_COLUMNS
+
+def write_table(df: pd.DataFrame, outp: Path, chunksize: int) -> None:
+    """Whole-frame output: CSV as one write, columnar formats in chunksize row groups."""
+    if table_format(outp) == "csv":
+        df.to_csv(outp, index=False)
+        return
+    with TableWriter(outp) as w:
+        for i in range(0, max(len(df), 1), chunksize):
+            w.write(df.iloc[i:i + chunksize])
+
+def _timed_chunks(chunks):
+    # reading/parsing happens lazily inside next(), so time it there
+    it = iter(chunks)
+    while True:
+        with timed("make_eval.read"):
+            chunk = next(it, None)
+        if chunk is None:
+            return
+        yield chunk
+
+def run_stream(inp: Path, outp: Path, chunksize: int, train_rows: int, resume: bool,
+               workers: int = 1, get_model=None, model_key: str = "",
+               deduper: Deduper | None = None) -> RunningSummary:
+    """
+    `get_model()` -> (vect, clf); default fits the ML stub on the first `train_rows` rows.
+    A deduper collapses duplicates within each chunk.
+    """
+    st = inp.stat()
+    run_key = {
+        "input": str(inp.resolve()), "size": st.st_size, "mtime": st.st_mtime,
+        "chunksize": chunksize, "train_rows": train_rows,
+    }
+    if model_key:
+        run_key["model"] = model_key
+    if deduper is not None:
+        run_key["dedup"] = deduper.config()
+    ckpt = _checkpoint_path(outp)
+    state = {"run": run_key, "chunks_done": 0, "rows_done": 0, "out_bytes": 0, "done": False,
+             "summary": RunningSummary().to_dict()}
+
+    if resume and ckpt.exists():
+        saved = json.loads(ckpt.read_text(encoding="utf-8"))
+        if saved.get("run") != run_key:
+            print(f"[ERROR] checkpoint {ckpt} is for a different input or settings; "
+                  "delete it or run without --resume", file=sys.stderr)
+            sys.exit(2)
+        state = saved
+        print(f"Resuming after {state['rows_done']} rows", file=sys.stderr)
+
+    summary = RunningSummary.from_dict(state["summary"])
+    if deduper is not None and "dedup" in state:
+        deduper.restore(state["dedup"])
+    if state["done"]:
+        return summary
+
+    if get_model is not None:
+        vect, clf = get_model()
+    else:
+        # ML stub is fit on a bounded head of the input so memory stays flat
+        head = read_table(inp, ["text", "tag"], nrows=train_rows)
+        with timed("make_eval.train"):
+            vect, clf = train_or_load_mlsignal(head)
+        del head
+
+    outp.parent.mkdir(parents=True, exist_ok=True)
+    # columnar files can't be appended to after close, so only CSV output is checkpointed
+    writer = TableWriter(outp) if table_format(outp) != "csv" else None
+    if writer is None:
+        with open(outp, "a+b") as f:
+            # drop any rows appended after the last checkpoint (crash mid-chunk)
+            f.truncate(state["out_bytes"])
+
+    # chunk boundaries are fixed by chunksize (part of run_key), so skip whole chunks
+    reader = iter_table(inp, chunksize, _input_columns(inp))
+    pool = make_pool(workers, vect, clf)
+    try:
+        for chunk in _timed_chunks(itertools.islice(reader, state["chunks_done"], None)):
+            out = score_frame(chunk, vect, clf, pool, deduper)
+            with timed("make_eval.write"):
+                if writer is not None:
+                    writer.write(out)
+                else:
+                    with open(outp, "a", encoding="utf-8", newline="") as f:
+                        out.to_csv(f, header=state["out_bytes"] == 0, index=False)
+                        f.flush()
+                        os.fsync(f.fileno())
+                        state["out_bytes"] = f.tell()
+            summary.update(out)
+            state["rows_done"] += len(out)
+            state["chunks_done"] += 1
+            state["summary"] = summary.to_dict()
+            if deduper is not None:
+                state["dedup"] = deduper.stats()
+            if writer is None:
+                _write_checkpoint(ckpt, state)
+            print(f"  {state['rows_done']} rows", file=sys.stderr)
+    finally:
+        if pool is not None:
+            pool.shutdown()
+        if writer is not None:
+            writer.close()
+
+    state["done"] = True
+    if writer is None:
+        _write_checkpoint(ckpt, state)
+    return summary
+
 def main():
     ap = argparse.ArgumentParser()
     ap.add_argument("--in",  dest="inp", required=True, help="Input CSV path (id,text,tag)")
-    ap.add_argument("--out", dest="outp", required=True, help="Output CSV path")
+    ap.add_argument("--out", dest="outp", default=None, help="Output CSV path")
+    ap.add_argument("--stream", action="store_true", help="Chunked, constant-memory mode")
+    ap.add_argument("--chunksize", type=int, default=50_000, help="Rows per chunk in --stream mode (and per Parquet row group / Arrow batch)")
+    ap.add_argument("--train-rows", type=int, default=50_000,
+                    help="Rows from the head of the input used to fit the ML stub in --stream mode")
+    ap.add_argument("--resume", action="store_true", help="Continue a --stream run from its checkpoint")
+    ap.add_argument("--workers", type=int, default=1, help="Scoring processes (output is identical for any N)")
+    ap.add_argument("--profile", action="store_true", help="Print per-stage timings to stderr at the end")
+    ap.add_argument("--ooc", action="store_true",
+                    help="Train the ML stub out-of-core on all rows (hashed features + SGD, chunked by --chunksize)")
+    ap.add_argument("--n-features", type=int, default=HASH_FEATURES, help="Hashed feature space size for --ooc")
+    ap.add_argument("--epochs", type=int, default=1, help="Passes over the input for --ooc")
+    ap.add_argument("--save-model", default=None,
+                    help="Save the trained ML model here (load it with --model or BIAS_DETECTOR_MODEL)")
+    ap.add_argument("--model", default=None, help="Use a saved ML model instead of training one")
+    ap.add_argument("--dedup", action="store_true",
+                    help="Score one row per group of copies that differ only in case/whitespace (scores are "
+                         "unchanged: the scorers ignore both); adds group_id")
+    ap.add_argument("--near-dup", type=float, default=None, metavar="THRESHOLD",
+                    help="Also label near-duplicate clusters (MinHash Jaccard similarity >= THRESHOLD) in group_id; "
+                         "clustered rows are still scored individually (implies --dedup)")
+    ap.add_argument("--evaluate", action="store_true",
+                    help="--in is already-scored output: only compute the evaluation report")
+    ap.add_argument("--report", default=None, help="Write the evaluation report (JSON) here")
+    ap.add_argument("--weight-step", type=float, default=0.1, help="Grid step for the combine-weight sweep")
+    ap.add_argument("--top", type=int, default=5, help="Weight settings listed in the report")
     args = ap.parse_args()
+    if args.outp is None and not args.evaluate:
+        ap.error("--out is required unless --evaluate is given")
+    if args.near_dup is not None and not 0.0 < args.near_dup <= 1.0:
+        ap.error("--near-dup must be in (0, 1]")
+
+    if args.profile:
+        sink = profiling.enable()
+        try:
+            _run(args)
+        finally:
+            _print_profile(sink)
+    else:
+        _run(args)
+
+def _print_profile(sink: profiling.InMemorySink) -> None:
+    print("\n== Profile (wall time per stage) ==", file=sys.stderr)
+    print(f"{'stage':<26} {'calls':>7} {'total ms':>11} {'mean ms':>10} {'max ms':>10}", file=sys.stderr)
+    for stage, r in sink.snapshot().items():
+        print(f"{stage:<26} {r['count']:>7} {r['total_ms']:>11.1f} {r['mean_ms']:>10.3f} {r['max_ms']:>10.3f}",
+              file=sys.stderr)
+
+def _model_loader(args: argparse.Namespace, inp: Path, df: pd.DataFrame | None = None):
+    """
+    (get_model, model_key): --model loads, --ooc trains over the whole input,
+    otherwise the stub is fit on `df` (or the first --train-rows rows).
+    The trained model is saved when --save-model is set.
+    """
+    if args.model:
+        def get_model():
+            bundle = load_model_file(Path(args.model))
+            if bundle is None:
+                print(f"[ERROR] not a readable model file: {args.model}", file=sys.stderr)
+                sys.exit(2)
+            return bundle.vect, bundle.clf
+        st = Path(args.model).stat() if Path(args.model).exists() else None
+        key = f"model:{Path(args.model).resolve()}:{st.st_size if st else 0}:{st.st_mtime if st else 0}"
+        return get_model, key
+
+    if args.ooc:
+        def get_model():
+            with timed("make_eval.train"):
+                vect, clf = train_out_of_core(inp, args.chunksize, args.n_features, args.epochs)
+            _maybe_save(args, vect, clf, _ooc_fingerprint(inp, args.n_features, args.epochs))
+            return vect, clf
+        return get_model, f"ooc:{args.n_features}:{args.epochs}"
+
+    def get_model():
+        train_df = df if df is not None else read_table(inp, ["text", "tag"], nrows=args.train_rows)
+        with timed("make_eval.train"):
+            vect, clf = train_or_load_mlsignal(train_df)
+        _maybe_save(args, vect, clf, "stub")
+        return vect, clf
+    return get_model, ""
+
+def _maybe_save(args: argparse.Namespace, vect, clf, fingerprint: str) -> None:
+    if args.save_model:
+        path = write_model(_ModelBundle(vect=vect, clf=clf, fingerprint=fingerprint), Path(args.save_model))
+        print(f"Saved model: {path.resolve()}", file=sys.stderr)
 
+def _deduper(args: argparse.Namespace) -> Deduper | None:
+    # make_eval's scorers ignore case and whitespace runs, so such copies share a score
+    if args.near_dup is not None:
+        return Deduper(args.near_dup, normalized=True)
+    return Deduper(normalized=True) if args.dedup else None
+
+def _run(args: argparse.Namespace) -> None:
     inp = Path(args.inp)
-    outp = Path(args.outp)
     if not inp.exists():
         print(f"[ERROR] input file not found: {inp}", file=sys.stderr)
         sys.exit(2)
+    if args.evaluate:
+        if not {"tag", *EVAL_SCORES}.issubset(read_columns(inp)):
+            print(f"[ERROR] --evaluate input must have columns: tag,{','.join(EVAL_SCORES)}", file=sys.stderr)
+            sys.exit(2)
+        _evaluate_file(inp, args)
+        return
+    outp = Path(args.outp)
 
-    df = pd.read_csv(inp)
+    if args.stream:
+        cols = read_columns(inp)
+        if not {"id","text","tag"}.issubset(set(cols)):
+            print("[ERROR] input must have columns: id,text,tag", file=sys.stderr)
+            sys.exit(2)
+        if args.resume and table_format(outp) != "csv":
+            print("[ERROR] --resume needs CSV output (Parquet/Arrow files can't be appended to)", file=sys.stderr)
+            sys.exit(2)
+        if not args.resume:
+            outp.unlink(missing_ok=True)
+            _checkpoint_path(outp).unlink(missing_ok=True)
+        get_model, model_key = _model_loader(args, inp)
+        deduper = _deduper(args)
+        summary = run_stream(inp, outp, args.chunksize, args.train_rows, args.resume, args.workers,
+                             get_model, model_key, deduper)
+        summary.report(outp)
+        if deduper is not None:
+            report_dedup(deduper.stats())
+        if args.report:
+            _evaluate_file(outp, args)
+        return
+
+    if table_format(inp) != "csv" and not set(IO_COLUMNS).issubset(read_columns(inp)):
+        print("[ERROR] input must have columns: id,text,tag", file=sys.stderr)
+        sys.exit(2)
+    with timed("make_eval.read"):
+        df = read_table(inp, _input_columns(inp))
     if not {"id","text","tag"}.issubset(set(df.columns)):
-        print("[ERROR] CSV must have columns: id,text,tag", file=sys.stderr)
+        print("[ERROR] input must have columns: id,text,tag", file=sys.stderr)
         sys.exit(2)
 
-    # compute rule-based detectors
-    tox_list, st_list, fact_list = [], [], []
-    for txt in df["text"].astype(str).tolist():
-        tox, st, fact = compute_row_metrics(txt)
-        tox_list.append(tox); st_list.append(st); fact_list.append(fact)
-
-    # mlsignal (TF-IDF + LogReg on stub)
-    vect, clf = train_or_load_mlsignal(df)
-    ml_probs = ml_probability(vect, clf, df["text"].astype(str).tolist())
-
-    # overall
-    overalls = []
-    tox_n_list, st_n_list, fact_n_list = [], [], []
-    for tox, st, fact, mp in zip(tox_list, st_list, fact_list, ml_probs):
-        tox_n, st_n, fact_n, ml_n = normalize_for_overall(tox, st, fact, mp)
-        overall = (W_TOX * tox_n) + (W_ST * st_n) + (W_FACT * fact_n) + (W_ML * ml_n)
-        overalls.append(overall)
-        tox_n_list.append(tox_n); st_n_list.append(st_n); fact_n_list.append(fact_n)
-
-    out = df.copy()
-    out["toxicity"]     = tox_list
-    out["stereotypes"]  = st_list
-    out["factuality"]   = fact_list
-    out["ml_prob"]      = ml_probs
-    out["overall"]      = overalls
+    vect, clf = _model_loader(args, inp, df)[0]()
+    pool = make_pool(args.workers, vect, clf)
+    deduper = _deduper(args)
+    try:
+        out = score_frame(df, vect, clf, pool, deduper)
+    finally:
+        if pool is not None:
+            pool.shutdown()
 
     outp.parent.mkdir(parents=True, exist_ok=True)
-    out.to_csv(outp, index=False)
+    with timed("make_eval.write"):
+        write_table(out, outp, args.chunksize)
 
     # ---- Simple console summary ----
-    print(f"Saved: {outp.resolve()}")
-    print("\n== Summary ==")
-    print(f"Rows: {len(out)}")
-    print(f"Mean overall: {out['overall'].mean():.3f}")
-    by_tag = out.groupby('tag')['overall'].mean().reset_index()
-    print("Mean overall by tag:")
-    for _, r in by_tag.iterrows():
-        print(f"  {r['tag']}: {r['overall']:.3f}")
+    summary = RunningSummary()
+    summary.update(out)
+    summary.report(outp)
+    if deduper is not None:
+        report_dedup(deduper.stats())
+    if args.report:
+        _evaluate_file(outp, args, out)
 
 if __name__ == "__main__":
     main()
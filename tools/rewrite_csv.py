@@ -0,0 +1,55 @@
+"""
+Add a `rewrite` column (utils.rewrite.rewrite_batch) to every row of a
+CSV with a `text` column. Reads and writes in chunks, so memory stays
+bounded for large files.
+
+Usage:
+  python tools/rewrite_csv.py --in tests/tests_snippets.csv --out rewrites.csv
+  python tools/rewrite_csv.py --in big.csv --out big_rewrites.csv --chunksize 200000
+"""
+
+from __future__ import annotations
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import pandas as pd
+
+ROOT = Path(__file__).resolve().parents[1]
+SRC = ROOT / "src"
+if str(SRC) not in sys.path:
+    sys.path.insert(0, str(SRC))
+
+from utils.rewrite import rewrite_batch
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--in", dest="inp", required=True, help="Input CSV path (must have a text column)")
+    ap.add_argument("--out", dest="outp", required=True, help="Output CSV path")
+    ap.add_argument("--chunksize", type=int, default=100_000, help="Rows per chunk")
+    args = ap.parse_args()
+
+    inp = Path(args.inp)
+    outp = Path(args.outp)
+    if not inp.exists():
+        print(f"[ERROR] input file not found: {inp}", file=sys.stderr)
+        sys.exit(2)
+    if "text" not in pd.read_csv(inp, nrows=0).columns:
+        print("[ERROR] CSV must have a 'text' column", file=sys.stderr)
+        sys.exit(2)
+
+    outp.parent.mkdir(parents=True, exist_ok=True)
+    rows, t0 = 0, time.perf_counter()
+    with open(outp, "w", encoding="utf-8", newline="") as f:
+        for i, chunk in enumerate(pd.read_csv(inp, chunksize=args.chunksize)):
+            chunk["rewrite"] = rewrite_batch(chunk["text"].tolist())
+            chunk.to_csv(f, header=i == 0, index=False)
+            rows += len(chunk)
+
+    el = time.perf_counter() - t0
+    print(f"Saved: {outp.resolve()}")
+    print(f"Rows: {rows} ({rows / el if el else 0:,.0f} rows/s)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,142 @@
+"""
+Streaming scorer for Unix pipelines: newline-delimited JSON records on
+stdin, the same records with their scores added on stdout, in input
+order, one output line per input line.
+
+A reader thread parses records and hands their texts to a MicroBatcher
+(detectors.batching), which scores whatever queued up while the previous
+batch was scored in one analyze_batch call: one text per batch under
+light traffic, up to --max-batch under load (--max-wait-ms > 0 holds
+batches open to fill). The main thread writes results in input order
+and flushes whenever it has caught up with the scorer, so a lone record
+comes out as soon as it is scored. Both queues are bounded
+(--max-queue): when stdout is not drained, reading stops and the
+upstream pipe fills.
+
+Records are JSON objects with the text under --field (or bare JSON
+strings). Scores go under --out: the compact scores (scores_only, NaN
+as null, plus the severity band), or the full analyze_text result with
+--full. A line that is not valid JSON or has no text gets
+{"error": ...} there instead.
+
+Usage:
+  kafkacat -C -b broker -t posts | python tools/score_jsonl.py | jq -c 'select(.bias.severity == "HIGH")'
+  python tools/bench_stream.py --emit 10000 | python tools/score_jsonl.py --full > scored.jsonl
+  python tools/score_jsonl.py --field body --out scores < comments.jsonl
+  python tools/score_jsonl.py --cascade --stats < posts.jsonl > scored.jsonl
+"""
+
+from __future__ import annotations
+import argparse
+import json
+import math
+import os
+import queue
+import sys
+import threading
+import time
+from functools import partial
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+SRC = ROOT / "src"
+if str(SRC) not in sys.path:
+    sys.path.insert(0, str(SRC))
+
+from detectors import analyze_batch, warm_up
+from detectors.batching import MicroBatcher
+from detectors.results import Scores
+from utils.scoring import severity_band
+
+_END = object()
+
+def compact(scores: Scores) -> dict:
+    out = {k: (None if isinstance(v, float) and math.isnan(v) else v) for k, v in scores.as_dict().items()}
+    out["severity"] = severity_band(scores.overall)
+    return out
+
+def read_records(lines, batcher: MicroBatcher, pending: queue.Queue, field: str) -> None:
+    # (record, future or error message) per input line, in order; blocks when `pending` is full
+    try:
+        for raw in lines:
+            if not raw.strip():
+                continue
+            try:
+                record = json.loads(raw)
+            except ValueError as e:
+                pending.put(({}, f"invalid JSON: {e}"))
+                continue
+            if isinstance(record, str):
+                record = {field: record}
+            text = record.get(field) if isinstance(record, dict) else None
+            if not isinstance(text, str):
+                pending.put((record if isinstance(record, dict) else {"value": record}, f"no string '{field}' field"))
+                continue
+            pending.put((record, batcher.submit(text)))
+    finally:
+        pending.put(_END)
+
+def write_results(out, pending: queue.Queue, key: str, full: bool) -> int:
+    n = 0
+    while True:
+        item = pending.get()
+        if item is _END:
+            out.flush()
+            return n
+        record, fut = item
+        if isinstance(fut, str):
+            record[key] = {"error": fut}
+        else:
+            if not fut.done():
+                out.flush()  # about to wait for the scorer: send what is ready first
+            try:
+                result = fut.result()
+                record[key] = result if full else compact(result)
+            except Exception as e:
+                record[key] = {"error": repr(e)}
+        out.write(json.dumps(record, ensure_ascii=False).encode("utf-8") + b"\n")
+        n += 1
+        if pending.empty():
+            out.flush()
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--field", default="text", help="Record key holding the text")
+    ap.add_argument("--out", default="bias", help="Record key the scores are written to")
+    ap.add_argument("--full", action="store_true", help="Full analyze_text results (flags, weights) instead of scores")
+    ap.add_argument("--cascade", action="store_true", help="Skip mlsignal where it cannot change the band")
+    ap.add_argument("--max-batch", type=int, default=256, help="Max texts per analyze_batch call")
+    ap.add_argument("--max-wait-ms", type=float, default=0.0, help="Max wait to fill a batch (0: take what is queued)")
+    ap.add_argument("--max-queue", type=int, default=4096, help="Records read ahead of the writer")
+    ap.add_argument("--stats", action="store_true", help="Batching stats on stderr at the end")
+    args = ap.parse_args()
+
+    t0 = time.perf_counter()
+    warm_up()
+    batch_fn = partial(analyze_batch, cascade=args.cascade, scores_only=not args.full)
+    batcher = MicroBatcher(batch_fn, max_batch=args.max_batch, max_wait_ms=args.max_wait_ms,
+                           max_queue=args.max_queue)
+    pending: queue.Queue = queue.Queue(maxsize=args.max_queue)
+    reader = threading.Thread(target=read_records, args=(sys.stdin.buffer, batcher, pending, args.field),
+                              name="jsonl-reader", daemon=True)
+    t_ready = time.perf_counter()
+    reader.start()
+    try:
+        n = write_results(sys.stdout.buffer, pending, args.out, args.full)
+    except BrokenPipeError:
+        # downstream closed (e.g. `| head`): stop quietly, as Unix filters do; the
+        # reader thread may be blocked on stdin, so skip interpreter shutdown
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+        os._exit(0)
+    except KeyboardInterrupt:
+        os._exit(130)
+    batcher.close()
+    if args.stats:
+        el = time.perf_counter() - t_ready
+        s = batcher.stats
+        print(f"{n} records in {el:.2f}s ({n / el if el else 0.0:.0f}/s; warm-up {t_ready - t0:.2f}s), "
+              f"{s['batches']} batches (mean {s['requests'] / max(s['batches'], 1):.1f}, max {s['max_batch_seen']})",
+              file=sys.stderr)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,185 @@
+"""
+Long-running local scoring service: analyze_text over HTTP/JSON.
+
+Concurrent requests are gathered into micro-batches (see
+detectors.batching.MicroBatcher), so the TF-IDF + LogReg step runs once
+per batch instead of once per request.
+
+Endpoints:
+  POST /analyze   {"text": "..."}            -> analyze_text result
+                  {"texts": ["...", "..."]}  -> list of results
+  GET  /health    detectors_health() + batching stats + lexicon version
+
+With --workers N (POSIX) the model and compiled lexicons are loaded once
+in a parent process, which then forks N workers accepting on the same
+socket; they share the warm state copy-on-write (see utils.prefork).
+Each worker reports its time-to-ready and memory at startup and in /health.
+
+Usage:
+  python tools/serve.py --port 8765 --max-batch 64 --max-wait-ms 5
+  python tools/serve.py --workers 4
+  python tools/serve.py --cascade   # skip the ML signal when it cannot change the severity band
+  BIAS_DETECTOR_LEXICONS=lexicons/ python tools/serve.py   # extra lexicon files, reloaded on change
+  curl -s localhost:8765/analyze -d '{"text": "Shut up, idiot!!!"}'
+"""
+
+from __future__ import annotations
+import argparse
+import json
+import os
+import sys
+import time
+from functools import partial
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+SRC = ROOT / "src"
+if str(SRC) not in sys.path:
+    sys.path.insert(0, str(SRC))
+
+from detectors import analyze_batch, detectors_health, lexicon_status, warm_up
+from detectors.batching import MicroBatcher
+from utils.prefork import memory_usage, prefork
+
+MAX_BODY_BYTES = 10 * 1024 * 1024
+
+def make_handler(batcher: MicroBatcher, worker: dict | None = None):
+    # worker: fixed facts for /health (time-to-ready, pre-fork index); memory is read per request
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"  # keep-alive for load tests
+        disable_nagle_algorithm = True  # headers and body go out as separate writes
+
+        def _send(self, code: int, payload) -> None:
+            body = json.dumps(payload).encode("utf-8")
+            self.send_response(code)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            if self.path == "/health":
+                health = detectors_health()
+                health["batching"] = dict(batcher.stats, max_batch=batcher.max_batch,
+                                          max_wait_ms=batcher.max_wait * 1000.0)
+                health["lexicons"] = lexicon_status()
+                health["worker"] = {"pid": os.getpid(), **(worker or {}), **memory_usage()}
+                self._send(200 if health["ok"] else 503, health)
+            else:
+                self._send(404, {"error": "not found"})
+
+        def do_POST(self):
+            if self.path != "/analyze":
+                self._send(404, {"error": "not found"})
+                return
+            n = int(self.headers.get("Content-Length") or 0)
+            if n > MAX_BODY_BYTES:
+                self._send(413, {"error": "request body too large"})
+                return
+            try:
+                req = json.loads(self.rfile.read(n) or b"{}")
+            except ValueError as e:
+                self._send(400, {"error": f"invalid JSON: {e}"})
+                return
+            if not isinstance(req, dict):
+                self._send(400, {"error": "expected a JSON object"})
+                return
+
+            try:
+                if isinstance(req.get("texts"), list):
+                    futs = [batcher.submit(str(t or "")) for t in req["texts"]]
+                    self._send(200, [f.result() for f in futs])
+                elif "text" in req:
+                    self._send(200, batcher.analyze(str(req["text"] or "")))
+                else:
+                    self._send(400, {"error": "expected 'text' or 'texts'"})
+            except Exception as e:
+                self._send(500, {"error": repr(e)})
+
+        def log_message(self, fmt, *args):
+            pass  # per-request logging would dominate at high QPS
+
+    return Handler
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 1024  # default backlog of 5 resets connections under load
+
+def make_batcher(max_batch: int, max_wait_ms: float, cascade: bool = False) -> MicroBatcher:
+    batch_fn = partial(analyze_batch, cascade=True) if cascade else None
+    return MicroBatcher(batch_fn, max_batch=max_batch, max_wait_ms=max_wait_ms)
+
+def make_server(host: str, port: int, max_batch: int, max_wait_ms: float, cascade: bool = False):
+    batcher = make_batcher(max_batch, max_wait_ms, cascade)
+    server = _Server((host, port), make_handler(batcher))
+    return server, batcher
+
+def serve_prefork(args, t_start: float) -> None:
+    # everything heavy happens here, once, before the fork
+    warm_up()
+    t_warm = time.perf_counter() - t_start
+    server = _Server((args.host, args.port), BaseHTTPRequestHandler)
+    parent = memory_usage()
+    print(f"Warm in {t_warm:.2f}s (parent rss {parent['rss_mb']:.1f} MB); forking {args.workers} workers")
+    print(f"Serving on http://{args.host}:{server.server_address[1]} "
+          f"(workers={args.workers}, max_batch={args.max_batch}, max_wait_ms={args.max_wait_ms})")
+    sys.stdout.flush()
+
+    def child(index: int, ready) -> None:
+        # threads (the batcher) must start after the fork
+        batcher = make_batcher(args.max_batch, args.max_wait_ms, args.cascade)
+        info = ready(memory_usage())
+        server.RequestHandlerClass = make_handler(batcher, {"index": index, "ready_s": info["ready_s"]})
+        try:
+            server.serve_forever()
+        finally:
+            batcher.close()
+
+    seen = set()
+
+    def on_ready(info: dict) -> None:
+        first = info["index"] not in seen
+        seen.add(info["index"])
+        print(f"  worker {info['index']} pid {info['pid']}: ready {info['ready_s'] * 1e3:.1f} ms after fork, "
+              f"rss {info['rss_mb']:.1f} MB, pss {info.get('pss_mb', 0.0):.1f} MB, "
+              f"private {info.get('uss_mb', 0.0):.1f} MB")
+        if first and len(seen) == args.workers:
+            print(f"All {args.workers} workers ready {time.perf_counter() - t_start:.2f}s after start")
+        sys.stdout.flush()
+
+    try:
+        prefork(args.workers, child, on_ready)
+    finally:
+        server.server_close()
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=8765)
+    ap.add_argument("--max-batch", type=int, default=64, help="Max texts per model call")
+    ap.add_argument("--max-wait-ms", type=float, default=5.0, help="Max wait to fill a batch")
+    ap.add_argument("--cascade", action="store_true", help="Skip mlsignal where it cannot change the band")
+    ap.add_argument("--workers", type=int, default=1, help="Pre-forked worker processes sharing one warm model")
+    args = ap.parse_args()
+
+    t_start = time.perf_counter()
+    if args.workers > 1:
+        serve_prefork(args, t_start)
+        return
+
+    server, batcher = make_server(args.host, args.port, args.max_batch, args.max_wait_ms, args.cascade)
+    print(f"Warming up... {detectors_health()}")
+    server.RequestHandlerClass = make_handler(batcher, {"ready_s": time.perf_counter() - t_start})
+    print(f"Serving on http://{args.host}:{server.server_address[1]} "
+          f"(max_batch={args.max_batch}, max_wait_ms={args.max_wait_ms})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        batcher.close()
+
+if __name__ == "__main__":
+    main()